@@ -1,74 +1,188 @@
+import os
 from datetime import timedelta
 
+from dotenv import load_dotenv
 from flask import Flask
 
-from instance.config import Config
-from instance.dbconfig import DbConfig
-from migration.Base import db
-from dotenv import load_dotenv
-from instance.logger import setup_logging
-from flask_cors import CORS
+# Load environment variables from .env file before the settings classes read them
+load_dotenv()
 
-from src.services.EmailService import mail
-from src.services.JWTService import jwt
 
-# Load environment variables from .env file
-load_dotenv()
+def configure(app, Config):
+    # Logging; records are written as JSON lines by a background listener
+    app.config['LOG_LEVEL'] = Config.LOG_LEVEL
+    app.config['LOG_FILE'] = Config.LOG_FILE
+    app.config['LOG_FILE_MAX_BYTES'] = Config.LOG_FILE_MAX_BYTES
+    app.config['LOG_QUEUE_SIZE'] = Config.LOG_QUEUE_SIZE
+    app.config['LOG_SAMPLE_ROUTES'] = Config.LOG_SAMPLE_ROUTES
+    app.config['LOG_SAMPLE_RATE'] = Config.LOG_SAMPLE_RATE
+
+    # JWT Configuration
+    app.config['JWT_SECRET_KEY'] = Config.JWT_SECRET_KEY
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    app.config['JWT_TOKEN_LOCATION'] = ['headers']
+    app.config['JWT_HEADER_NAME'] = 'Authorization'
+    app.config['JWT_HEADER_TYPE'] = 'Bearer'
+    app.config['JWT_IDENTITY_CLAIM'] = 'sub'
+
+    # Configure email server settings
+    app.config['MAIL_SERVER'] = Config.MAIL_HOST
+    app.config['MAIL_PORT'] = Config.MAIL_PORT
+    app.config['MAIL_USE_TLS'] = Config.MAIL_ENCRYPTION.upper() == 'TLS'
+    app.config['MAIL_USE_SSL'] = Config.MAIL_ENCRYPTION.upper() == 'SSL'
+    app.config['MAIL_USERNAME'] = Config.MAIL_USERNAME
+    app.config['MAIL_PASSWORD'] = Config.MAIL_PASSWORD
+    app.config['MAIL_DEFAULT_SENDER'] = Config.MAIL_FROM_ADDRESS
+    app.config['MAIL_SUPPRESS_SEND'] = Config.MAIL_SUPPRESS_SEND
+
+    # Password hashing pool
+    app.config['PASSWORD_HASH_METHOD'] = Config.PASSWORD_HASH_METHOD
+    app.config['PASSWORD_HASH_WORKERS'] = Config.PASSWORD_HASH_WORKERS
+    app.config['PASSWORD_HASH_MAX_PENDING'] = Config.PASSWORD_HASH_MAX_PENDING
+    app.config['PASSWORD_HASH_TIMEOUT'] = Config.PASSWORD_HASH_TIMEOUT
+
+    # Background mail dispatch
+    app.config['MAIL_QUEUE_SIZE'] = Config.MAIL_QUEUE_SIZE
+    app.config['MAIL_WORKERS'] = Config.MAIL_WORKERS
+    app.config['MAIL_BATCH_SIZE'] = Config.MAIL_BATCH_SIZE
+    app.config['MAIL_MAX_RETRIES'] = Config.MAIL_MAX_RETRIES
+    app.config['MAIL_RETRY_BACKOFF'] = Config.MAIL_RETRY_BACKOFF
+
+    # Video metadata cache
+    app.config['VIDEO_CACHE_MAXSIZE'] = Config.VIDEO_CACHE_MAXSIZE
+    app.config['VIDEO_CACHE_TTL'] = Config.VIDEO_CACHE_TTL
+
+    # Authenticated user cache and token revocation list
+    app.config['PRINCIPAL_CACHE_MAXSIZE'] = Config.PRINCIPAL_CACHE_MAXSIZE
+    app.config['PRINCIPAL_CACHE_TTL'] = Config.PRINCIPAL_CACHE_TTL
+    app.config['TOKEN_REVOCATION_REFRESH_INTERVAL'] = Config.TOKEN_REVOCATION_REFRESH_INTERVAL
+    app.config['TOKEN_REVOCATION_REBUILD_INTERVAL'] = Config.TOKEN_REVOCATION_REBUILD_INTERVAL
+    app.config['TOKEN_REVOCATION_CAPACITY'] = Config.TOKEN_REVOCATION_CAPACITY
+    app.config['TOKEN_REVOCATION_ERROR_RATE'] = Config.TOKEN_REVOCATION_ERROR_RATE
+
+    # Write-behind view and share counters
+    app.config['COUNTER_FLUSH_INTERVAL'] = Config.COUNTER_FLUSH_INTERVAL
+    app.config['COUNTER_MAX_PENDING'] = Config.COUNTER_MAX_PENDING
+
+    # Background media post-processing
+    app.config['MEDIA_PROCESSING_ENABLED'] = Config.MEDIA_PROCESSING_ENABLED
+    app.config['MEDIA_PROCESSING_INTERVAL'] = Config.MEDIA_PROCESSING_INTERVAL
+    app.config['MEDIA_PROCESSING_BATCH_SIZE'] = Config.MEDIA_PROCESSING_BATCH_SIZE
+    app.config['MEDIA_PROCESSING_LEASE'] = Config.MEDIA_PROCESSING_LEASE
+
+    # Background file reclamation and orphan scanning
+    app.config['UPLOAD_FOLDER'] = Config.UPLOAD_FOLDER
+    app.config['STORAGE_RECLAIM_INTERVAL'] = Config.STORAGE_RECLAIM_INTERVAL
+    app.config['STORAGE_RECLAIM_GRACE'] = Config.STORAGE_RECLAIM_GRACE
+    app.config['STORAGE_RECONCILE_INTERVAL'] = Config.STORAGE_RECONCILE_INTERVAL
+    app.config['STORAGE_RECONCILE_BATCH_SIZE'] = Config.STORAGE_RECONCILE_BATCH_SIZE
+    app.config['STORAGE_RECONCILE_MODE'] = Config.STORAGE_RECONCILE_MODE
+
+    # Admission control
+    app.config['ADMISSION_ENABLED'] = Config.ADMISSION_ENABLED
+    app.config['ADMISSION_LIMITS'] = Config.ADMISSION_LIMITS
+    app.config['ADMISSION_QUEUE_TIMEOUT'] = Config.ADMISSION_QUEUE_TIMEOUT
+    app.config['ADMISSION_RETRY_AFTER'] = Config.ADMISSION_RETRY_AFTER
+    app.config['TRUSTED_PROXIES'] = Config.TRUSTED_PROXIES
+
+    # Expired token and upload session cleanup
+    app.config['EXPIRY_SWEEP_INTERVAL'] = Config.EXPIRY_SWEEP_INTERVAL
+    app.config['EXPIRY_SWEEP_BATCH_SIZE'] = Config.EXPIRY_SWEEP_BATCH_SIZE
+    app.config['EXPIRY_SWEEP_MAX_BATCHES'] = Config.EXPIRY_SWEEP_MAX_BATCHES
+    app.config['EXPIRY_SWEEP_PAUSE'] = Config.EXPIRY_SWEEP_PAUSE
+
+    # In-process search index
+    app.config['SEARCH_SNAPSHOT_PATH'] = Config.SEARCH_SNAPSHOT_PATH
+    app.config['SEARCH_SNAPSHOT_INTERVAL'] = Config.SEARCH_SNAPSHOT_INTERVAL
+    app.config['SEARCH_REFRESH_INTERVAL'] = Config.SEARCH_REFRESH_INTERVAL
+
+    # Trending videos
+    app.config['TRENDING_TOP_K'] = Config.TRENDING_TOP_K
+    app.config['TRENDING_SNAPSHOT_PATH'] = Config.TRENDING_SNAPSHOT_PATH
+    app.config['TRENDING_SNAPSHOT_INTERVAL'] = Config.TRENDING_SNAPSHOT_INTERVAL
+
+
+def create_app(overrides=None):
+    """
+    Build the Flask application. ``overrides`` is applied on top of the environment settings (benchmarks, scripts).
+
+    Nothing here touches the database, so a pre-forking server can build the app once in its master process and
+    fork workers that start serving immediately; each worker opens its own connections and background threads.
+    """
+    from flask_cors import CORS
+    from werkzeug.middleware.proxy_fix import ProxyFix
+
+    from instance.admission import setup_admission
+    from instance.config import Config
+    from instance.dbconfig import DbConfig
+    from instance.logger import setup_logging
+    from instance.metrics import setup_metrics
+    from migration.Base import db
+    from migration.cli import db_cli
+    from routes.api import register_blueprints
+    from src.commands.expiry import expiry_cli
+    from src.commands.storage import storage_cli
+    from src.services.EmailService import mail, mail_dispatcher
+    from src.services.JWTService import jwt
+    from src.utils.jsonProvider import OrjsonProvider
+
+    # Initialize Flask application
+    app = Flask(__name__, static_url_path='/static', static_folder='static')
+    app.config.from_object(DbConfig)
+    configure(app, Config)
+    if overrides:
+        app.config.update(overrides)
+
+    if app.config['TRUSTED_PROXIES']:
+        # Take the client address from the proxies' X-Forwarded-For, so per-client limits and logs see the real one
+        trusted = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted, x_proto=trusted)
+
+    # Initialize SQLAlchemy with the Flask application
+    db.init_app(app)
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def discard_inherited_connections():
+        # Pooled connections copied from the parent by fork() must not be shared; children open their own
+        for engine in engines:
+            engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=discard_inherited_connections)
+
+    setup_logging(app)
+
+    # Request, SQL and byte metrics, exported at /metrics
+    setup_metrics(app, db)
+
+    # Encode JSON responses with orjson when it is installed
+    if Config.JSON_PROVIDER == 'orjson' and OrjsonProvider.available:
+        app.json = OrjsonProvider(app)
+
+    # Enable CORS for all endpoints
+    CORS(app)
+    jwt.init_app(app)
+
+    # Initialize Flask-Mail once its settings are in place
+    mail.init_app(app)
+    mail_dispatcher.init_app(app, mail)
+
+    # Controllers register their routes and set up their services here
+    register_blueprints(app)
+
+    # Per-endpoint concurrency and rate limits; needs the endpoints registered above
+    setup_admission(app)
+
+    # Schema changes run as a separate step: `flask db upgrade`
+    app.cli.add_command(db_cli)
+    # Orphaned file report and cleanup: `flask storage reconcile [--reclaim]`
+    app.cli.add_command(storage_cli)
+    # Expired token and upload session cleanup: `flask expiry sweep [--dry-run]`
+    app.cli.add_command(expiry_cli)
+
+    return app
 
-# Initialize Flask application
-app = Flask(__name__, static_url_path='/static', static_folder='static')
-
-# Load database configuration from DbConfig
-app.config.from_object(DbConfig)
-
-# Initialize SQLAlchemy with the Flask application
-db.init_app(app)
-
-# Initialize Flask-Mail
-mail.init_app(app)
-
-# Setup logging configuration
-setup_logging(app)
-
-# Enable CORS for all endpoints
-CORS(app)
-# JWT Configuration
-app.config['JWT_SECRET_KEY'] = Config.JWT_SECRET_KEY
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-app.config['JWT_TOKEN_LOCATION'] = ['headers']
-app.config['JWT_HEADER_NAME'] = 'Authorization'
-app.config['JWT_HEADER_TYPE'] = 'Bearer'
-app.config['JWT_IDENTITY_CLAIM'] = 'sub'
-# Initialize Flask-JWT-Extended
-jwt.init_app(app)
-
-# Configure email server settings
-app.config['MAIL_SERVER'] = Config.MAIL_MAILER
-app.config['MAIL_PORT'] = Config.MAIL_PORT
-app.config['MAIL_USE_TLS'] = True
-app.config['MAIL_USE_SSL'] = False
-app.config['MAIL_USERNAME'] = Config.MAIL_USERNAME
-app.config['MAIL_PASSWORD'] = Config.MAIL_PASSWORD
-app.config['MAIL_DEFAULT_SENDER'] = Config.MAIL_FROM_ADDRESS
-
-# Import API routes (assumed to be defined in routes/api.py)
-import routes.api
-
-# Create database tables within the application context
-with app.app_context():
-    # Import all models here to ensure SQLAlchemy can find them
-    import src.models.UserModel
-    import src.models.VideoModel
-    import src.models.ResetPasswordTokenModel
-    import src.models.EmailVerificationModel
-
-    # Create all tables defined in the models
-    try:
-        db.create_all()
-        print("Database tables created successfully.")
-    except Exception as e:
-        print(f"Error creating database tables: {str(e)}")
 
 # Entry point of the Flask application
 if __name__ == '__main__':
-    app.run()
+    create_app().run()
@@ -0,0 +1,318 @@
+"""
+Load test for the video API.
+
+Boots the app in-process against a throwaway SQLite database and upload folder, applies the migrations, seeds
+synthetic users and videos, then runs each scenario with ``--concurrency`` client threads and reports p50/p95/p99
+latency and throughput. Each thread drives the WSGI app through its own Flask test client, so the numbers cover the
+application, the database and the file system but not the network.
+
+    python benchmarks/load_test.py --videos 20000 --concurrency 8 --output results.json
+    python benchmarks/load_test.py --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py --baseline benchmarks/baseline.json   # exit 1 on regression
+
+A scenario regresses when its p95 latency grows or its throughput drops by more than ``--tolerance`` (default 25%)
+against the baseline, or when any of its requests fail.
+"""
+import argparse
+import atexit
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'Load-Test-Passw0rd!'
+# Smallest header the storage service accepts as an MP4 container
+MP4_HEADER = b'\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2'
+SCENARIOS = ('register', 'login', 'list_videos', 'get_by_id', 'get_by_share_link', 'upload', 'stream')
+
+
+def configure_environment(work_dir, args):
+    # Must run before the app is created: instance.config reads the environment when it is first imported
+    os.environ.update({
+        'DATABASE_URI': f"sqlite:///{os.path.join(work_dir, 'load-test.sqlite')}",
+        'UPLOAD_FOLDER': os.path.join(work_dir, 'videos'),
+        'LOG_FILE': os.path.join(work_dir, 'load-test.log'),
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING'),
+        'JWT_SECRET_KEY': 'load-test-secret-key-0123456789abcdef',
+        'APP_URL': 'http://localhost',
+        'MAIL_SUPPRESS_SEND': '1',
+        'MAIL_FROM_ADDRESS': 'load-test@example.com',
+        'PASSWORD_HASH_METHOD': args.password_hash_method,
+        # Every client thread shares one address, so the per-client limits would shed most of the load
+        'ADMISSION_ENABLED': '1' if args.admission else '0',
+        # Background faststart and seek indexing would compete with the timed requests
+        'MEDIA_PROCESSING_ENABLED': '0',
+    })
+    os.makedirs(os.environ['UPLOAD_FOLDER'], exist_ok=True)
+
+
+def seed(app, db, users, videos, batch_size=5000):
+    from werkzeug.security import generate_password_hash
+
+    from migration.migrator import Migrator
+    from src.models.UserModel import User
+    from src.models.VideoModel import Video
+
+    with app.app_context():
+        Migrator(db.engine).upgrade(echo=lambda message: None)
+
+        # Every seeded video points at one real file so streaming reads actual bytes
+        video_path = os.path.join(os.environ['UPLOAD_FOLDER'], 'seed.mp4')
+        with open(video_path, 'wb') as video_file:
+            video_file.write(MP4_HEADER + os.urandom(4 * 1024 * 1024))
+        video_size = os.path.getsize(video_path)
+
+        password_hash = generate_password_hash(PASSWORD, method=os.environ['PASSWORD_HASH_METHOD'])
+        user_rows = [{'id': str(uuid.uuid4()), 'username': f'seed{index}', 'email': f'seed{index}@example.com',
+                      'password_hash': password_hash, 'role': 'user'} for index in range(users)]
+        db.session.execute(User.__table__.insert(), user_rows)
+
+        started = datetime.utcnow() - timedelta(seconds=videos)
+        video_rows = []
+        for index in range(videos):
+            created_at = started + timedelta(seconds=index)
+            video_rows.append({
+                'id': str(uuid.uuid4()), 'title': f'Video {index}', 'description': 'Seeded by the load test',
+                'video_url': video_path, 'video_size': video_size, 'share_link': str(uuid.uuid4()),
+                'uploaded_by': user_rows[index % users]['id'], 'shares': 0, 'views': 0, 'processing_status': 'skipped',
+                'created_at': created_at, 'updated_at': created_at,
+            })
+            if len(video_rows) >= batch_size:
+                db.session.execute(Video.__table__.insert(), video_rows)
+                video_rows = []
+        if video_rows:
+            db.session.execute(Video.__table__.insert(), video_rows)
+        db.session.commit()
+
+        return {
+            'users': [(row['id'], row['email']) for row in user_rows],
+            'videos': [(row[0], row[1]) for row in db.session.query(Video.id, Video.share_link).all()],
+        }
+
+
+def token_for(app, user_id):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return create_access_token(identity=user_id)
+
+
+class Scenarios:
+    # Each scenario issues one request and returns (response status, expected statuses)
+    def __init__(self, app, data, upload_size):
+        self.app = app
+        self.data = data
+        self.upload_size = upload_size
+        self.sequence = itertools.count()
+        self.run_id = uuid.uuid4().hex[:8]
+        self.tokens = {}
+
+    def _auth(self, user_id):
+        if user_id not in self.tokens:
+            self.tokens[user_id] = token_for(self.app, user_id)
+        return {'Authorization': 'Bearer ' + self.tokens[user_id]}
+
+    def register(self, client, rng):
+        number = next(self.sequence)
+        response = client.post('/api/v1/register', json={
+            'username': f'load{self.run_id}{number}', 'email': f'load{self.run_id}{number}@example.com',
+            'password': PASSWORD, 'confirm_password': PASSWORD})
+        return response.status_code, (201,)
+
+    def login(self, client, rng):
+        _, email = rng.choice(self.data['users'])
+        response = client.post('/api/v1/login', json={'email': email, 'password': PASSWORD})
+        return response.status_code, (200,)
+
+    def list_videos(self, client, rng):
+        # First page, then follow the cursor a few pages deep like an infinite scroll
+        response = client.get('/api/v1/video?size=20')
+        for _ in range(rng.randint(0, 4)):
+            cursor = response.get_json()['data'].get('next') if response.status_code == 200 else None
+            if not cursor:
+                break
+            response = client.get(f'/api/v1/video?size=20&cursor={cursor}')
+        return response.status_code, (200,)
+
+    def get_by_id(self, client, rng):
+        video_id, _ = rng.choice(self.data['videos'])
+        return client.get(f'/api/v1/video/{video_id}').status_code, (200,)
+
+    def get_by_share_link(self, client, rng):
+        _, share_link = rng.choice(self.data['videos'])
+        return client.get(f'/api/v1/video/share/{share_link}').status_code, (200,)
+
+    def upload(self, client, rng):
+        user_id, _ = rng.choice(self.data['users'])
+        body = MP4_HEADER + rng.randbytes(self.upload_size)
+        response = client.post('/api/v1/video', headers=self._auth(user_id), content_type='multipart/form-data',
+                               data={'title': 'Load test upload', 'file': (io.BytesIO(body), 'upload.mp4')})
+        return response.status_code, (201,)
+
+    def stream(self, client, rng):
+        video_id, _ = rng.choice(self.data['videos'])
+        start = rng.randrange(0, 4 * 1024 * 1024 - 65536)
+        response = client.get(f'/api/v1/video/{video_id}/stream', headers={'Range': f'bytes={start}-{start + 65535}'})
+        response.get_data()
+        return response.status_code, (206,)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(app, scenario, requests, concurrency, warmup, seed_value):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker(worker_index):
+        client = app.test_client()
+        rng = random.Random(seed_value + worker_index)
+        for _ in range(warmup):
+            scenario(client, rng)
+        barrier.wait()
+        while next(counter) < requests:
+            started = time.perf_counter()
+            try:
+                status, expected = scenario(client, rng)
+                failure = None if status in expected else f'HTTP {status}'
+            except Exception as e:
+                failure = repr(e)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if failure is not None:
+                    errors.append(failure)
+
+    barrier = threading.Barrier(concurrency + 1)
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = lambda seconds: None if seconds is None else round(seconds * 1000, 3)  # noqa: E731
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'mean_ms': to_ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': to_ms(percentile(latencies, 0.50)),
+        'p95_ms': to_ms(percentile(latencies, 0.95)),
+        'p99_ms': to_ms(percentile(latencies, 0.99)),
+        'max_ms': to_ms(latencies[-1]) if latencies else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    failures = []
+    for name, result in results['scenarios'].items():
+        if result['errors']:
+            failures.append(f"{name}: {result['errors']} failed requests, e.g. {result['error_samples']}")
+        reference = baseline.get('scenarios', {}).get(name)
+        if not reference:
+            continue
+        if reference.get('p95_ms') and result['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            failures.append(f"{name}: p95 {result['p95_ms']}ms vs baseline {reference['p95_ms']}ms")
+        if reference.get('throughput_rps') and result['throughput_rps'] < reference['throughput_rps'] * (1 - tolerance):
+            failures.append(f"{name}: {result['throughput_rps']} req/s vs baseline {reference['throughput_rps']} req/s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--videos', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per thread before each scenario')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--upload-size', type=int, default=256 * 1024)
+    parser.add_argument('--password-hash-method', default='scrypt')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='fail if results regress against this results file')
+    parser.add_argument('--save-baseline', help='write the results to this file to use as a future baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--admission', action='store_true',
+                        help='keep admission control on; rejected requests (429/503) count as errors')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary database and upload folder')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='video-platform-load-')
+    if not args.keep:
+        # Registered before the app is created so it runs after the app's own exit hooks (counter flush, mail)
+        atexit.register(shutil.rmtree, work_dir, True)
+    configure_environment(work_dir, args)
+
+    from app import create_app
+    from migration.Base import db
+
+    app = create_app()
+    print(f'Seeding {args.users} users and {args.videos} videos in {work_dir}', file=sys.stderr)
+    data = seed(app, db, args.users, args.videos)
+    scenarios = Scenarios(app, data, args.upload_size)
+
+    results = {
+        'environment': {
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'users': args.users, 'videos': args.videos, 'concurrency': args.concurrency,
+            'requests': args.requests, 'password_hash_method': args.password_hash_method,
+            'admission': args.admission,
+        },
+        'scenarios': {},
+    }
+    for name in args.scenarios:
+        result = run_scenario(app, getattr(scenarios, name), args.requests, args.concurrency, args.warmup, args.seed)
+        results['scenarios'][name] = result
+        print(f"{name:<18} {result['throughput_rps']:>9} req/s  p50 {result['p50_ms']:>8}ms  "
+              f"p95 {result['p95_ms']:>8}ms  p99 {result['p99_ms']:>8}ms  errors {result['errors']}",
+              file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            baseline_file.write(output + '\n')
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    failures = compare(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f'REGRESSION {failure}', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Login throughput of PasswordHashService against the number of pool workers.
+
+Runs ``--requests`` verifications from ``--concurrency`` threads (standing in for request threads of one web worker)
+for each worker count, and reports verifications per second. ``workers=0`` is the old behaviour of hashing on the
+request thread.
+
+    python benchmarks/password_hash_benchmark.py --method scrypt --workers 0 1 2 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.PasswordHashService import PasswordHashService  # noqa: E402
+
+
+def run(service, password_hash, requests, concurrency):
+    # Warm the pool so process start-up is not part of the measurement
+    service.verify(password_hash, 'secret')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: service.verify(password_hash, 'secret'), range(requests)))
+    elapsed = time.perf_counter() - started
+
+    assert all(results)
+    return {'workers': service.workers, 'seconds': round(elapsed, 3), 'logins_per_second': round(requests / elapsed, 1)}
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--method', default='scrypt')
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({0, 1, max(cpu_count // 2, 1), cpu_count}))
+    args = parser.parse_args()
+
+    service = PasswordHashService()
+    service.configure(args.method, workers=0)
+    password_hash = service.hash('secret')
+
+    results = []
+    for workers in args.workers:
+        service.configure(args.method, workers=workers, max_pending=args.concurrency, timeout=300)
+        result = run(service, password_hash, args.requests, args.concurrency)
+        results.append(result)
+        print(f"workers={result['workers']:<3} {result['logins_per_second']:>8} logins/s", file=sys.stderr)
+
+    print(json.dumps({'method': args.method, 'cpu_count': cpu_count, 'requests': args.requests,
+                      'concurrency': args.concurrency, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
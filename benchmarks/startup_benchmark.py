@@ -0,0 +1,133 @@
+"""
+Worker start-up time: building the app in every worker against forking workers from a preloaded app.
+
+``cold`` starts ``--workers`` interpreters at once that each import and build the app and answer one request, as a
+server without preloading (or each test process) does. ``preload`` builds the app once and then forks the workers,
+which only have to answer their first request. Times are wall-clock from process start (or fork) to the first
+response; ``ready`` is when the slowest worker answered.
+
+    python benchmarks/startup_benchmark.py --workers 4 --rounds 3
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PROBE = '/api/v1/health/'
+
+COLD_WORKER = f'''
+import sys, time
+from app import create_app
+response = create_app().test_client().get({PROBE!r})
+assert response.status_code == 200, response.status_code
+sys.stdout.write(repr(time.time()))
+'''
+
+
+def configure_environment(work_dir):
+    os.environ.update({
+        'DATABASE_URI': f"sqlite:///{os.path.join(work_dir, 'startup.sqlite')}",
+        'UPLOAD_FOLDER': os.path.join(work_dir, 'videos'),
+        'LOG_FILE': os.path.join(work_dir, 'startup.log'),
+        'LOG_LEVEL': 'WARNING',
+        'SEARCH_SNAPSHOT_PATH': os.path.join(work_dir, 'search.json'),
+        'JWT_SECRET_KEY': 'startup-benchmark-secret-key-0123456789',
+        'APP_URL': 'http://localhost',
+        'MAIL_SUPPRESS_SEND': '1',
+    })
+    os.makedirs(os.environ['UPLOAD_FOLDER'], exist_ok=True)
+
+
+def summarize(mode, seconds):
+    return {'mode': mode, 'workers': len(seconds), 'mean_seconds': round(statistics.mean(seconds), 3),
+            'ready_seconds': round(max(seconds), 3)}
+
+
+def run_cold(workers):
+    started = time.time()
+    processes = [subprocess.Popen([sys.executable, '-c', COLD_WORKER], cwd=ROOT, stdout=subprocess.PIPE)
+                 for _ in range(workers)]
+    seconds = []
+    for process in processes:
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            raise SystemExit('A cold worker failed to start')
+        seconds.append(float(output) - started)
+    return seconds
+
+
+def run_preload(app, workers):
+    started = time.time()
+    pipes = []
+    for _ in range(workers):
+        read_end, write_end = os.pipe()
+        if os.fork() == 0:
+            os.close(read_end)
+            response = app.test_client().get(PROBE)
+            os.write(write_end, repr(time.time() if response.status_code == 200 else -1).encode())
+            os._exit(0)
+        os.close(write_end)
+        pipes.append(read_end)
+
+    seconds = []
+    for read_end in pipes:
+        answered = float(os.read(read_end, 64))
+        os.close(read_end)
+        if answered < 0:
+            raise SystemExit('A forked worker failed to answer')
+        seconds.append(answered - started)
+    while True:
+        try:
+            os.wait()
+        except ChildProcessError:
+            break
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='video-platform-startup-')
+    try:
+        configure_environment(work_dir)
+
+        # The master builds the app once, the way gunicorn's preload_app does
+        started = time.perf_counter()
+        from app import create_app
+        app = create_app()
+        build_seconds = time.perf_counter() - started
+
+        from migration.Base import db
+        from migration.migrator import Migrator
+        with app.app_context():
+            Migrator(db.engine).upgrade(echo=lambda message: None)
+
+        results = []
+        for _ in range(args.rounds):
+            results.append(summarize('cold', run_cold(args.workers)))
+            results.append(summarize('preload', run_preload(app, args.workers)))
+        for mode in ('cold', 'preload'):
+            runs = [result for result in results if result['mode'] == mode]
+            print(f"{mode:<8} mean {statistics.median(r['mean_seconds'] for r in runs):>7.3f}s per worker  "
+                  f"all {args.workers} ready {statistics.median(r['ready_seconds'] for r in runs):>7.3f}s",
+                  file=sys.stderr)
+
+        print(json.dumps({'cpu_count': os.cpu_count(), 'workers': args.workers,
+                          'master_build_seconds': round(build_seconds, 3), 'results': results}, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
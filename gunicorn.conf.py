@@ -0,0 +1,27 @@
+# Production server settings: `gunicorn -c gunicorn.conf.py wsgi:app`
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# The app is imported and built once in the master process; workers are forked from it ready to serve, and each
+# one starts its own database connections and background threads on its first request
+preload_app = True
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Threads keep a worker responsive while other requests stream video or wait on the database; keep
+# DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW at or above this. Admission control caps each expensive route at its
+# concurrency plus queue (at most 7 by default), so there are threads left for the others
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Recycling a worker is cheap with a preloaded app; jitter keeps them from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+# The app writes its own JSON access log
+accesslog = None
@@ -0,0 +1,136 @@
+import math
+from collections import namedtuple
+
+from flask import g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from src.utils.metrics import MetricsRegistry
+from src.utils.rateLimit import ConcurrencyLimiter, TokenBuckets
+from src.utils.responseEntity import error_response
+
+# Per-endpoint limits, per process. ``concurrency`` requests run at once and ``queue`` more wait for a slot;
+# ``client_rate``/``client_burst`` and ``user_rate``/``user_burst`` are token buckets (requests per second) by client
+# address and by authenticated user. ADMISSION_LIMITS overrides single keys or whole endpoints (null removes one).
+DEFAULT_LIMITS = {
+    # Password hashing
+    'auth.register': {'concurrency': 2, 'queue': 2, 'client_rate': 0.2, 'client_burst': 5},
+    'auth.login': {'concurrency': 2, 'queue': 2, 'client_rate': 1, 'client_burst': 10},
+    # Uploads hold a thread while the body is stored
+    'video.create_video': {'concurrency': 2, 'queue': 1, 'user_rate': 0.2, 'user_burst': 5},
+    'upload.append_upload_chunk': {'concurrency': 2, 'queue': 1, 'user_rate': 5, 'user_burst': 20},
+    # Shares feed the trending score; each user's first share of a video counts, this caps the writes
+    'video.share_video': {'client_rate': 1, 'client_burst': 10, 'user_rate': 0.5, 'user_burst': 10},
+    # Listings and search
+    'video.get_videos': {'concurrency': 3, 'queue': 4, 'client_rate': 20, 'client_burst': 40},
+    'video.get_videos_by_user_id': {'concurrency': 3, 'queue': 4, 'client_rate': 20, 'client_burst': 40},
+    'video.search_videos': {'concurrency': 3, 'queue': 4, 'client_rate': 10, 'client_burst': 20},
+}
+
+LIMIT_KEYS = {'concurrency', 'queue', 'queue_timeout', 'client_rate', 'client_burst', 'user_rate', 'user_burst'}
+
+AdmissionRule = namedtuple('AdmissionRule', ['limiter', 'queue_timeout', 'client_buckets', 'user_buckets'])
+
+metrics = MetricsRegistry()
+admission_rejected = metrics.counter('admission_rejected_total', 'Requests turned away by admission control',
+                                     ('endpoint', 'reason'))
+admission_in_flight = metrics.gauge('admission_in_flight', 'Requests holding a concurrency slot', ('endpoint',))
+admission_queue_depth = metrics.gauge('admission_queue_depth', 'Requests waiting for a concurrency slot',
+                                      ('endpoint',))
+
+_rules = {}
+
+
+def merge_limits(overrides):
+    limits = {endpoint: dict(spec) for endpoint, spec in DEFAULT_LIMITS.items()}
+    for endpoint, spec in (overrides or {}).items():
+        if spec is None:
+            limits.pop(endpoint, None)
+            continue
+        unknown = set(spec) - LIMIT_KEYS
+        if unknown:
+            raise ValueError(f"ADMISSION_LIMITS for {endpoint}: unknown keys {', '.join(sorted(unknown))}")
+        limits.setdefault(endpoint, {}).update(spec)
+    return limits
+
+
+def build_rule(spec, queue_timeout):
+    limiter = ConcurrencyLimiter(spec['concurrency'], spec.get('queue', 0)) if spec.get('concurrency') else None
+    client_buckets = user_buckets = None
+    if spec.get('client_rate'):
+        client_buckets = TokenBuckets(spec['client_rate'], spec.get('client_burst', spec['client_rate']))
+    if spec.get('user_rate'):
+        user_buckets = TokenBuckets(spec['user_rate'], spec.get('user_burst', spec['user_rate']))
+    return AdmissionRule(limiter, spec.get('queue_timeout', queue_timeout), client_buckets, user_buckets)
+
+
+def _reject(endpoint, reason, status_code, retry_after):
+    admission_rejected.inc(endpoint, reason)
+    message = 'Too many requests' if status_code == 429 else 'Server is busy'
+    body, status_code = error_response(f'{message}, retry in {retry_after}s', status_code=status_code)
+    return body, status_code, {'Retry-After': str(retry_after)}
+
+
+def _user():
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None  # invalid tokens are rejected by the view itself
+
+
+def _collect_depths():
+    for endpoint, rule in _rules.items():
+        if rule.limiter is not None:
+            admission_in_flight.set(rule.limiter.active, endpoint)
+            admission_queue_depth.set(rule.limiter.waiting, endpoint)
+
+
+def setup_admission(app):
+    """
+    Reject requests to busy or over-used endpoints before their view runs: 429 when a client or user is over its
+    rate, 503 when the endpoint's concurrency slots and queue are taken. Both carry ``Retry-After``. The app never
+    reads a rejected upload, but the server still drains it to reuse the connection. Call after the blueprints are
+    registered.
+    """
+    if not app.config.get('ADMISSION_ENABLED', True):
+        return
+    limits = merge_limits(app.config.get('ADMISSION_LIMITS'))
+    unknown = set(limits) - set(app.view_functions)
+    if unknown:
+        app.logger.warning(f"ADMISSION_LIMITS names unknown endpoints: {', '.join(sorted(unknown))}")
+
+    queue_timeout = app.config.get('ADMISSION_QUEUE_TIMEOUT', 2)
+    retry_after = app.config.get('ADMISSION_RETRY_AFTER', 1)
+    rules = {endpoint: build_rule(spec, queue_timeout) for endpoint, spec in limits.items()}
+    _rules.clear()
+    _rules.update(rules)
+    metrics.register_collector(_collect_depths)
+
+    @app.before_request
+    def admit_request():
+        endpoint = request.endpoint
+        rule = rules.get(endpoint)
+        if rule is None or request.method == 'OPTIONS':
+            return None
+
+        if rule.client_buckets is not None:
+            wait = rule.client_buckets.take(request.remote_addr or 'unknown')
+            if wait:
+                return _reject(endpoint, 'client_rate', 429, math.ceil(wait))
+        if rule.user_buckets is not None:
+            user = _user()
+            wait = rule.user_buckets.take(user) if user else 0
+            if wait:
+                return _reject(endpoint, 'user_rate', 429, math.ceil(wait))
+
+        if rule.limiter is not None:
+            if not rule.limiter.acquire(rule.queue_timeout):
+                return _reject(endpoint, 'busy', 503, retry_after)
+            g.admission_slot = rule.limiter
+        return None
+
+    @app.teardown_request
+    def release_admission_slot(error):
+        limiter = g.pop('admission_slot', None)
+        if limiter is not None:
+            limiter.release()
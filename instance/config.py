@@ -1,3 +1,4 @@
+import json
 import os
 from datetime import timedelta
 
@@ -6,15 +7,108 @@ class Config:
     # Database URL
     DATABASE_URI = os.environ.get('DATABASE_URI')
 
+    # Connection pool, per engine and per process (SQLite ignores the size settings)
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 5))
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', 10))
+    DATABASE_POOL_TIMEOUT = float(os.environ.get('DATABASE_POOL_TIMEOUT', 30))
+    DATABASE_POOL_RECYCLE = int(os.environ.get('DATABASE_POOL_RECYCLE', 1800))
+    DATABASE_POOL_PRE_PING = os.environ.get('DATABASE_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes', 'on')
+
+    # Read replicas (comma-separated URLs) and how long a client's reads stay on the primary after it writes
+    DATABASE_REPLICA_URIS = [uri.strip() for uri in os.environ.get('DATABASE_REPLICA_URIS', '').split(',')
+                             if uri.strip()]
+    DATABASE_STICKY_SECONDS = float(os.environ.get('DATABASE_STICKY_SECONDS', 5))
+
     # Flask Environment
     FLASK_ENV = os.environ.get('FLASK_ENV')
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES_DAYS', 1)))
     APP_URL = os.environ.get('APP_URL')
 
+    # JSON encoder for responses: 'orjson' (used when installed) or 'default'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson').lower()
+
+    # Logging
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    LOG_FILE = os.environ.get('LOG_FILE', './storage/log/video-platform.log')
+    LOG_FILE_MAX_BYTES = int(os.environ.get('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024))
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    LOG_SAMPLE_ROUTES = [route for route in os.environ.get('LOG_SAMPLE_ROUTES', '/api/v1/health').split(',') if route]
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))
+
+    # Password Hashing
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 0)) or None
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Background faststart and metadata extraction for uploaded videos
+    MEDIA_PROCESSING_ENABLED = os.environ.get('MEDIA_PROCESSING_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'on')
+    MEDIA_PROCESSING_INTERVAL = float(os.environ.get('MEDIA_PROCESSING_INTERVAL', 60))
+    MEDIA_PROCESSING_BATCH_SIZE = int(os.environ.get('MEDIA_PROCESSING_BATCH_SIZE', 10))
+    MEDIA_PROCESSING_LEASE = float(os.environ.get('MEDIA_PROCESSING_LEASE', 1800))
+
     # Upload Folder
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'static/videos')
 
+    # Reclaiming deleted and orphaned files
+    STORAGE_RECLAIM_INTERVAL = float(os.environ.get('STORAGE_RECLAIM_INTERVAL', 30))
+    STORAGE_RECLAIM_GRACE = float(os.environ.get('STORAGE_RECLAIM_GRACE', 300))
+    STORAGE_RECONCILE_INTERVAL = float(os.environ.get('STORAGE_RECONCILE_INTERVAL', 3600))
+    STORAGE_RECONCILE_BATCH_SIZE = int(os.environ.get('STORAGE_RECONCILE_BATCH_SIZE', 1000))
+    STORAGE_RECONCILE_MODE = os.environ.get('STORAGE_RECONCILE_MODE', 'report').lower()
+
+    # Expired token and upload session cleanup
+    EXPIRY_SWEEP_INTERVAL = float(os.environ.get('EXPIRY_SWEEP_INTERVAL', 300))
+    EXPIRY_SWEEP_BATCH_SIZE = int(os.environ.get('EXPIRY_SWEEP_BATCH_SIZE', 500))
+    EXPIRY_SWEEP_MAX_BATCHES = int(os.environ.get('EXPIRY_SWEEP_MAX_BATCHES', 20))
+    EXPIRY_SWEEP_PAUSE = float(os.environ.get('EXPIRY_SWEEP_PAUSE', 0.05))
+
+    # Admission control: per-endpoint concurrency and rate limits (see instance/admission.py for the defaults)
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'on')
+    ADMISSION_LIMITS = json.loads(os.environ.get('ADMISSION_LIMITS') or '{}')
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 2))
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 1))
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto are trusted; 0 uses the socket's peer address
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+
+    # Video Listings
+    VIDEO_PAGE_SIZE_MAX = int(os.environ.get('VIDEO_PAGE_SIZE_MAX', 100))
+    VIDEO_BATCH_MAX = int(os.environ.get('VIDEO_BATCH_MAX', 100))
+
+    # Full-text search index
+    SEARCH_SNAPSHOT_PATH = os.environ.get('SEARCH_SNAPSHOT_PATH', './storage/search/videos.json')
+    SEARCH_SNAPSHOT_INTERVAL = float(os.environ.get('SEARCH_SNAPSHOT_INTERVAL', 300))
+    SEARCH_REFRESH_INTERVAL = float(os.environ.get('SEARCH_REFRESH_INTERVAL', 30))
+
+    # Trending videos
+    TRENDING_TOP_K = int(os.environ.get('TRENDING_TOP_K', 200))
+    TRENDING_SNAPSHOT_PATH = os.environ.get('TRENDING_SNAPSHOT_PATH', './storage/trending/scores.json')
+    TRENDING_SNAPSHOT_INTERVAL = float(os.environ.get('TRENDING_SNAPSHOT_INTERVAL', 60))
+
+    # Video Metadata Cache
+    VIDEO_CACHE_MAXSIZE = int(os.environ.get('VIDEO_CACHE_MAXSIZE', 10000))
+    VIDEO_CACHE_TTL = float(os.environ.get('VIDEO_CACHE_TTL', 60))
+
+    # Authenticated user cache
+    PRINCIPAL_CACHE_MAXSIZE = int(os.environ.get('PRINCIPAL_CACHE_MAXSIZE', 10000))
+    PRINCIPAL_CACHE_TTL = float(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
+
+    # Revoked (logged-out) access tokens
+    TOKEN_REVOCATION_REFRESH_INTERVAL = float(os.environ.get('TOKEN_REVOCATION_REFRESH_INTERVAL', 5))
+    TOKEN_REVOCATION_REBUILD_INTERVAL = float(os.environ.get('TOKEN_REVOCATION_REBUILD_INTERVAL', 3600))
+    TOKEN_REVOCATION_CAPACITY = int(os.environ.get('TOKEN_REVOCATION_CAPACITY', 100000))
+    TOKEN_REVOCATION_ERROR_RATE = float(os.environ.get('TOKEN_REVOCATION_ERROR_RATE', 0.01))
+
+    # View and Share Counters
+    COUNTER_FLUSH_INTERVAL = float(os.environ.get('COUNTER_FLUSH_INTERVAL', 5))
+    COUNTER_MAX_PENDING = int(os.environ.get('COUNTER_MAX_PENDING', 10000))
+
+    # Resumable Uploads
+    UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 10 * 1024 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+    UPLOAD_SESSION_EXPIRES_HOURS = int(os.environ.get('UPLOAD_SESSION_EXPIRES_HOURS', 24))
+
     # Mail Server Configuration
     MAIL_MAILER = os.environ.get('MAIL_MAILER', 'smtp')
     MAIL_HOST = os.environ.get('MAIL_HOST', 'smtp.gmail.com')
@@ -24,3 +118,11 @@ class Config:
     MAIL_ENCRYPTION = os.environ.get('MAIL_ENCRYPTION', 'TLS')
     MAIL_FROM_ADDRESS = os.environ.get('MAIL_FROM_ADDRESS')
     MAIL_FROM_NAME = os.environ.get('MAIL_FROM_NAME', '${APP_NAME}')
+    MAIL_SUPPRESS_SEND = os.environ.get('MAIL_SUPPRESS_SEND', 'false').lower() in ('1', 'true', 'yes')
+
+    # Background Mail Dispatch
+    MAIL_QUEUE_SIZE = int(os.environ.get('MAIL_QUEUE_SIZE', 1000))
+    MAIL_WORKERS = int(os.environ.get('MAIL_WORKERS', 2))
+    MAIL_BATCH_SIZE = int(os.environ.get('MAIL_BATCH_SIZE', 50))
+    MAIL_MAX_RETRIES = int(os.environ.get('MAIL_MAX_RETRIES', 5))
+    MAIL_RETRY_BACKOFF = float(os.environ.get('MAIL_RETRY_BACKOFF', 2.0))
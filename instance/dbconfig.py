@@ -1,6 +1,28 @@
 from instance.config import Config
+from migration.routing import REPLICA_BIND_PREFIX
+
+
+def engine_options(uri):
+    options = {
+        'pool_pre_ping': Config.DATABASE_POOL_PRE_PING,
+        'pool_recycle': Config.DATABASE_POOL_RECYCLE,
+    }
+    # SQLite uses a static or per-thread pool that takes no size settings
+    if uri and not uri.startswith('sqlite'):
+        options.update(
+            pool_size=Config.DATABASE_POOL_SIZE,
+            max_overflow=Config.DATABASE_MAX_OVERFLOW,
+            pool_timeout=Config.DATABASE_POOL_TIMEOUT,
+        )
+    return options
 
 
 class DbConfig:
     SQLALCHEMY_DATABASE_URI = Config.DATABASE_URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.DATABASE_URI)
+
+    # Replicas are extra binds with no models of their own; RoutingSession sends read-only queries to them
+    SQLALCHEMY_BINDS = {f'{REPLICA_BIND_PREFIX}{index}': {'url': uri, **engine_options(uri)}
+                        for index, uri in enumerate(Config.DATABASE_REPLICA_URIS)}
+    DATABASE_STICKY_SECONDS = Config.DATABASE_STICKY_SECONDS
@@ -1,11 +1,148 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+# Attributes every LogRecord has; anything else was passed through ``extra`` and is written as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    # Runs on the request thread, where flask.g is still available, and copies request fields onto the record
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = getattr(g, 'request_id', None)
+            record.method = request.method
+            record.route = request.url_rule.rule if request.url_rule is not None else request.path
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps only a fraction of INFO-and-below records for noisy routes; warnings and errors always pass
+    def __init__(self, routes, rate):
+        super().__init__()
+        self.routes = tuple(routes)
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or not self.routes:
+            return True
+        if getattr(record, 'status', 200) >= 400:
+            return True
+        route = getattr(record, 'route', None)
+        if route is None or not route.startswith(self.routes):
+            return True
+        return random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never waits: when the queue is full the record is dropped and counted, so a slow disk
+    cannot stall a request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Resolve the message and traceback here; the listener thread formats the rest as JSON
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        record.stack_info = None
+        return record
 
 
 def setup_logging(app):
-    log_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-    log_handler = RotatingFileHandler('./storage/log/video-platform.log', maxBytes=1024 * 1024, backupCount=5)
-    log_handler.setFormatter(log_formatter)
-    app.logger.addHandler(log_handler)
+    formatter = JsonFormatter()
+    log_file = app.config.get('LOG_FILE', './storage/log/video-platform.log')
+    file_handler = RotatingFileHandler(log_file, maxBytes=app.config.get('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024),
+                                       backupCount=app.config.get('LOG_FILE_BACKUP_COUNT', 5))
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    queue_size = app.config.get('LOG_QUEUE_SIZE', 10000)
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(SamplingFilter(app.config.get('LOG_SAMPLE_ROUTES', ['/api/v1/health']),
+                                           app.config.get('LOG_SAMPLE_RATE', 0.01)))
+
+    listener = QueueListener(queue_handler.queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    def restart_listener():
+        # The listener thread does not survive fork(); children get a fresh queue and thread
+        queue_handler.queue = listener.queue = queue.Queue(maxsize=queue_size)
+        listener._thread = None
+        listener.start()
+
+    os.register_at_fork(after_in_child=restart_listener)
+
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(queue_handler)
+    app.logger.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+    app.extensions['log_queue_handler'] = queue_handler
+
+    access_logger = app.logger.getChild('access')
+
+    @app.before_request
+    def start_request_log():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def write_request_log(response):
+        latency_ms = round((time.perf_counter() - g.request_started) * 1000, 2)
+        level = logging.ERROR if response.status_code >= 500 else logging.INFO
+        access_logger.log(level, 'request', extra={'status': response.status_code, 'latency_ms': latency_ms})
+        response.headers['X-Request-ID'] = g.request_id
+        g.request_logged = True
+        return response
+
+    @app.teardown_request
+    def write_failed_request_log(error):
+        # after_request does not run for unhandled exceptions
+        if error is not None and not g.get('request_logged') and 'request_started' in g:
+            latency_ms = round((time.perf_counter() - g.request_started) * 1000, 2)
+            access_logger.error('request', extra={'status': 500, 'latency_ms': latency_ms,
+                                                  'error': repr(error)})
 
     app.config['PROPAGATE_EXCEPTIONS'] = True
@@ -0,0 +1,98 @@
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from src.utils.metrics import SIZE_BUCKETS, MetricsRegistry
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter('http_requests_total', 'HTTP requests handled', ('method', 'route', 'status'))
+http_latency = metrics.histogram('http_request_duration_seconds', 'Time to build the response',
+                                 ('method', 'route'))
+http_in_flight = metrics.gauge('http_requests_in_flight', 'Requests currently being handled')
+http_request_size = metrics.histogram('http_request_size_bytes', 'Request body size', ('method', 'route'),
+                                      buckets=SIZE_BUCKETS)
+http_response_size = metrics.histogram('http_response_size_bytes', 'Response body size', ('method', 'route'),
+                                       buckets=SIZE_BUCKETS)
+sql_statements = metrics.counter('sql_statements_total', 'SQL statements executed')
+sql_duration = metrics.counter('sql_statement_duration_seconds_total', 'Time spent executing SQL statements')
+request_sql_statements = metrics.histogram('http_request_sql_statements', 'SQL statements per request',
+                                           ('method', 'route'), buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+request_sql_duration = metrics.histogram('http_request_sql_duration_seconds', 'SQL time per request',
+                                         ('method', 'route'))
+
+
+def _route():
+    # The URL rule keeps label cardinality bounded (/api/v1/video/<video_id>, not one series per id)
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def setup_metrics(app, db):
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_duration = 0.0
+        http_in_flight.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_started' not in g:
+            return response
+        route = _route()
+        http_requests.inc(request.method, route, response.status_code)
+        http_latency.observe(time.perf_counter() - g.metrics_started, request.method, route)
+        http_request_size.observe(request.content_length or 0, request.method, route)
+        # Streamed responses without a Content-Length are not counted here; stream byte counters cover them
+        if response.content_length is not None:
+            http_response_size.observe(response.content_length, request.method, route)
+        request_sql_statements.observe(g.sql_statements, request.method, route)
+        request_sql_duration.observe(g.sql_duration, request.method, route)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(error):
+        if g.pop('metrics_started', None) is None:
+            return
+        http_in_flight.dec()
+        if error is not None:
+            http_requests.inc(request.method, _route(), 500)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['metrics_started'].pop()
+        elapsed = time.perf_counter() - started
+        sql_statements.inc()
+        sql_duration.inc(amount=elapsed)
+        if has_request_context() and 'sql_statements' in g:
+            g.sql_statements += 1
+            g.sql_duration += elapsed
+
+    def handle_error(context):
+        # after_cursor_execute does not run for failed statements
+        if context.connection is not None and context.connection.info.get('metrics_started'):
+            context.connection.info['metrics_started'].pop()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+            event.listen(engine, 'handle_error', handle_error)
+
+
+def register_collectors(gauges=None, counters=None):
+    """
+    Register ``{metric name: (documentation, callable)}`` metrics that are read on every scrape. ``counters`` are
+    running totals that only grow (until the process restarts) and must be named ``*_total``.
+    """
+    for name, (documentation, read) in (gauges or {}).items():
+        gauge = metrics.gauge(name, documentation)
+        metrics.register_collector(lambda gauge=gauge, read=read: gauge.set(read()))
+    for name, (documentation, read) in (counters or {}).items():
+        if not name.endswith('_total'):
+            raise ValueError(f'Counter {name} must be named *_total')
+        counter = metrics.counter(name, documentation)
+        metrics.register_collector(lambda counter=counter, read=read: counter.set_total(read()))
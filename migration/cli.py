@@ -0,0 +1,51 @@
+import click
+from flask.cli import with_appcontext
+
+from migration.Base import db
+from migration.migrator import Migrator, load_migrations
+from migration.queryplan import check_hot_queries
+
+
+@click.group('db', help='Database schema migrations.')
+def db_cli():
+    pass
+
+
+@db_cli.command('upgrade')
+@click.option('--target', type=int, default=None, help='Stop after this migration version.')
+@with_appcontext
+def upgrade(target):
+    """Apply pending migrations."""
+    applied = Migrator(db.engine).upgrade(target, echo=click.echo)
+    if not applied:
+        click.echo('Database is up to date.')
+
+
+@db_cli.command('status')
+@with_appcontext
+def status():
+    """Show applied and pending migrations."""
+    migrator = Migrator(db.engine)
+    applied = migrator.applied_versions()
+    for module in load_migrations():
+        state = 'applied' if module.version in applied else 'pending'
+        click.echo(f'{module.version:04d} [{state}] {module.description}')
+
+
+@db_cli.command('check')
+@with_appcontext
+def check():
+    """Fail if a hot query would need a full table scan."""
+    pending = Migrator(db.engine).pending()
+    if pending:
+        click.echo(f'{len(pending)} migration(s) pending; run `flask db upgrade` first.', err=True)
+        raise SystemExit(1)
+
+    failures = check_hot_queries(db.engine)
+    for name, plan in failures:
+        click.echo(f'FULL SCAN: {name}', err=True)
+        for line in plan:
+            click.echo(f'    {line}', err=True)
+    if failures:
+        raise SystemExit(1)
+    click.echo('All hot queries use an index.')
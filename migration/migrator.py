@@ -0,0 +1,73 @@
+import importlib
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+
+import migration.versions
+
+# Kept outside db.metadata so it is never mistaken for a model table
+schema_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', schema_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def import_models():
+    # Register every model on db.metadata before migrations look at it
+    import src.models.UserModel
+    import src.models.VideoModel
+    import src.models.ResetPasswordTokenModel
+    import src.models.EmailVerificationModel
+    import src.models.UploadSessionModel
+    import src.models.VideoCounterModel
+    import src.models.RevokedTokenModel
+    import src.models.VideoShareModel
+
+
+def load_migrations():
+    migrations = []
+    for module_info in pkgutil.iter_modules(migration.versions.__path__):
+        module = importlib.import_module(f'migration.versions.{module_info.name}')
+        migrations.append(module)
+
+    migrations.sort(key=lambda module: module.version)
+    versions = [module.version for module in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f'Duplicate migration versions: {versions}')
+    return migrations
+
+
+class Migrator:
+    def __init__(self, engine):
+        self.engine = engine
+        import_models()
+
+    def applied_versions(self):
+        schema_metadata.create_all(self.engine, checkfirst=True)
+        with self.engine.connect() as connection:
+            return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+    def pending(self):
+        applied = self.applied_versions()
+        return [module for module in load_migrations() if module.version not in applied]
+
+    def current_version(self):
+        return max(self.applied_versions(), default=0)
+
+    def upgrade(self, target=None, echo=print):
+        applied = []
+        for module in self.pending():
+            if target is not None and module.version > target:
+                break
+            # Each migration commits on its own so a failure leaves earlier versions recorded
+            with self.engine.begin() as connection:
+                module.upgrade(connection)
+                connection.execute(schema_migrations.insert().values(
+                    version=module.version, description=module.description, applied_at=datetime.utcnow()))
+            echo(f'Applied migration {module.version:04d}: {module.description}')
+            applied.append(module.version)
+        return applied
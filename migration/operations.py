@@ -0,0 +1,31 @@
+from sqlalchemy import Index, MetaData, Table, inspect
+
+
+def reflect_table(connection, table_name):
+    return Table(table_name, MetaData(), autoload_with=connection)
+
+
+def has_column(connection, table_name, column_name):
+    return any(column['name'] == column_name for column in inspect(connection).get_columns(table_name))
+
+
+def has_index(connection, table_name, index_name):
+    return any(index['name'] == index_name for index in inspect(connection).get_indexes(table_name))
+
+
+def add_column_if_missing(connection, table_name, column):
+    if has_column(connection, table_name, column.name):
+        return False
+    column_type = column.type.compile(dialect=connection.dialect)
+    preparer = connection.dialect.identifier_preparer
+    connection.exec_driver_sql(
+        f'ALTER TABLE {preparer.quote(table_name)} ADD COLUMN {preparer.quote(column.name)} {column_type}')
+    return True
+
+
+def create_index_if_missing(connection, table_name, index_name, column_names, unique=False):
+    if has_index(connection, table_name, index_name):
+        return False
+    table = reflect_table(connection, table_name)
+    Index(index_name, *[table.c[name] for name in column_names], unique=unique).create(connection)
+    return True
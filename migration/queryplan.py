@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+
+
+def hot_queries():
+    """
+    Representative statements for the lookups VideoService and AuthService run on every request.
+    Keep in sync with the services when a query shape changes.
+    """
+    from src.models.EmailVerificationModel import EmailVerification
+    from src.models.ResetPasswordTokenModel import PasswordResetToken
+    from src.models.RevokedTokenModel import RevokedToken
+    from src.models.UploadSessionModel import UploadSession
+    from src.models.UserModel import User
+    from src.models.VideoCounterModel import VideoCounter
+    from src.models.VideoModel import Video
+    from src.models.VideoShareModel import VideoShare
+
+    now = datetime.utcnow()
+    keyset = or_(Video.created_at < now, and_(Video.created_at == now, Video.id < 'id'))
+    newest_first = (Video.created_at.desc(), Video.id.desc())
+
+    return [
+        ('VideoService.get_videos', select(Video).order_by(*newest_first).limit(21)),
+        ('VideoService.get_videos (cursor)', select(Video).where(keyset).order_by(*newest_first).limit(21)),
+        ('VideoService.get_videos_by_user_id',
+         select(Video).where(Video.uploaded_by == 'user').order_by(*newest_first).limit(21)),
+        ('VideoService.get_videos_by_user_id (cursor)',
+         select(Video).where(Video.uploaded_by == 'user', keyset).order_by(*newest_first).limit(21)),
+        ('VideoService.get_video_by_id', select(Video).where(Video.id == 'id')),
+        ('VideoService.get_videos_by_share_id', select(Video).where(Video.share_link == 'link')),
+        ('VideoCounterService.get_total', select(VideoCounter.total).where(VideoCounter.scope == 'all')),
+        ('AuthService.login', select(User).where(User.email == 'user@example.com')),
+        ('AuthService.get_user', select(User).where(User.id == 'id')),
+        ('AuthService.verify_email', select(EmailVerification).where(EmailVerification.token == 'token')),
+        ('AuthService.reset_password', select(PasswordResetToken).where(
+            PasswordResetToken.email == 'user@example.com', PasswordResetToken.token == 'token')),
+        ('TokenRevocationService.is_revoked',
+         select(RevokedToken.jti).where(RevokedToken.jti == 'jti', RevokedToken.expires_at > now)),
+        ('TokenRevocationService._catch_up', select(RevokedToken.jti, RevokedToken.revoked_at).where(
+            RevokedToken.revoked_at >= now, RevokedToken.expires_at > now)),
+        ('FileReclaimerService (references by path)',
+         select(Video.video_url).where(Video.video_url.in_(['path']))),
+        ('FileReclaimerService (references by hash)',
+         select(Video.content_hash).where(Video.content_hash.in_(['hash']))),
+        ('VideoService.share_video / delete (shares)',
+         select(VideoShare.user_id).where(VideoShare.video_id.in_(['id']))),
+        ('MediaProcessingService.process_pending',
+         select(Video.id).where(Video.processing_status == 'pending').limit(10)),
+        ('MediaProcessingService.release_expired_claims', select(Video.id).where(
+            Video.processing_status == 'processing',
+            or_(Video.processing_started_at < now, Video.processing_started_at.is_(None)))),
+        ('ExpirySweeperService (email_verification)', select(EmailVerification.id)
+         .where(EmailVerification.expires_at < now).order_by(EmailVerification.expires_at).limit(500)),
+        ('ExpirySweeperService (password_reset_token)', select(PasswordResetToken.email)
+         .where(PasswordResetToken.expires_at < now).order_by(PasswordResetToken.expires_at).limit(500)),
+        ('ExpirySweeperService (upload_session)', select(UploadSession.id, UploadSession.file_path)
+         .where(UploadSession.expires_at < now).order_by(UploadSession.expires_at).limit(500)),
+        ('ExpirySweeperService (revoked_token)', select(RevokedToken.jti)
+         .where(RevokedToken.expires_at < now).order_by(RevokedToken.expires_at).limit(500)),
+    ]
+
+
+def explain(connection, statement):
+    # Expand IN lists into plain bound parameters so the statement can be explained as-is
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+        return [row[-1] for row in rows]
+    if dialect == 'postgresql':
+        rows = connection.exec_driver_sql(f'EXPLAIN {compiled}', params).fetchall()
+        return [row[0] for row in rows]
+    if dialect in ('mysql', 'mariadb'):
+        result = connection.exec_driver_sql(f'EXPLAIN {compiled}', params)
+        return [dict(zip(result.keys(), row)) for row in result.fetchall()]
+    raise NotImplementedError(f'Query plan check is not supported for {dialect}')
+
+
+def is_full_scan(dialect, plan_line):
+    if dialect == 'sqlite':
+        # "SCAN video" is a table scan; "SCAN video USING INDEX ..." walks an index in order
+        return plan_line.startswith('SCAN ') and ' USING ' not in plan_line
+    if dialect == 'postgresql':
+        return 'Seq Scan' in plan_line
+    return plan_line.get('type') == 'ALL'
+
+
+def check_hot_queries(engine):
+    """Return ``(name, plan)`` for every hot query whose plan contains a full table scan."""
+    failures = []
+    with engine.connect() as connection:
+        if engine.dialect.name == 'postgresql':
+            # Small tables are cheaper to scan, so make the planner show whether an index exists at all
+            connection.exec_driver_sql('SET enable_seqscan = off')
+        for name, statement in hot_queries():
+            plan = explain(connection, statement)
+            if any(is_full_scan(engine.dialect.name, line) for line in plan):
+                failures.append((name, plan))
+        connection.rollback()
+    return failures
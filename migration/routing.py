@@ -0,0 +1,137 @@
+"""
+Read/write routing between the primary database and read replicas.
+
+Replicas are configured as ``SQLALCHEMY_BINDS`` named ``replica_<n>``. Only SELECTs issued inside ``read_only()``
+go to a replica; everything else, and every query of a session that has flushed a write, uses the primary. After a
+commit that wrote something, the client's reads stay on the primary for ``DATABASE_STICKY_SECONDS`` so it sees its
+own writes despite replication lag. Clients are told apart by their ``Authorization`` header, in this process only.
+"""
+import os
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from cachetools import TTLCache
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from src.utils.metrics import MetricsRegistry
+
+REPLICA_BIND_PREFIX = 'replica_'
+
+_read_only = ContextVar('db_read_only', default=False)
+
+metrics = MetricsRegistry()
+routed_reads = metrics.counter('db_routed_reads_total', 'Read-only queries by the engine they were sent to',
+                               ('target',))
+
+
+@contextmanager
+def read_only():
+    """Let SELECTs in this block (or decorated function) read from a replica."""
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+@contextmanager
+def primary():
+    """Force the primary inside a ``read_only()`` block, e.g. for a read whose result is written back."""
+    token = _read_only.set(False)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+class StickyClients:
+    """Clients that wrote recently, keyed by their Authorization header, expiring after the sticky window."""
+
+    def __init__(self, seconds, maxsize=100000):
+        self.seconds = seconds
+        self.maxsize = maxsize
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._clients = TTLCache(maxsize=self.maxsize, ttl=self.seconds) if self.seconds > 0 else None
+
+    def mark(self):
+        if not has_request_context():
+            return
+        g.db_wrote = True  # the rest of this request reads from the primary
+        client = request.headers.get('Authorization')
+        if client and self._clients is not None:
+            with self._lock:
+                self._clients[client] = True
+
+    def is_sticky(self):
+        if not has_request_context():
+            return False
+        if g.get('db_wrote'):
+            return True
+        client = request.headers.get('Authorization')
+        if not client or self._clients is None:
+            return False
+        with self._lock:
+            return client in self._clients
+
+
+def _sticky_clients():
+    extensions = current_app.extensions
+    if 'db_sticky_clients' not in extensions:
+        extensions['db_sticky_clients'] = StickyClients(current_app.config.get('DATABASE_STICKY_SECONDS', 5))
+    return extensions['db_sticky_clients']
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends read-only SELECTs to a replica when one is configured."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _read_only.get() and not self._flushing and getattr(clause, 'is_select', False):
+            engine = self._replica_engine()
+            routed_reads.inc('primary' if engine is None else 'replica')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_engine(self):
+        if self.info.get('db_wrote') or self.new or self.dirty or self.deleted:
+            return None  # this transaction must see its own changes
+        engines = self._db.engines
+        keys = [key for key in engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+        if not keys or _sticky_clients().is_sticky():
+            return None
+        # One replica per session, so a request never mixes two replication positions
+        key = self.info.get('db_replica')
+        if key not in keys:
+            key = self.info['db_replica'] = random.choice(keys)
+        return engines[key]
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    session.info['db_wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _do_orm_execute(orm_execute_state):
+    # Bulk UPDATE/DELETE statements write without a flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info['db_wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    if session.info.pop('db_wrote', False):
+        _sticky_clients().mark()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('db_wrote', None)
@@ -0,0 +1,78 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text
+
+version = 1
+description = 'Create the initial tables'
+
+# The schema as it stood before versioned migrations, frozen here; later versions add to it. Only creates what is
+# missing, so databases built by the old create_all() start from here too.
+metadata = MetaData()
+
+user = Table(
+    'user', metadata,
+    Column('id', String(36), primary_key=True),
+    Column('username', String(50), unique=True, nullable=False),
+    Column('email', String(120), unique=True, nullable=False),
+    Column('password_hash', String(256), nullable=False),
+    Column('role', String(20)),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+)
+
+video = Table(
+    'video', metadata,
+    Column('id', String(36), primary_key=True),
+    Column('title', String(50), nullable=False),
+    Column('description', Text),
+    Column('video_url', String(255), nullable=False),
+    Column('video_size', Integer, nullable=False),
+    Column('share_link', String(255), nullable=False),
+    Column('uploaded_by', String(36), ForeignKey('user.id'), nullable=False),
+    Column('shares', Integer),
+    Column('views', Integer),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+)
+
+email_verification = Table(
+    'email_verification', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', String(36), ForeignKey('user.id'), nullable=False),
+    Column('token', String(255), unique=True, nullable=False),
+    Column('expires_at', DateTime),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+)
+
+password_reset_token = Table(
+    'password_reset_token', metadata,
+    Column('email', String(120), primary_key=True),
+    Column('token', String(255), nullable=False),
+    Column('expires_at', DateTime),
+    Column('created_at', DateTime),
+)
+
+upload_session = Table(
+    'upload_session', metadata,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', String(36), ForeignKey('user.id'), nullable=False),
+    Column('title', String(50), nullable=False),
+    Column('description', Text),
+    Column('filename', String(255), nullable=False),
+    Column('file_path', String(255), nullable=False),
+    Column('upload_length', BigInteger, nullable=False),
+    Column('upload_offset', BigInteger, nullable=False),
+    Column('expires_at', DateTime, nullable=False),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+)
+
+video_counter = Table(
+    'video_counter', metadata,
+    Column('scope', String(64), primary_key=True),
+    Column('total', BigInteger, nullable=False),
+    Column('updated_at', DateTime),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String
+
+from migration.operations import add_column_if_missing
+
+version = 2
+description = 'Add video.content_hash and widen video.video_size to 64 bits'
+
+
+def upgrade(connection):
+    add_column_if_missing(connection, 'video', Column('content_hash', String(64)))
+
+    # SQLite integers are already 64-bit
+    if connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql('ALTER TABLE video ALTER COLUMN video_size TYPE BIGINT')
+    elif connection.dialect.name in ('mysql', 'mariadb'):
+        connection.exec_driver_sql('ALTER TABLE video MODIFY video_size BIGINT NOT NULL')
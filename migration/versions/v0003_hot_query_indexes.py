@@ -0,0 +1,19 @@
+from migration.operations import create_index_if_missing
+
+version = 3
+description = 'Index the columns used by video listings, share links and token lookups'
+
+INDEXES = [
+    # Keyset pagination over the whole catalogue and per uploader
+    ('video', 'ix_video_created_at_id', ['created_at', 'id']),
+    ('video', 'ix_video_uploaded_by_created_at_id', ['uploaded_by', 'created_at', 'id']),
+    ('video', 'ix_video_share_link', ['share_link']),
+    ('video', 'ix_video_content_hash', ['content_hash']),
+    ('email_verification', 'ix_email_verification_expires_at', ['expires_at']),
+    ('password_reset_token', 'ix_password_reset_token_token', ['token']),
+]
+
+
+def upgrade(connection):
+    for table_name, index_name, column_names in INDEXES:
+        create_index_if_missing(connection, table_name, index_name, column_names)
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, Float, Integer, String
+
+from migration.operations import add_column_if_missing, create_index_if_missing
+
+version = 4
+description = 'Add media metadata and processing status columns to video'
+
+COLUMNS = [
+    Column('duration', Float),
+    Column('width', Integer),
+    Column('height', Integer),
+    Column('video_codec', String(16)),
+    Column('audio_codec', String(16)),
+    Column('bitrate', BigInteger),
+    Column('processing_status', String(16)),
+]
+
+
+def upgrade(connection):
+    for column in COLUMNS:
+        add_column_if_missing(connection, 'video', column)
+
+    # Existing videos go through the same post-processing as new uploads
+    connection.exec_driver_sql("UPDATE video SET processing_status = 'pending' WHERE processing_status IS NULL")
+    create_index_if_missing(connection, 'video', 'ix_video_processing_status', ['processing_status'])
@@ -0,0 +1,9 @@
+from migration.operations import create_index_if_missing
+
+version = 5
+description = 'Index video.video_url for file reference checks'
+
+
+def upgrade(connection):
+    # Blobs are shared between videos with identical content; reclaiming one needs to know if any row still uses it
+    create_index_if_missing(connection, 'video', 'ix_video_video_url', ['video_url'])
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, func
+
+version = 6
+description = 'Create revoked_token for logged-out access tokens'
+
+metadata = MetaData()
+
+revoked_token = Table(
+    'revoked_token', metadata,
+    Column('jti', String(64), primary_key=True),
+    Column('user_id', String(36)),
+    Column('expires_at', DateTime, nullable=False),
+    Column('revoked_at', DateTime, nullable=False, server_default=func.current_timestamp()),
+    Index('ix_revoked_token_expires_at', 'expires_at'),
+    Index('ix_revoked_token_revoked_at', 'revoked_at'),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,14 @@
+from migration.operations import create_index_if_missing
+
+version = 7
+description = 'Index expires_at on password reset tokens and upload sessions for the expiry sweeper'
+
+INDEXES = [
+    ('password_reset_token', 'ix_password_reset_token_expires_at', ['expires_at']),
+    ('upload_session', 'ix_upload_session_expires_at', ['expires_at']),
+]
+
+
+def upgrade(connection):
+    for table_name, index_name, column_names in INDEXES:
+        create_index_if_missing(connection, table_name, index_name, column_names)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, DateTime
+
+from migration.operations import add_column_if_missing
+
+version = 8
+description = 'Record when a worker claimed a video for media processing'
+
+
+def upgrade(connection):
+    add_column_if_missing(connection, 'video', Column('processing_started_at', DateTime))
@@ -0,0 +1,10 @@
+version = 9
+description = 'Store video.created_at on SQLite in the format SQLAlchemy binds, so keyset cursors match it'
+
+
+def upgrade(connection):
+    # CURRENT_TIMESTAMP wrote 'YYYY-MM-DD HH:MM:SS'; SQLAlchemy compares against 'YYYY-MM-DD HH:MM:SS.ffffff'.
+    # Other databases have a native timestamp type and need nothing.
+    if connection.dialect.name != 'sqlite':
+        return
+    connection.exec_driver_sql("UPDATE video SET created_at = created_at || '.000000' WHERE length(created_at) = 19")
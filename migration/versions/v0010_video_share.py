@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, MetaData, String, Table
+
+version = 10
+description = 'Create video_share to count one share per user and video'
+
+metadata = MetaData()
+
+video_share = Table(
+    'video_share', metadata,
+    Column('video_id', String(36), primary_key=True),
+    Column('user_id', String(36), primary_key=True),
+    Column('created_at', DateTime),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(bind=connection, checkfirst=True)
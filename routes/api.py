@@ -1,3 +1,10 @@
-from src.controller.api.healthController import *
-from src.controller.api.VideoController import *
-from src.controller.api.AuthController import *
+def register_blueprints(app):
+    # Controllers (and the services they set up) are imported when an app is built, not when this module is
+    from src.controller.api.healthController import health_blueprint
+    from src.controller.api.VideoController import video_blueprint
+    from src.controller.api.AuthController import auth_blueprint
+    from src.controller.api.UploadController import upload_blueprint
+    from src.controller.api.MetricsController import metrics_blueprint
+
+    for blueprint in (health_blueprint, video_blueprint, auth_blueprint, upload_blueprint, metrics_blueprint):
+        app.register_blueprint(blueprint)
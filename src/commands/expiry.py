@@ -0,0 +1,39 @@
+import click
+from flask.cli import with_appcontext
+
+from src.services.ExpirySweeperService import ExpirySweeperService
+
+
+@click.group('expiry', help='Expired token and upload session cleanup.')
+def expiry_cli():
+    pass
+
+
+@expiry_cli.command('sweep')
+@click.option('--table', 'tables', multiple=True, help='Only sweep this table; repeat for several. Default: all.')
+@click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop each table after this many batches.')
+@click.option('--dry-run', is_flag=True, help='Only count the expired rows.')
+@with_appcontext
+def sweep(tables, batch_size, max_batches, dry_run):
+    """Delete expired email verification and password reset tokens, upload sessions and revoked tokens."""
+    sweeper = ExpirySweeperService()
+    unknown = set(tables) - set(sweeper.targets())
+    if unknown:
+        raise click.BadParameter(f"{', '.join(sorted(unknown))}; choose from {', '.join(sweeper.targets())}",
+                                 param_hint='--table')
+
+    if dry_run:
+        for name in tables or sweeper.targets():
+            click.echo(f'{name}: {sweeper.count_expired(name)} expired rows')
+        return
+
+    deleted = 0
+    seconds = 0.0
+    for result in sweeper.sweep_all(tables, max_batches=max_batches, batch_size=batch_size):
+        state = '' if result.finished else ', more remain'
+        click.echo(f'{result.table}: deleted {result.deleted} rows in {result.batches} batches, '
+                   f'{result.seconds:.2f}s{state}')
+        deleted += result.deleted
+        seconds += result.seconds
+    click.echo(f'Deleted {deleted} expired rows in {seconds:.2f}s.')
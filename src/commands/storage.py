@@ -0,0 +1,35 @@
+import click
+from flask.cli import with_appcontext
+
+from src.services.FileReclaimerService import FileReclaimerService
+
+
+@click.group('storage', help='Stored video file maintenance.')
+def storage_cli():
+    pass
+
+
+@storage_cli.command('reconcile')
+@click.option('--reclaim', is_flag=True, help='Delete orphaned files instead of only listing them.')
+@click.option('--batch-size', type=int, default=None, help='Files checked per database round trip.')
+@with_appcontext
+def reconcile(reclaim, batch_size):
+    """Compare the upload folder with the video table and list (or delete) files nothing references."""
+    reclaimer = FileReclaimerService()
+    reclaimer.reset_pass()
+    scanned = orphans = freed = 0
+    while True:
+        batch = reclaimer.reconcile_batch(reclaim=reclaim, batch_size=batch_size)
+        if batch is None:
+            click.echo('Another process is scanning the upload folder; try again later.', err=True)
+            raise SystemExit(1)
+        scanned += batch.scanned
+        for orphan in batch.orphans:
+            click.echo(f'{"deleted" if reclaim else "orphan"} {orphan.path} ({orphan.size} bytes, {orphan.reason})')
+        orphans += len(batch.orphans)
+        freed += batch.reclaimed_bytes
+        if batch.finished:
+            break
+
+    summary = f'Scanned {scanned} files, {orphans} orphaned'
+    click.echo(f'{summary}, {freed} bytes freed.' if reclaim else f'{summary}. Run with --reclaim to delete them.')
@@ -1,52 +1,78 @@
-from flask import request
+from flask import Blueprint, current_app, request
 from flask_jwt_extended import jwt_required
 
-from app import db, app
+from migration.Base import db
 from src.models.EmailVerificationModel import EmailVerification
+from src.models.ResetPasswordTokenModel import PasswordResetToken
+from src.models.RevokedTokenModel import RevokedToken
 from src.models.UserModel import User
 from src.services.AuthService import AuthService
 from src.services.EmailService import EmailService
+from src.services.ExpirySweeperService import ExpirySweeperService
 from src.services.JWTService import JWTService
+from src.services.PasswordHashService import PasswordHashService
+from src.services.PrincipalCacheService import PrincipalCacheService
+from src.services.TokenRevocationService import TokenRevocationService
+
+auth_blueprint = Blueprint('auth', __name__)
 
 auth_service = AuthService()
+password_hash_service = PasswordHashService()
+principal_cache_service = PrincipalCacheService()
+token_revocation_service = TokenRevocationService()
+expiry_sweeper_service = ExpirySweeperService()
+
+
+@auth_blueprint.record_once
+def init_services(state):
+    app = state.app
+    password_hash_service.init_app(app)
+    principal_cache_service.init_app(app, User)
+    token_revocation_service.init_app(app, db, RevokedToken)
+
+    # Unused verification and reset tokens, and revocations of tokens that have expired anyway
+    expiry_sweeper_service.init_app(app, db)
+    expiry_sweeper_service.add_target(EmailVerification)
+    expiry_sweeper_service.add_target(PasswordResetToken)
+    expiry_sweeper_service.add_target(RevokedToken)
 
 
-@app.route('/api/v1/register', methods=['POST'])
+@auth_blueprint.route('/api/v1/register', methods=['POST'])
 def register():
-    return auth_service.register(db, User, EmailService, EmailVerification, request.json, app.logger)
+    return auth_service.register(db, User, EmailService, EmailVerification, request.json, current_app.logger)
 
 
-@app.route('/api/v1/login', methods=['POST'])
+@auth_blueprint.route('/api/v1/login', methods=['POST'])
 def login():
-    return auth_service.login(JWTService, User, request.json, app.logger)
+    return auth_service.login(db, JWTService, User, request.json, current_app.logger)
 
 
+@auth_blueprint.route('/api/v1/logout', methods=['POST'])
 @jwt_required()
-@app.route('/api/v1/logout', methods=['POST'])
 def logout():
-    return auth_service.logout(app.logger)
+    return auth_service.logout(current_app.logger)
 
 
-@app.route('/api/v1/forgot-password', methods=['POST'])
+@auth_blueprint.route('/api/v1/forgot-password', methods=['POST'])
 def forgot_password():
-    return auth_service.forgot_password(db, User, EmailVerification, request.json, app.logger)
+    return auth_service.forgot_password(db, User, EmailService, PasswordResetToken, request.json, current_app.logger)
 
 
-@app.route('/api/v1/reset-password', methods=['POST'])
+@auth_blueprint.route('/api/v1/reset-password', methods=['POST'])
 def reset_password():
-    return auth_service.reset_password(db, EmailVerification, User, request.json, app.logger)
+    return auth_service.reset_password(db, PasswordResetToken, User, request.json, current_app.logger)
 
 
-@app.route('/api/v1/verify-email/<token>', methods=['GET'])
+@auth_blueprint.route('/api/v1/verify-email/<token>', methods=['GET'])
 def verify_email(token):
-    return auth_service.verify_email(db, EmailVerification, User, token, app.logger)
+    return auth_service.verify_email(db, EmailVerification, User, token, current_app.logger)
 
 
-@app.route('/api/v1/user', methods=['GET'])
+@auth_blueprint.route('/api/v1/user', methods=['GET'])
 def get_user():
-    return auth_service.get_user(db, User, app.logger)
+    return auth_service.get_user(db, User, request, current_app.logger)
 
 
-@app.route('/api/v1/user/<user_id>', methods=['GET'])
+@auth_blueprint.route('/api/v1/user/<user_id>', methods=['GET'])
 def get_user_by_id(user_id):
-    return auth_service.get_user_by_id(db, User, user_id, app.logger)
+    return auth_service.get_user_by_id(db, User, user_id, request, current_app.logger)
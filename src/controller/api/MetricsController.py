@@ -0,0 +1,56 @@
+from flask import Blueprint, Response, current_app
+
+from instance.metrics import register_collectors
+from src.services.EmailService import mail_dispatcher
+from src.services.FileReclaimerService import FileReclaimerService
+from src.services.PrincipalCacheService import PrincipalCacheService
+from src.services.SearchIndexService import SearchIndexService
+from src.services.TokenRevocationService import TokenRevocationService
+from src.services.TrendingService import TrendingService
+from src.services.VideoCacheService import VideoCacheService
+from src.services.ViewCounterService import ViewCounterService
+from src.utils.metrics import MetricsRegistry
+
+metrics_blueprint = Blueprint('metrics', __name__)
+
+metrics = MetricsRegistry()
+video_cache_service = VideoCacheService()
+view_counter_service = ViewCounterService()
+search_index_service = SearchIndexService()
+file_reclaimer_service = FileReclaimerService()
+principal_cache_service = PrincipalCacheService()
+token_revocation_service = TokenRevocationService()
+trending_service = TrendingService()
+
+register_collectors(gauges={
+    'video_cache_size': ('Videos currently cached', lambda: video_cache_service.stats()['size']),
+    'mail_queue_depth': ('Emails waiting to be sent or retried', mail_dispatcher.depth),
+    'view_counter_backlog': ('Videos with unflushed view or share increments', view_counter_service.backlog),
+    'search_index_documents': ('Videos in the search index of this process',
+                               lambda: search_index_service.stats()['documents']),
+    'search_index_terms': ('Distinct terms in the search index of this process',
+                           lambda: search_index_service.stats()['terms']),
+    'trending_tracked_videos': ('Videos with a trending score in the weekly window of this process',
+                                lambda: trending_service.stats()['week']),
+    'storage_reclaim_backlog': ('Deleted video files waiting to be reclaimed', file_reclaimer_service.backlog),
+    'revoked_tokens_tracked': ('Revoked tokens in the Bloom filter of this process',
+                               lambda: token_revocation_service.stats()['tracked']),
+}, counters={
+    'video_cache_hits_total': ('Video cache hits', lambda: video_cache_service.stats()['hits']),
+    'video_cache_misses_total': ('Video cache misses', lambda: video_cache_service.stats()['misses']),
+    'video_cache_evictions_total': ('Video cache capacity evictions',
+                                    lambda: video_cache_service.stats()['evictions']),
+    'mail_sent_total': ('Emails sent by this process', lambda: mail_dispatcher.sent),
+    'mail_failed_total': ('Emails given up on after all retries', lambda: mail_dispatcher.failed),
+    'principal_cache_hits_total': ('Authenticated user lookups served from the cache',
+                                   lambda: principal_cache_service.stats()['hits']),
+    'principal_cache_misses_total': ('Authenticated user lookups that queried the database',
+                                     lambda: principal_cache_service.stats()['misses']),
+    'log_records_dropped_total': ('Log records dropped because the log queue was full',
+                                  lambda: current_app.extensions['log_queue_handler'].dropped),
+})
+
+
+@metrics_blueprint.route('/metrics')
+def export_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
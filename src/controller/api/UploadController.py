@@ -0,0 +1,48 @@
+from flask import Blueprint, current_app, request
+from werkzeug.utils import secure_filename
+
+from migration.Base import db
+from src.models.UploadSessionModel import UploadSession
+from src.models.VideoCounterModel import VideoCounter
+from src.models.VideoModel import Video
+from src.services.ExpirySweeperService import ExpirySweeperService
+from src.services.UploadService import UploadService
+from src.utils.httpMethod import HttpMethod
+from instance.config import Config
+
+upload_blueprint = Blueprint('upload', __name__)
+
+upload_service = UploadService()
+expiry_sweeper_service = ExpirySweeperService()
+
+
+@upload_blueprint.record_once
+def init_services(state):
+    expiry_sweeper_service.init_app(state.app, db)
+    # Abandoned uploads: the row and the partial file
+    expiry_sweeper_service.add_target(UploadSession, [UploadSession.file_path], upload_service.discard_files)
+
+
+@upload_blueprint.route('/api/v1/video/upload', methods=[HttpMethod.POST])
+def create_upload_session():
+    return upload_service.create_session(db, UploadSession, Config, secure_filename, request, current_app.logger)
+
+
+@upload_blueprint.route('/api/v1/video/upload/<upload_id>', methods=[HttpMethod.GET])
+def get_upload_session(upload_id):
+    return upload_service.get_session(db, UploadSession, upload_id, current_app.logger)
+
+
+@upload_blueprint.route('/api/v1/video/upload/<upload_id>', methods=[HttpMethod.PATCH])
+def append_upload_chunk(upload_id):
+    return upload_service.append_chunk(db, UploadSession, Config, upload_id, request, current_app.logger)
+
+
+@upload_blueprint.route('/api/v1/video/upload/<upload_id>/complete', methods=[HttpMethod.POST])
+def complete_upload_session(upload_id):
+    return upload_service.complete_session(db, UploadSession, Video, VideoCounter, Config, upload_id, current_app.logger)
+
+
+@upload_blueprint.route('/api/v1/video/upload/<upload_id>', methods=[HttpMethod.DELETE])
+def delete_upload_session(upload_id):
+    return upload_service.delete_session(db, UploadSession, upload_id, current_app.logger)
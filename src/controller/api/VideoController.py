@@ -1,51 +1,139 @@
-from flask import request, Blueprint
+from flask import Blueprint, current_app, request
 from flask_jwt_extended import jwt_required
-from werkzeug.utils import secure_filename
 
-from app import app, db
+from migration.Base import db
+from src.models.VideoCounterModel import VideoCounter
 from src.models.VideoModel import Video
+from src.models.VideoShareModel import VideoShare
+from src.services.FileReclaimerService import FileReclaimerService
+from src.services.MediaProcessingService import MediaProcessingService
+from src.services.SearchIndexService import SearchIndexService
+from src.services.TrendingService import TrendingService
+from src.services.VideoCacheService import VideoCacheService
 from src.services.VideoService import VideoService
+from src.services.ViewCounterService import ViewCounterService
+from src.utils.helpers import parse_bool
 from src.utils.httpMethod import HttpMethod
+from src.utils.pagination import clamp_page_size
 from instance.config import Config
 
-video_service = VideoService()
-
+video_blueprint = Blueprint('video', __name__)
 
-@app.route('/api/v1/video', methods=[HttpMethod.POST])
+video_service = VideoService()
+view_counter_service = ViewCounterService()
+video_cache_service = VideoCacheService()
+media_processing_service = MediaProcessingService()
+search_index_service = SearchIndexService()
+trending_service = TrendingService()
+file_reclaimer_service = FileReclaimerService()
+
+
+@video_blueprint.record_once
+def init_services(state):
+    app = state.app
+    view_counter_service.init_app(app, db, Video)
+    video_cache_service.init_app(app)
+    media_processing_service.init_app(app, db, Video)
+    search_index_service.init_app(app, db, Video)
+    trending_service.init_app(app)
+    file_reclaimer_service.init_app(app, db, Video)
+
+    # Flushed counters and extracted metadata change the stored row, so drop the cached copies
+    view_counter_service.add_flush_listener(video_cache_service.invalidate_many)
+    media_processing_service.add_listener(video_cache_service.invalidate_many)
+
+
+@video_blueprint.route('/api/v1/video', methods=[HttpMethod.POST])
 def create_video():
-    return video_service.create(db, Video, Config, secure_filename, request, app.logger)
+    return video_service.create(db, Video, VideoCounter, Config, request, current_app.logger)
 
 
-@app.route('/api/v1/video', methods=[HttpMethod.GET])
+@video_blueprint.route('/api/v1/video', methods=[HttpMethod.GET])
 def get_videos():
-    page = request.args.get('page', default=1, type=int)
-    return video_service.get_videos(db, Video, page, app.logger)
+    cursor = request.args.get('cursor')
+    size = clamp_page_size(request.args.get('size', type=int), 1, Config.VIDEO_PAGE_SIZE_MAX)
+    with_total = request.args.get('with_total', default=False, type=parse_bool)
+    return video_service.get_videos(db, Video, VideoCounter, cursor, size, with_total, current_app.logger)
+
+
+@video_blueprint.route('/api/v1/video/search', methods=[HttpMethod.GET])
+def search_videos():
+    query = request.args.get('q', '')
+    size = clamp_page_size(request.args.get('size', type=int), 10, Config.VIDEO_PAGE_SIZE_MAX)
+    offset = max(request.args.get('offset', default=0, type=int), 0)
+    return video_service.search_videos(db, Video, query, size, offset, current_app.logger)
+
 
+@video_blueprint.route('/api/v1/video/trending', methods=[HttpMethod.GET])
+def get_trending_videos():
+    window = request.args.get('window', 'day')
+    size = clamp_page_size(request.args.get('size', type=int), 20, Config.VIDEO_PAGE_SIZE_MAX)
+    offset = max(request.args.get('offset', default=0, type=int), 0)
+    return video_service.get_trending_videos(db, Video, window, size, offset, current_app.logger)
 
-@app.route('/api/v1/video/<video_id>', methods=[HttpMethod.GET])
+
+@video_blueprint.route('/api/v1/video/<video_id>', methods=[HttpMethod.GET])
 def get_video_by_id(video_id):
-    return video_service.get_video_by_id(db, Video, video_id, app.logger)
+    return video_service.get_video_by_id(db, Video, video_id, request, current_app.logger)
+
+
+@video_blueprint.route('/api/v1/video/<video_id>/stream', methods=[HttpMethod.GET])
+def stream_video(video_id):
+    return video_service.stream_video(db, Video, video_id, request, current_app.logger)
+
+
+@video_blueprint.route('/api/v1/video/<video_id>/seek', methods=[HttpMethod.GET])
+def seek_video(video_id):
+    return video_service.seek_video(db, Video, video_id, request.args.get('t'), current_app.logger)
 
 
-@app.route('/api/v1/video/user/<user_id>', methods=[HttpMethod.GET])
+@video_blueprint.route('/api/v1/video/<video_id>/share', methods=[HttpMethod.POST])
+@jwt_required()
+def share_video(video_id):
+    return video_service.share_video(db, Video, VideoShare, video_id, current_app.logger)
+
+
+@video_blueprint.route('/api/v1/video/user/<user_id>', methods=[HttpMethod.GET])
 def get_videos_by_user_id(user_id):
-    page = request.args.get('page', default=1, type=int)
-    size = request.args.get('size', default=20, type=int)
-    return video_service.get_videos_by_user_id(db, Video, user_id, page, size, app.logger)
+    cursor = request.args.get('cursor')
+    size = clamp_page_size(request.args.get('size', type=int), 20, Config.VIDEO_PAGE_SIZE_MAX)
+    with_total = request.args.get('with_total', default=False, type=parse_bool)
+    return video_service.get_videos_by_user_id(db, Video, VideoCounter, user_id, cursor, size, with_total, current_app.logger)
 
 
-@app.route('/api/v1/video/share/<share_id>', methods=[HttpMethod.GET])
+@video_blueprint.route('/api/v1/video/share/<share_id>', methods=[HttpMethod.GET])
 def get_videos_by_share_id(share_id):
-    return video_service.get_videos_by_share_id(db, Video, share_id, app.logger)
+    return video_service.get_videos_by_share_id(db, Video, share_id, request, current_app.logger)
+
+
+@video_blueprint.route('/api/v1/video/batch-get', methods=[HttpMethod.POST])
+def get_videos_by_ids():
+    data = request.get_json(silent=True) or {}
+    return video_service.get_videos_by_ids(db, Video, data.get('ids'), Config.VIDEO_BATCH_MAX, current_app.logger)
+
+
+@video_blueprint.route('/api/v1/video/batch', methods=[HttpMethod.PATCH])
+@jwt_required()
+def update_videos():
+    data = request.get_json(silent=True) or {}
+    return video_service.update_videos(db, Video, data.get('videos'), Config.VIDEO_BATCH_MAX, current_app.logger)
+
+
+@video_blueprint.route('/api/v1/video/batch', methods=[HttpMethod.DELETE])
+@jwt_required()
+def delete_videos():
+    data = request.get_json(silent=True) or {}
+    return video_service.delete_videos(db, Video, VideoCounter, VideoShare, data.get('ids'), Config.VIDEO_BATCH_MAX,
+                                       current_app.logger)
 
 
+@video_blueprint.route('/api/v1/video/<video_id>', methods=[HttpMethod.PATCH])
 @jwt_required()
-@app.route('/api/v1/video/<video_id>', methods=[HttpMethod.PATCH])
 def update_video_by_id(video_id):
-    return video_service.update_video_by_id(db, Video, video_id, request.json, app.logger)
+    return video_service.update_video_by_id(db, Video, video_id, request.json, current_app.logger)
 
 
+@video_blueprint.route('/api/v1/video/<video_id>', methods=[HttpMethod.DELETE])
 @jwt_required()
-@app.route('/api/v1/video/<video_id>', methods=[HttpMethod.DELETE])
 def delete_video_by_id(video_id):
-    return video_service.delete_video_by_id(db, Video, video_id, app.logger)
+    return video_service.delete_video_by_id(db, Video, VideoCounter, VideoShare, video_id, current_app.logger)
@@ -1,9 +1,18 @@
-from app import app
+from flask import Blueprint, current_app
+
+from src.services.VideoCacheService import VideoCacheService
 from src.services.healthService import HealthService
 
+health_blueprint = Blueprint('health', __name__)
+
 healthService = HealthService()
 
 
-@app.route('/api/v1/health/')
+@health_blueprint.route('/api/v1/health/')
 def health():
-    return healthService.check_health(logger=app.logger)
+    return healthService.check_health(logger=current_app.logger)
+
+
+@health_blueprint.route('/api/v1/health/cache')
+def cache_health():
+    return healthService.cache_stats(VideoCacheService(), logger=current_app.logger)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import relationship
-from app import db
+from migration.Base import db
 
 
 class EmailVerification(db.Model):
@@ -7,7 +7,7 @@ class EmailVerification(db.Model):
     user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
     user = relationship('User', backref='email_verifications')
     token = db.Column(db.String(255), unique=True, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
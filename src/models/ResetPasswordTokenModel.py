@@ -1,10 +1,10 @@
-from app import db
+from migration.Base import db
 
 
 class PasswordResetToken(db.Model):
     email = db.Column(db.String(120), primary_key=True)
-    token = db.Column(db.String(255), nullable=False)
-    expires_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    token = db.Column(db.String(255), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, default=db.func.current_timestamp(), index=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
     def __repr__(self):
@@ -0,0 +1,12 @@
+from migration.Base import db
+
+
+class RevokedToken(db.Model):
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.String(36))
+    # Rows are only needed until the token would have expired anyway
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=db.func.current_timestamp(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti}, user_id={self.user_id}, expires_at={self.expires_at})>"
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from app import db
+from migration.Base import db
 
 
 class User(db.Model):
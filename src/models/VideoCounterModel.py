@@ -0,0 +1,11 @@
+from migration.Base import db
+
+
+class VideoCounter(db.Model):
+    # 'all' for the whole catalogue, 'user:<id>' for a single uploader
+    scope = db.Column(db.String(64), primary_key=True)
+    total = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f"<VideoCounter(scope={self.scope}, total={self.total})>"
@@ -2,36 +2,43 @@ import json
 import uuid
 from datetime import datetime
 
-from app import db
-from instance.config import Config
+from migration.Base import db
+from src.utils.serializer import serialize_video
 
 
 class Video(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text)
-    video_url = db.Column(db.String(255), nullable=False)
-    video_size = db.Column(db.Integer, nullable=False)
-    share_link = db.Column(db.String(255), nullable=False)
+    video_url = db.Column(db.String(255), nullable=False, index=True)
+    video_size = db.Column(db.BigInteger, nullable=False)
+    content_hash = db.Column(db.String(64), index=True)
+    share_link = db.Column(db.String(255), nullable=False, index=True)
     uploaded_by = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
     shares = db.Column(db.Integer, default=0)
     views = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    # Filled in by MediaProcessingService after upload
+    duration = db.Column(db.Float)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    video_codec = db.Column(db.String(16))
+    audio_codec = db.Column(db.String(16))
+    bitrate = db.Column(db.BigInteger)
+    processing_status = db.Column(db.String(16), default='pending', index=True)
+    processing_started_at = db.Column(db.DateTime)  # when the current claim was taken, for lease expiry
+    # Set in Python so it keeps microseconds: keyset cursors compare it by value, and SQLite stores CURRENT_TIMESTAMP
+    # as a whole-second string that never equals the bound cursor
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
+    __table_args__ = (
+        # Keyset pagination for the catalogue and for a single uploader
+        db.Index('ix_video_created_at_id', 'created_at', 'id'),
+        db.Index('ix_video_uploaded_by_created_at_id', 'uploaded_by', 'created_at', 'id'),
+    )
+
     def to_json(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "video_url": Config.APP_URL+'/'+self.video_url,
-            "video_size": self.video_size,
-            "share_link": self.share_link,
-            "uploaded_by": self.uploaded_by,
-            "shares": self.shares,
-            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        },
+        return serialize_video(self)
 
     def __repr__(self):
         return (
@@ -0,0 +1,11 @@
+from migration.Base import db
+
+
+class VideoShare(db.Model):
+    # One row per user and video, so repeated shares by the same user are only counted once
+    video_id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), primary_key=True)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f"<VideoShare(video_id={self.video_id}, user_id={self.user_id})>"
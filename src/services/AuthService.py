@@ -1,11 +1,19 @@
 import re
 
-from flask_jwt_extended import get_jwt_identity, jwt_required
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
 from datetime import datetime, timedelta
 import secrets
+from migration.routing import read_only
+from src.services.PasswordHashService import PasswordHashBusy, PasswordHashService
+from src.services.PrincipalCacheService import PrincipalCacheService
+from src.services.TokenRevocationService import TokenRevocationService
+from src.utils.conditional import not_modified, not_modified_response, payload_etag, validator_headers
 from src.utils.responseEntity import error_response, success_response
 
+password_hash_service = PasswordHashService()
+principal_cache_service = PrincipalCacheService()
+token_revocation_service = TokenRevocationService()
+
 
 class AuthService:
     _instance = None
@@ -39,10 +47,15 @@ class AuthService:
             return error_response('Email already exists', status_code=400, logger=logger)
 
         # Create new user
+        try:
+            password_hash = password_hash_service.hash(password)
+        except PasswordHashBusy as e:
+            return error_response(str(e), status_code=503, logger=logger)
+
         new_user = User(
             username=username,
             email=email,
-            password_hash=generate_password_hash(password)
+            password_hash=password_hash
         )
 
         db.session.add(new_user)
@@ -54,7 +67,7 @@ class AuthService:
         return success_response('User registered successfully. Check your email for verification.', status_code=201,
                                 logger=logger)
 
-    def login(self, JWTService, User, data, logger=None):
+    def login(self, db, JWTService, User, data, logger=None):
         jwt_service = JWTService()
         email = data.get('email')
         password = data.get('password')
@@ -64,8 +77,16 @@ class AuthService:
 
         user = User.query.filter_by(email=email).first()
 
-        if not user or not check_password_hash(user.password_hash, password):
-            return error_response('Invalid email or password', status_code=401, logger=logger)
+        try:
+            if not user or not password_hash_service.verify(user.password_hash, password):
+                return error_response('Invalid email or password', status_code=401, logger=logger)
+
+            # Upgrade hashes made with older parameters while we have the plaintext
+            if password_hash_service.needs_rehash(user.password_hash):
+                user.password_hash = password_hash_service.hash(password)
+                db.session.commit()
+        except PasswordHashBusy as e:
+            return error_response(str(e), status_code=503, logger=logger)
 
         # Generate JWT token (example)
         token = jwt_service.generate_jwt_token(user.id)
@@ -73,10 +94,15 @@ class AuthService:
         return success_response('Login successful', data={'token': token}, logger=logger)
 
     def logout(self, logger=None):
-        # just log since we will be using JWT for auth
+        # Revoke the presented access token until it expires; the user's other tokens stay valid
+        token = get_jwt()
+        try:
+            token_revocation_service.revoke(token.get('jti'), token.get('sub'), token.get('exp'))
+        except Exception as e:
+            return error_response(str(e), logger=logger, logger_type="error")
         return success_response('Logout successful', logger=logger)
 
-    def forgot_password(self, db, User, PasswordResetToken, data, logger=None):
+    def forgot_password(self, db, User, EmailService, PasswordResetToken, data, logger=None):
         email = data.get('email')
 
         if not email:
@@ -88,10 +114,10 @@ class AuthService:
             return error_response('User not found', status_code=404, logger=logger)
 
         # Generate and store password reset token
-        password_reset_token = self.generate_password_reset_token(db, PasswordResetToken, user.id)
+        password_reset_token = self.generate_password_reset_token(db, PasswordResetToken, user.email)
 
         # Send email with password reset link (example)
-        self.send_password_reset_email(user.email, password_reset_token.token)
+        self.send_password_reset_email(EmailService, user.email, password_reset_token.token)
 
         return success_response('Password reset link sent to your email', logger=logger)
 
@@ -111,7 +137,10 @@ class AuthService:
 
         # Update user's password
         user = User.query.filter_by(email=email).first()
-        user.password_hash = generate_password_hash(new_password)
+        try:
+            user.password_hash = password_hash_service.hash(new_password)
+        except PasswordHashBusy as e:
+            return error_response(str(e), status_code=503, logger=logger)
 
         db.session.delete(password_reset_token)
         db.session.commit()
@@ -166,31 +195,57 @@ class AuthService:
 
         return password_reset_token
 
-    def get_user_by_id(self, db, User, user_id, logger=None):
+    @read_only()
+    def get_user_by_id(self, db, User, user_id, request, logger=None):
         try:
-            user = db.session.query(User).get_or_404(user_id)
-
+            user = self._get_principal(db, User, user_id)
             if not user:
                 return error_response('User not found', status_code=404, logger=logger)
-            return success_response('User retrieved successfully', user.to_json(), logger=logger)
+
+            validators = self._user_validators(user)
+            if not_modified(request, *validators):
+                return not_modified_response(*validators)
+            body, status_code = success_response('User retrieved successfully', user, logger=logger)
+            return body, status_code, validator_headers(*validators)
 
         except Exception as e:
             return error_response(str(e), logger=logger, logger_type="error")
 
+    @read_only()
     @jwt_required(optional=True)
-    def get_user(self, db, User, logger=None):
+    def get_user(self, db, User, request, logger=None):
         current_user_id = get_jwt_identity()
         if not current_user_id:
             return error_response('Authorization header is missing or invalid', status_code=401, logger=logger)
+        # The same URL returns a different user per token
+        vary = {'Vary': 'Authorization'}
         try:
-            user = db.session.query(User).get_or_404(current_user_id)
+            # The token's subject is resolved from the principal cache; only a miss queries the user
+            user = self._get_principal(db, User, current_user_id)
             if not user:
                 return error_response('UnAuthorize access', status_code=401, logger=logger)
-            return success_response('User retrieved successfully', user.to_json(), logger=logger)
+
+            validators = self._user_validators(user)
+            if not_modified(request, *validators):
+                return not_modified_response(*validators, headers=vary)
+            body, status_code = success_response('User retrieved successfully', user, logger=logger)
+            return body, status_code, {**validator_headers(*validators), **vary}
 
         except Exception as e:
             return error_response(str(e), logger=logger, logger_type="error")
 
+    def _get_principal(self, db, User, user_id):
+        return principal_cache_service.get_user(user_id, lambda: self._load_user(db, User, user_id))
+
+    def _load_user(self, db, User, user_id):
+        # Cache loader: the serialized user, or None
+        user = db.session.get(User, user_id)
+        return user.to_json() if user else None
+
+    def _user_validators(self, user):
+        # (ETag, Last-Modified); the ETag covers every field, so a same-second update still changes it
+        return payload_etag(user), user['updated_at']
+
     def send_password_reset_email(self, EmailService, email, token):
         email_services = EmailService()
         # Construct the body of the email
@@ -201,7 +256,7 @@ class AuthService:
         <p>If you did not request this reset, please ignore this email.</p>
         <p>Thank you.</p>
         """
-        email_services.send_email(email, "Password Reset Request", body)
+        email_services.queue_email(email, "Password Reset Request", body)
 
     def send_email_verification(self, EmailService, email_verification, email):
         email_services = EmailService()
@@ -214,4 +269,4 @@ class AuthService:
         <p>If you did not register with us, please ignore this email.</p>
         <p>Thank you.</p>
         """
-        email_services.send_email(email, "Email Verification", body)
+        email_services.queue_email(email, "Email Verification", body)
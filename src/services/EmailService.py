@@ -1,6 +1,9 @@
 from flask_mail import Mail, Message
 
+from src.services.MailDispatcherService import MailDispatcherService
+
 mail = Mail()
+mail_dispatcher = MailDispatcherService()
 
 
 class EmailService:
@@ -19,3 +22,10 @@ class EmailService:
         except Exception as e:
             print(f"Failed to send email: {e}")
             return False
+
+    def queue_email(self, to, subject, body):
+        # Hand the message to the background dispatcher; send inline only when its queue is full
+        msg = Message(subject=subject, recipients=[to], body=body)
+        if mail_dispatcher.enqueue(msg):
+            return True
+        return self.send_email(to, subject, body)
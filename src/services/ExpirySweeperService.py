@@ -0,0 +1,120 @@
+import fcntl
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from src.utils.metrics import MetricsRegistry
+from src.utils.worker import PeriodicWorker
+
+SweepTarget = namedtuple('SweepTarget', ['name', 'model', 'columns', 'on_delete'])
+SweepResult = namedtuple('SweepResult', ['table', 'deleted', 'batches', 'seconds', 'finished'])
+
+metrics = MetricsRegistry()
+expired_rows_deleted = metrics.counter('expired_rows_deleted_total', 'Expired rows deleted by the sweeper', ('table',))
+sweep_duration = metrics.histogram('expiry_sweep_duration_seconds', 'Time spent sweeping one table', ('table',))
+
+
+class ExpirySweeperService:
+    """
+    Deletes rows past their ``expires_at`` from the tables registered with ``add_target``: unused email
+    verification and password reset tokens, abandoned upload sessions and revoked tokens that have expired anyway.
+
+    Each batch selects up to ``EXPIRY_SWEEP_BATCH_SIZE`` primary keys through the ``expires_at`` index and deletes
+    them in its own short transaction, re-checking the expiry so a row renewed in the meantime survives. A background
+    run stops after ``EXPIRY_SWEEP_MAX_BATCHES`` batches per table and continues on the next one; ``flask expiry
+    sweep`` clears a backlog in one go.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ExpirySweeperService, cls).__new__(cls)
+            cls._instance._targets = {}
+            cls._instance._worker = None
+        return cls._instance
+
+    def init_app(self, app, db):
+        if self._worker is not None:
+            return
+        self.app = app
+        self.db = db
+        self.batch_size = app.config.get('EXPIRY_SWEEP_BATCH_SIZE', 500)
+        self.max_batches = app.config.get('EXPIRY_SWEEP_MAX_BATCHES', 20)
+        self.pause = app.config.get('EXPIRY_SWEEP_PAUSE', 0.05)
+        self.lock_path = os.path.join(app.config.get('UPLOAD_FOLDER') or '.', '.expiry-sweep.lock')
+        self._worker = PeriodicWorker('expiry-sweeper', self.run, app.config.get('EXPIRY_SWEEP_INTERVAL', 300))
+        # Started on the first request so each server worker runs its own thread after forking
+        app.before_request(self._worker.ensure_started)
+
+    def add_target(self, model, columns=(), on_delete=None):
+        # on_delete is called after each commit with the (primary key, *columns) rows of the batch
+        self._targets[model.__tablename__] = SweepTarget(model.__tablename__, model, tuple(columns), on_delete)
+
+    def targets(self):
+        return list(self._targets)
+
+    def run(self):
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            try:
+                # One sweeper at a time across server workers
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            with self.app.app_context():
+                results = self.sweep_all(max_batches=self.max_batches)
+
+        deleted = sum(result.deleted for result in results)
+        if deleted:
+            details = ', '.join(f'{result.table} {result.deleted}' for result in results if result.deleted)
+            self.app.logger.info(f'Expiry sweep deleted {deleted} rows ({details}) in '
+                                 f'{sum(result.seconds for result in results):.2f}s')
+        return results
+
+    def sweep_all(self, names=None, max_batches=None, batch_size=None):
+        return [self.sweep(name, max_batches, batch_size) for name in (names or self._targets)]
+
+    def sweep(self, name, max_batches=None, batch_size=None):
+        """Delete expired rows of one table, ``batch_size`` at a time, until none are left or ``max_batches`` ran."""
+        target = self._targets[name]
+        Model = target.model
+        primary_key = Model.__mapper__.primary_key[0]
+        batch_size = batch_size or self.batch_size
+        session = self.db.session
+
+        started = time.monotonic()
+        deleted = batches = 0
+        finished = False
+        while max_batches is None or batches < max_batches:
+            now = datetime.utcnow()
+            rows = session.query(primary_key, *target.columns).filter(Model.expires_at < now) \
+                .order_by(Model.expires_at).limit(batch_size).all()
+            if not rows:
+                session.commit()
+                finished = True
+                break
+            count = session.query(Model).filter(primary_key.in_([row[0] for row in rows]), Model.expires_at < now) \
+                .delete(synchronize_session=False)
+            session.commit()
+            if target.on_delete:
+                target.on_delete(rows)
+
+            deleted += count
+            batches += 1
+            expired_rows_deleted.inc(name, amount=count)
+            if len(rows) < batch_size:
+                finished = True
+                break
+            if self.pause:
+                time.sleep(self.pause)  # let other writers in between batches
+
+        seconds = time.monotonic() - started
+        sweep_duration.observe(seconds, name)
+        return SweepResult(name, deleted, batches, seconds, finished)
+
+    def count_expired(self, name):
+        Model = self._targets[name].model
+        total = self.db.session.query(Model).filter(Model.expires_at < datetime.utcnow()).count()
+        self.db.session.commit()
+        return total
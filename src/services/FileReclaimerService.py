@@ -0,0 +1,252 @@
+import fcntl
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from itertools import islice
+
+from src.services.StorageService import StorageService
+from src.utils.metrics import MetricsRegistry
+from src.utils.seekIndex import SIDECAR_SUFFIX
+from src.utils.worker import PeriodicWorker
+
+# Content-addressed blobs are named <sha256>.<container>
+BLOB_NAME = re.compile(r'^([0-9a-f]{64})\.(mp4|mov|mkv|avi)$')
+
+# Leftovers of interrupted writes: ingest temp files, faststart copies and seek index temp files
+TEMP_SUFFIXES = ('.part', '.faststart', SIDECAR_SUFFIX + '.tmp')
+TEMP_FILE_MAX_AGE = 24 * 60 * 60
+
+# Directories the scanner walks, relative to the upload folder; resumable uploads are managed by their sessions
+SCANNED_AREAS = ('blobs', 'tmp')
+
+Orphan = namedtuple('Orphan', ['path', 'size', 'reason'])
+ReconcileBatch = namedtuple('ReconcileBatch', ['scanned', 'orphans', 'reclaimed_bytes', 'finished'])
+
+storage_service = StorageService()
+
+metrics = MetricsRegistry()
+reclaimed_files = metrics.counter('storage_reclaimed_files_total', 'Stored files deleted by the reclaimer',
+                                  ('source',))
+reclaimed_bytes = metrics.counter('storage_reclaimed_bytes_total', 'Bytes freed by the reclaimer', ('source',))
+orphans_found = metrics.counter('storage_orphans_found_total', 'Unreferenced files found by the reconciliation scan')
+
+
+class FileReclaimerService:
+    """
+    Deletes stored video files in the background once no ``Video`` row references them.
+
+    Deleting a video only queues its path, so the request does not pay for unlinking a large file. Blobs are
+    shared by videos with identical content, so a file is removed only when no row references it by path or
+    content hash, and only once it has been untouched for ``STORAGE_RECLAIM_GRACE`` seconds (re-uploading the
+    same content touches the blob before the new row is committed).
+
+    A reconciliation scan walks the upload folder in sorted, bounded batches and checks each batch against the
+    table with two indexed ``IN`` queries. It finds files whose rows are gone (failed uploads, or deletes queued by
+    a process that died) and either reports or reclaims them.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(FileReclaimerService, cls).__new__(cls)
+            cls._instance._worker = None
+            cls._instance._reset()
+            os.register_at_fork(after_in_child=cls._instance._reset)
+        return cls._instance
+
+    def init_app(self, app, db, Video):
+        if self._worker is not None:
+            return
+        self.app = app
+        self.db = db
+        self.Video = Video
+        self.upload_folder = app.config.get('UPLOAD_FOLDER')
+        self.grace = app.config.get('STORAGE_RECLAIM_GRACE', 300)
+        self.reconcile_interval = app.config.get('STORAGE_RECONCILE_INTERVAL', 3600)
+        self.batch_size = app.config.get('STORAGE_RECONCILE_BATCH_SIZE', 1000)
+        self.reclaim_orphans = app.config.get('STORAGE_RECONCILE_MODE', 'report') == 'reclaim'
+        self._worker = PeriodicWorker('file-reclaimer', self.run, app.config.get('STORAGE_RECLAIM_INTERVAL', 30))
+        # Started on the first request so each server worker runs its own thread after forking
+        app.before_request(self._worker.ensure_started)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._queue = {}  # path -> earliest time to try it
+        self._cursor = None  # last relative path scanned in the current pass
+        self._next_pass = time.monotonic()
+
+    def enqueue(self, paths):
+        # Queue files whose rows were deleted (or never committed); they are checked again before removal
+        paths = [path for path in paths if path]
+        if not paths:
+            return
+        with self._lock:
+            for path in paths:
+                self._queue.setdefault(path, 0)
+        if self._worker is not None:
+            self._worker.ensure_started()
+            self._worker.wake()
+
+    def backlog(self):
+        with self._lock:
+            return len(self._queue)
+
+    def run(self):
+        with self.app.app_context():
+            self.reclaim_pending()
+            if self.reconcile_interval and time.monotonic() >= self._next_pass:
+                batch = self.reconcile_batch(reclaim=self.reclaim_orphans)
+                if batch is not None and batch.finished:
+                    self._next_pass = time.monotonic() + self.reconcile_interval
+
+    # Queued deletes
+
+    def reclaim_pending(self):
+        now = time.monotonic()
+        with self._lock:
+            due = [path for path, not_before in self._queue.items() if not_before <= now][:self.batch_size]
+        if not due:
+            return 0
+
+        referenced = self._referenced(due)
+        freed = 0
+        retry = []
+        for path in due:
+            if path in referenced or not self._in_upload_folder(path):
+                continue  # still used by another video, or a legacy file this service does not own
+            age = self._age(path)
+            if age is None:
+                continue  # already gone
+            if age < self.grace:
+                retry.append((path, now + self.grace - age))
+                continue
+            size = storage_service.remove_blob(path)
+            reclaimed_files.inc('delete')
+            reclaimed_bytes.inc('delete', amount=size)
+            freed += size
+
+        with self._lock:
+            for path in due:
+                self._queue.pop(path, None)
+            for path, not_before in retry:
+                self._queue[path] = not_before
+        return freed
+
+    # Reconciliation scan
+
+    def reconcile_batch(self, reclaim=False, batch_size=None):
+        """
+        Check the next ``batch_size`` files of the current pass. Returns a ReconcileBatch, or None when another
+        process holds the scan lock. ``finished`` is set once the pass has reached the end of the folder.
+        """
+        lock_path = os.path.join(self.upload_folder, '.reconcile.lock')
+        os.makedirs(self.upload_folder, exist_ok=True)
+        with open(lock_path, 'a') as lock_file:
+            try:
+                # One scanner at a time across server workers
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+
+            entries = list(islice(self._iter_files(self._cursor), batch_size or self.batch_size))
+            if not entries:
+                self._cursor = None
+                return ReconcileBatch(0, [], 0, True)
+            self._cursor = entries[-1][0]
+
+            orphans = self._find_orphans([path for _, path in entries])
+            freed = 0
+            for orphan in orphans:
+                orphans_found.inc()
+                if reclaim:
+                    freed += storage_service.remove_blob(orphan.path)
+                    reclaimed_files.inc('reconcile')
+                else:
+                    self.app.logger.warning(f'Orphaned file {orphan.path} ({orphan.size} bytes, {orphan.reason})')
+            if reclaim:
+                reclaimed_bytes.inc('reconcile', amount=freed)
+            return ReconcileBatch(len(entries), orphans, freed, False)
+
+    def reset_pass(self):
+        self._cursor = None
+
+    def _find_orphans(self, paths):
+        blobs = []
+        orphans = []
+        for path in paths:
+            age = self._age(path)
+            if age is None:
+                continue
+            name = os.path.basename(path)
+            if name.endswith(TEMP_SUFFIXES):
+                if age >= TEMP_FILE_MAX_AGE:
+                    orphans.append(Orphan(path, self._size(path), 'stale temporary file'))
+            elif name.endswith(SIDECAR_SUFFIX):
+                if not os.path.exists(path[:-len(SIDECAR_SUFFIX)]):
+                    orphans.append(Orphan(path, self._size(path), 'sidecar without video'))
+            elif BLOB_NAME.match(name) and age >= self.grace:
+                blobs.append(path)
+
+        referenced = self._referenced(blobs) if blobs else set()
+        for path in blobs:
+            if path not in referenced:
+                orphans.append(Orphan(path, self._size(path), 'no video references it'))
+        return orphans
+
+    def _referenced(self, paths):
+        # Paths still used by a video row, matched by path or by the content hash in the blob's name, so a blob
+        # counts as used however its path was spelled when the row was stored. Both columns are indexed.
+        Video = self.Video
+        session = self.db.session
+        hashes = {}
+        for path in paths:
+            match = BLOB_NAME.match(os.path.basename(path))
+            if match:
+                hashes[path] = match.group(1)
+
+        referenced = {row[0] for row in session.query(Video.video_url).filter(Video.video_url.in_(paths))}
+        if hashes:
+            used = {row[0] for row in session.query(Video.content_hash)
+                    .filter(Video.content_hash.in_(set(hashes.values())))}
+            referenced.update(path for path, content_hash in hashes.items() if content_hash in used)
+        session.commit()
+        return referenced
+
+    def _iter_files(self, after=None):
+        # (relative path, path) of every file in the scanned areas, in sorted order, after the cursor
+        for area in SCANNED_AREAS:
+            yield from self._walk(os.path.join(self.upload_folder, area), area, after)
+
+    def _walk(self, directory, relative, after):
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            entry_relative = f'{relative}/{entry.name}'
+            if entry.is_dir(follow_symlinks=False):
+                if after and entry_relative < after and not after.startswith(entry_relative + '/'):
+                    continue  # the whole subtree was scanned earlier in this pass
+                yield from self._walk(entry.path, entry_relative, after)
+            elif entry.is_file(follow_symlinks=False) and (not after or entry_relative > after):
+                yield entry_relative, entry.path
+
+    def _in_upload_folder(self, path):
+        folder = os.path.realpath(self.upload_folder)
+        return os.path.commonpath([folder, os.path.realpath(path)]) == folder
+
+    def _age(self, path):
+        # Seconds since the file was written or last claimed by a re-upload (which bumps its access time)
+        try:
+            stat = os.stat(path)
+            return time.time() - max(stat.st_mtime, stat.st_atime)
+        except FileNotFoundError:
+            return None
+
+    def _size(self, path):
+        try:
+            return os.stat(path).st_size
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,140 @@
+import atexit
+import heapq
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+
+
+class MailJob:
+    def __init__(self, message):
+        self.message = message
+        self.attempts = 0
+
+
+class MailDispatcherService:
+    """
+    Background mail delivery: a bounded queue drained by a small pool of worker threads.
+
+    Each worker keeps one SMTP connection open while messages keep arriving (up to ``MAIL_BATCH_SIZE`` per
+    connection), so a burst of registrations pays for one handshake and TLS negotiation per batch instead of per
+    message. Failed messages are retried with exponential backoff.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MailDispatcherService, cls).__new__(cls)
+            cls._instance.app = None
+            cls._instance._reset()
+            os.register_at_fork(after_in_child=cls._instance._reset)
+        return cls._instance
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.app.config.get('MAIL_QUEUE_SIZE', 1000) if self.app else 1000)
+        self._retries = []  # heap of (due time, sequence, job)
+        self._sequence = itertools.count()
+        self._workers = []
+        self._stopping = threading.Event()
+        self.sent = 0
+        self.failed = 0
+
+    def init_app(self, app, mail):
+        self.app = app
+        self.mail = mail
+        self.worker_count = app.config.get('MAIL_WORKERS', 2)
+        self.batch_size = app.config.get('MAIL_BATCH_SIZE', 50)
+        self.max_retries = app.config.get('MAIL_MAX_RETRIES', 5)
+        self.retry_backoff = app.config.get('MAIL_RETRY_BACKOFF', 2.0)
+        self.enqueue_timeout = app.config.get('MAIL_ENQUEUE_TIMEOUT', 0.05)
+        self.idle_timeout = app.config.get('MAIL_IDLE_TIMEOUT', 1.0)
+        self._reset()
+        atexit.register(self.shutdown)
+
+    def enqueue(self, message):
+        """Queue ``message`` for delivery; returns False when the queue stays full."""
+        self._ensure_workers()
+        try:
+            self._queue.put(MailJob(message), timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def depth(self):
+        with self._lock:
+            return self._queue.qsize() + len(self._retries)
+
+    def shutdown(self, timeout=5.0):
+        # Give queued messages a chance to go out before the process exits
+        deadline = time.monotonic() + timeout
+        while self._workers and self.depth() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self._stopping.set()
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            while len(self._workers) < self.worker_count:
+                worker = threading.Thread(target=self._run, name=f'mail-dispatcher-{len(self._workers)}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _next_job(self, timeout):
+        with self._lock:
+            if self._retries and self._retries[0][0] <= time.monotonic():
+                return heapq.heappop(self._retries)[2]
+            if self._retries:
+                timeout = min(timeout, max(self._retries[0][0] - time.monotonic(), 0))
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            job = self._next_job(self.idle_timeout)
+            if job is None:
+                continue
+            with self.app.app_context():
+                self._send_batch(job)
+
+    def _send_batch(self, job):
+        sent = 0
+        try:
+            with self.mail.connect() as connection:
+                while job is not None:
+                    try:
+                        connection.send(job.message)
+                    except Exception as e:
+                        # The connection may be unusable after a failure; the next batch opens a fresh one
+                        self._retry(job, e)
+                        return
+                    job = None
+                    sent += 1
+                    with self._lock:
+                        self.sent += 1
+                    if sent >= self.batch_size:
+                        return
+                    job = self._next_job(self.idle_timeout)
+        except Exception as e:
+            # Connecting or closing failed; only a job still in hand is unsent
+            if job is not None:
+                self._retry(job, e)
+
+    def _retry(self, job, error):
+        job.attempts += 1
+        if job.attempts > self.max_retries:
+            with self._lock:
+                self.failed += 1
+            self.app.logger.error(f'Giving up on email to {job.message.recipients} after {job.attempts} attempts: '
+                                  f'{error}')
+            return
+
+        delay = self.retry_backoff * (2 ** (job.attempts - 1)) * random.uniform(0.8, 1.2)
+        self.app.logger.warning(f'Failed to send email to {job.message.recipients} ({error}); '
+                                f'retrying in {delay:.1f}s')
+        with self._lock:
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._sequence), job))
@@ -0,0 +1,178 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+
+from src.services.FileReclaimerService import FileReclaimerService
+from src.services.StorageService import StorageService
+from src.utils.isobmff import MediaFormatError, faststart, needs_faststart, read_movie, read_top_level_boxes
+from src.utils.seekIndex import write_seek_index
+from src.utils.worker import PeriodicWorker
+
+# Containers the ISO-BMFF reader understands; others are marked skipped
+ISO_BMFF_EXTENSIONS = {'mp4', 'mov'}
+
+storage_service = StorageService()
+file_reclaimer_service = FileReclaimerService()
+
+
+class MediaProcessingService:
+    """
+    Post-processes uploaded videos in the background: relocates the ``moov`` box of MP4/MOV files to the front
+    (faststart), records duration, resolution, codecs and bitrate on the ``Video`` row, and writes the keyframe seek
+    index sidecar (``<file>.seek``).
+
+    The queue is the ``video.processing_status`` column: uploads are stored as ``pending`` and any process may claim
+    them, so several workers never process the same video. A claim is a lease: rows still ``processing`` after
+    ``MEDIA_PROCESSING_LEASE`` seconds (the worker died or was restarted) go back to ``pending``, so nothing is lost.
+    Stored files are named by their content, so a relocated file is stored as a new blob and the row is pointed at
+    it; the original goes to the reclaimer, which keeps it while other videos still use it.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MediaProcessingService, cls).__new__(cls)
+            cls._instance._worker = None
+            cls._instance._listeners = []
+        return cls._instance
+
+    def init_app(self, app, db, Video):
+        if self._worker is not None:
+            return
+        self.app = app
+        self.db = db
+        self.Video = Video
+        self.enabled = app.config.get('MEDIA_PROCESSING_ENABLED', True)
+        self.batch_size = app.config.get('MEDIA_PROCESSING_BATCH_SIZE', 10)
+        self.lease = app.config.get('MEDIA_PROCESSING_LEASE', 1800)
+        self.upload_folder = app.config.get('UPLOAD_FOLDER')
+        self._worker = PeriodicWorker('media-processing', self.process_pending,
+                                      app.config.get('MEDIA_PROCESSING_INTERVAL', 60))
+        if self.enabled:
+            # Started on the first request so each server worker runs its own thread after forking
+            app.before_request(self._worker.ensure_started)
+
+    def add_listener(self, listener):
+        # Called with the ids of videos whose metadata changed
+        self._listeners.append(listener)
+
+    def enqueue(self):
+        # New rows are already stored as pending; just make the worker look now
+        if self._worker is not None and self.enabled:
+            self._worker.ensure_started()
+            self._worker.wake()
+
+    def process_pending(self):
+        processed = 0
+        with self.app.app_context():
+            self.release_expired_claims()
+            while True:
+                video_ids = [row[0] for row in self.db.session.query(self.Video.id)
+                             .filter(self.Video.processing_status == 'pending').limit(self.batch_size).all()]
+                if not video_ids:
+                    return processed
+                for video_id in video_ids:
+                    if self.process_video(video_id):
+                        processed += 1
+
+    def release_expired_claims(self):
+        table = self.Video.__table__
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease)
+        # Claims without a start time were taken before the lease existed
+        released = self.db.session.execute(
+            table.update().where(table.c.processing_status == 'processing',
+                                 or_(table.c.processing_started_at < cutoff, table.c.processing_started_at.is_(None)))
+            .values(processing_status='pending', processing_started_at=None, updated_at=table.c.updated_at)).rowcount
+        self.db.session.commit()
+        if released:
+            self.app.logger.warning(f'Re-queued {released} videos whose media processing claim expired')
+        return released
+
+    def process_video(self, video_id):
+        table = self.Video.__table__
+        db = self.db
+
+        # Claim the row; another worker may have taken it first
+        claimed = db.session.execute(
+            table.update().where(table.c.id == video_id, table.c.processing_status == 'pending')
+            .values(processing_status='processing', processing_started_at=datetime.utcnow(),
+                    updated_at=table.c.updated_at)).rowcount
+        db.session.commit()
+        if not claimed:
+            return False
+
+        video_url = db.session.query(self.Video.video_url).filter_by(id=video_id).scalar()
+        if video_url is None:
+            return False  # deleted since it was claimed
+
+        try:
+            values = self._process_file(video_url)
+        except (MediaFormatError, OSError, ValueError) as e:
+            self.app.logger.warning(f'Media processing failed for video {video_id}: {e}')
+            values = {'processing_status': 'failed'}
+        except Exception:
+            # Anything else is a bug; give up on this video instead of leaving it claimed until the lease expires
+            self.app.logger.exception(f'Unexpected error processing video {video_id}')
+            values = {'processing_status': 'failed'}
+
+        values['processing_started_at'] = None
+        updated = db.session.execute(table.update().where(table.c.id == video_id).values(**values)).rowcount
+        db.session.commit()
+
+        new_url = values.get('video_url')
+        if new_url and new_url != video_url:
+            # The video now uses the relocated blob; a new blob whose row was deleted meanwhile is not used at all
+            file_reclaimer_service.enqueue([video_url] if updated else [video_url, new_url])
+
+        for listener in self._listeners:
+            listener([video_id])
+        return True
+
+    def _process_file(self, path):
+        if path.rsplit('.', 1)[-1].lower() not in ISO_BMFF_EXTENSIONS:
+            return {'processing_status': 'skipped'}
+
+        values = {}
+        with open(path, 'rb') as current:
+            relocate = needs_faststart(read_top_level_boxes(current))
+        if relocate:
+            blob = self._faststart(path)
+            if blob is not None:
+                path = blob.path
+                values.update(video_url=blob.path, content_hash=blob.sha256)
+
+        movie = read_movie(path)
+        video_track = movie.video_track
+        audio_track = movie.audio_track
+        duration = movie.duration_seconds
+        size = os.path.getsize(path)
+        # Keyframe index for /seek and ?t= streaming, written after faststart so the offsets are final
+        write_seek_index(path, video_track)
+
+        values.update({
+            'duration': round(duration, 3) if duration else None,
+            'width': video_track.width if video_track else None,
+            'height': video_track.height if video_track else None,
+            'video_codec': video_track.codec if video_track else None,
+            'audio_codec': audio_track.codec if audio_track else None,
+            'bitrate': int(size * 8 / duration) if duration else None,
+            'video_size': size,
+            'processing_status': 'ready',
+        })
+        return values
+
+    def _faststart(self, path):
+        # Returns the StoredBlob of the relocated copy, or None when the file could not be relocated. Videos sharing
+        # the original produce identical copies, which are stored once like any other duplicate upload.
+        temp_path = f'{path}.{uuid.uuid4().hex}.faststart'
+        try:
+            if not faststart(path, temp_path):
+                return None
+            with open(temp_path, 'rb') as written:
+                os.fsync(written.fileno())
+            return storage_service.adopt_file(temp_path, self.upload_folder)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHashBusy(Exception):
+    pass
+
+
+def _generate_password_hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _check_password_hash(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHashService:
+    """
+    Runs password hashing and verification in a bounded process pool so the deliberately slow KDF never holds the
+    GIL of a request worker.
+
+    At most ``PASSWORD_HASH_MAX_PENDING`` calls may be queued or running; callers beyond that wait up to
+    ``PASSWORD_HASH_TIMEOUT`` seconds and then get ``PasswordHashBusy``. A call still running after the timeout keeps
+    its slot until it finishes, and a pool whose worker died is rebuilt. ``PASSWORD_HASH_WORKERS=0`` hashes inline.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PasswordHashService, cls).__new__(cls)
+            cls._instance.configure()
+            os.register_at_fork(after_in_child=cls._instance._reset)
+        return cls._instance
+
+    def init_app(self, app):
+        self.configure(app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+                       app.config.get('PASSWORD_HASH_WORKERS'),
+                       app.config.get('PASSWORD_HASH_MAX_PENDING'),
+                       app.config.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    def configure(self, method='scrypt', workers=None, max_pending=None, timeout=10):
+        self.method = method
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending or max(self.workers, 1) * 4
+        self.timeout = timeout
+        if getattr(self, '_pool', None) is not None:
+            self._pool.shutdown(wait=False)
+        self._reset()
+
+    def _reset(self):
+        # A pool inherited through fork() belongs to the parent; children build their own on first use
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._method_prefix = None
+
+    def hash(self, password):
+        return self._call(_generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._call(_check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when ``password_hash`` was made with different parameters than the configured method."""
+        if self._method_prefix is None:
+            # Let werkzeug fill in its defaults (e.g. "scrypt" -> "scrypt:32768:8:1") once
+            self._method_prefix = self.hash('').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def _call(self, function, *args):
+        if not self.workers:
+            return function(*args)
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHashBusy('Too many password hashing requests in progress')
+        slots = self._slots
+        pool = None
+        try:
+            pool = self._get_pool()
+            future = pool.submit(function, *args)
+        except BrokenProcessPool:
+            slots.release()
+            self._discard_pool(pool)
+            raise PasswordHashBusy('Password hashing pool is restarting')
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the work is actually done, not just until this caller stops waiting for it
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHashBusy('Password hashing timed out')
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise PasswordHashBusy('Password hashing pool is restarting')
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # forkserver children start from a clean single-threaded process that has only this module
+                    # loaded, instead of a copy of a threaded web worker (fork) or a re-import of the app (spawn)
+                    context = multiprocessing.get_context('forkserver')
+                    context.set_forkserver_preload([__name__])
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._pool
+
+    def _discard_pool(self, pool):
+        # A worker died (OOM, kill); the executor is unusable, so the next call starts a new one
+        with self._pool_lock:
+            if pool is not None and self._pool is pool:
+                self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -0,0 +1,82 @@
+import threading
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+
+class PrincipalCacheService:
+    """
+    Short-lived cache of serialized users by id, so authenticated requests can resolve the JWT subject without a
+    query.
+
+    Entries are dropped after any commit that updated or deleted the user through the ORM (password resets,
+    rehashes, role changes), and expire after ``PRINCIPAL_CACHE_TTL`` seconds so changes made by other processes
+    are seen within that window. Bulk ``query(User).update()`` bypasses the ORM events and must call
+    ``invalidate`` itself.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PrincipalCacheService, cls).__new__(cls)
+            cls._instance._configure(10000, 60)
+            cls._instance._listening = False
+        return cls._instance
+
+    def init_app(self, app, User):
+        self._configure(app.config.get('PRINCIPAL_CACHE_MAXSIZE', 10000), app.config.get('PRINCIPAL_CACHE_TTL', 60))
+        if not self._listening:
+            event.listen(User, 'after_update', self._on_change)
+            event.listen(User, 'after_delete', self._on_change)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+            self._listening = True
+
+    def _configure(self, maxsize, ttl):
+        self._lock = threading.Lock()
+        self._users = TTLCache(maxsize, ttl) if ttl > 0 else None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_user(self, user_id, loader):
+        # loader() returns the serialized user, or None when it does not exist
+        with self._lock:
+            payload = self._users.get(user_id) if self._users is not None else None
+            if payload is not None:
+                self.hits += 1
+                return dict(payload)
+            self.misses += 1
+            generation = self._generation
+
+        payload = loader()
+        if payload is not None and self._users is not None:
+            with self._lock:
+                # Skip caching if the user changed while the row was being read
+                if generation == self._generation:
+                    self._users[user_id] = dict(payload)
+        return payload
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            if self._users is not None:
+                self._users.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._users or ())}
+
+    def _on_change(self, mapper, connection, target):
+        # Dropped once the change commits, so a concurrent read cannot re-cache the old row
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault('principal_invalidations', set()).add(target.id)
+
+    def _after_commit(self, session):
+        for user_id in session.info.pop('principal_invalidations', ()):
+            self.invalidate(user_id)
+
+    def _after_rollback(self, session):
+        session.info.pop('principal_invalidations', None)
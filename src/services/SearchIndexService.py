@@ -0,0 +1,301 @@
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from src.utils.worker import PeriodicWorker
+
+try:
+    import orjson
+except ImportError:  # optional dependency; snapshots use the stdlib encoder without it
+    orjson = None
+
+# Bump when tokenization or weighting changes so old snapshots are rebuilt instead of loaded
+SNAPSHOT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r'\w+')
+TITLE_WEIGHT = 3  # a title term counts as this many description terms
+MAX_QUERY_TERMS = 16
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 50
+PREFIX_WEIGHT = 0.5  # completions of the last query term score below exact matches
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Rows are re-read this far behind the newest updated_at seen, so transactions that commit late are not missed
+REFRESH_OVERLAP = timedelta(seconds=10)
+
+
+def tokenize(text):
+    # Lowercased words with accents stripped, so 'Café' and 'cafe' match
+    if not text:
+        return []
+    text = text.casefold()
+    if not text.isascii():
+        text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return TOKEN_PATTERN.findall(text)
+
+
+def document_terms(title, description):
+    terms = defaultdict(int)
+    for term in tokenize(title):
+        terms[term] += TITLE_WEIGHT
+    for term in tokenize(description):
+        terms[term] += 1
+    return dict(terms)
+
+
+class SearchIndexService:
+    """
+    In-process inverted index over video titles and descriptions, ranked with BM25.
+
+    Each process holds its own copy. Writes made by this process are applied immediately; a background refresh
+    picks up rows other processes changed (by ``updated_at``), and videos deleted elsewhere are dropped when a
+    search finds them missing. The index is written to a snapshot file so a restart only reads rows changed
+    since the snapshot instead of every title and description.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SearchIndexService, cls).__new__(cls)
+            cls._instance._reset_locks()
+            cls._instance._clear()
+            cls._instance._worker = None
+            os.register_at_fork(after_in_child=cls._instance._reset_locks)
+        return cls._instance
+
+    def init_app(self, app, db, Video):
+        if self._worker is not None:
+            return
+        self.app = app
+        self.db = db
+        self.Video = Video
+        self.snapshot_path = app.config.get('SEARCH_SNAPSHOT_PATH')
+        self.snapshot_interval = app.config.get('SEARCH_SNAPSHOT_INTERVAL', 300)
+        self._worker = PeriodicWorker('search-index', self.refresh, app.config.get('SEARCH_REFRESH_INTERVAL', 30))
+        # Started on the first request so each server worker runs its own thread after forking
+        app.before_request(self._start_worker)
+
+    def _reset_locks(self):
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+
+    def _clear(self):
+        self._postings = {}  # term -> {video id: weighted term frequency}
+        self._terms = []  # sorted vocabulary, for prefix lookups
+        self._docs = {}  # video id -> [weighted length, {term: weighted term frequency}]
+        self._total_length = 0
+        self._watermark = None  # newest updated_at read from the database
+        self._loaded = False
+        self._dirty = False
+        self._snapshot_at = 0.0
+
+    def _start_worker(self):
+        self._worker.ensure_started()
+        if not self._loaded:
+            self._worker.wake()
+
+    def stats(self):
+        with self._lock:
+            return {'documents': len(self._docs), 'terms': len(self._postings)}
+
+    # Incremental updates
+
+    def index_video(self, video_id, title, description):
+        with self._lock:
+            self._add(video_id, document_terms(title, description))
+
+    def remove_video(self, video_id):
+        with self._lock:
+            self._remove(video_id)
+
+    def _add(self, video_id, terms, keep_sorted=True):
+        existing = self._docs.get(video_id)
+        if existing is not None and existing[1] == terms:
+            return  # re-read but unchanged
+        self._remove(video_id, keep_sorted)
+        length = sum(terms.values())
+        self._docs[video_id] = [length, terms]
+        self._total_length += length
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if keep_sorted:
+                    bisect.insort(self._terms, term)
+            postings[video_id] = frequency
+        self._dirty = True
+
+    def _remove(self, video_id, keep_sorted=True):
+        entry = self._docs.pop(video_id, None)
+        if entry is None:
+            return
+        length, terms = entry
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings[term]
+            del postings[video_id]
+            if not postings:
+                del self._postings[term]
+                if keep_sorted:
+                    del self._terms[bisect.bisect_left(self._terms, term)]
+        self._dirty = True
+
+    # Queries
+
+    def search(self, query, limit=10, offset=0):
+        """Return ``(video ids, total matches)`` for the best ``limit`` matches after ``offset``."""
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return [], 0
+        self.ensure_loaded()
+
+        with self._lock:
+            count = len(self._docs)
+            if not count:
+                return [], 0
+            average_length = self._total_length / count
+
+            scores = defaultdict(float)
+            for position, term in enumerate(terms):
+                matches = [(term, 1.0)] if term in self._postings else []
+                if position == len(terms) - 1 and len(term) >= MIN_PREFIX_LENGTH:
+                    # Search-as-you-type: the last term also matches words it is a prefix of
+                    matches += [(completion, PREFIX_WEIGHT) for completion in self._completions(term)]
+                for match, weight in matches:
+                    postings = self._postings[match]
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for video_id, frequency in postings.items():
+                        length = self._docs[video_id][0]
+                        scores[video_id] += weight * idf * frequency * (K1 + 1) / (
+                            frequency + K1 * (1 - B + B * length / average_length))
+
+        ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [video_id for video_id, _ in ranked[offset:]], len(scores)
+
+    def _completions(self, prefix):
+        # Longer words starting with prefix, keeping the most common ones when there are many
+        start = bisect.bisect_right(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + '\U0010ffff', start)
+        candidates = self._terms[start:end]
+        if len(candidates) > MAX_PREFIX_EXPANSIONS:
+            candidates = heapq.nlargest(MAX_PREFIX_EXPANSIONS, candidates, key=lambda term: len(self._postings[term]))
+        return candidates
+
+    # Loading and refreshing from the database
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            started = time.monotonic()
+            restored = self._load_snapshot()
+            self._catch_up(reconcile=True)
+            with self._lock:
+                self._loaded = True
+            self.app.logger.info(f'Search index ready: {len(self._docs)} videos '
+                                 f'({"snapshot" if restored else "full build"}, '
+                                 f'{time.monotonic() - started:.2f}s)')
+            self.save_snapshot()
+
+    def refresh(self):
+        with self.app.app_context():
+            if not self._loaded:
+                self.ensure_loaded()
+                return
+            self._catch_up()
+            if self._dirty and time.monotonic() - self._snapshot_at >= self.snapshot_interval:
+                self.save_snapshot()
+
+    def _catch_up(self, reconcile=False):
+        Video = self.Video
+        session = self.db.session
+        query = session.query(Video.id, Video.title, Video.description, Video.updated_at)
+        if self._watermark is not None:
+            query = query.filter(Video.updated_at >= self._watermark - REFRESH_OVERLAP)
+        rows = query.all()
+
+        existing_ids = None
+        if reconcile and self._docs:
+            # Rows deleted while this process was down, or older than the snapshot but missing from it
+            existing_ids = {row[0] for row in session.query(Video.id)}
+            missing = existing_ids - self._docs.keys() - {row.id for row in rows}
+            if missing:
+                rows += session.query(Video.id, Video.title, Video.description, Video.updated_at) \
+                    .filter(Video.id.in_(missing)).all()
+        session.commit()
+
+        with self._lock:
+            bulk = len(rows) > 1000
+            for row in rows:
+                self._add(row.id, document_terms(row.title, row.description), keep_sorted=not bulk)
+                if row.updated_at is not None and (self._watermark is None or row.updated_at > self._watermark):
+                    self._watermark = row.updated_at
+            if existing_ids is not None:
+                for video_id in self._docs.keys() - existing_ids:
+                    self._remove(video_id, keep_sorted=not bulk)
+            if bulk:
+                self._terms = sorted(self._postings)
+
+    # Snapshots
+
+    def save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            snapshot = {
+                'version': SNAPSHOT_VERSION,
+                'watermark': self._watermark.isoformat() if self._watermark else None,
+                # Both directions are stored: inverting one into the other on load costs more than parsing both
+                'docs': self._docs,
+                'postings': self._postings,
+            }
+            data = orjson.dumps(snapshot) if orjson else json.dumps(snapshot).encode('utf-8')
+            self._dirty = False
+            self._snapshot_at = time.monotonic()
+
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.snapshot_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as snapshot_file:
+            snapshot_file.write(data)
+        os.replace(temp_path, self.snapshot_path)
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, 'rb') as snapshot_file:
+                data = snapshot_file.read()
+            snapshot = orjson.loads(data) if orjson else json.loads(data)
+            if snapshot.get('version') != SNAPSHOT_VERSION:
+                return False
+            watermark = snapshot['watermark']
+            docs = snapshot['docs']
+            postings = snapshot['postings']
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            self.app.logger.warning(f'Ignoring unreadable search snapshot {self.snapshot_path}: {e}')
+            return False
+
+        with self._lock:
+            self._clear()
+            self._postings = postings
+            self._terms = sorted(postings)
+            self._docs = docs
+            self._total_length = sum(entry[0] for entry in docs.values())
+            self._watermark = datetime.fromisoformat(watermark) if watermark else None
+            self._dirty = False
+        return True
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import time
+import uuid
+from collections import namedtuple
+
+from src.utils.metrics import MetricsRegistry
+from src.utils.seekIndex import sidecar_path
+
+# Number of leading bytes inspected to recognise the container format
+SNIFF_SIZE = 4096
+
+# Top-level ISO-BMFF box types a valid MP4/MOV file can start with
+ISO_BMFF_BOXES = {b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pnot'}
+
+StoredBlob = namedtuple('StoredBlob', ['path', 'size', 'sha256', 'container'])
+
+upload_bytes = MetricsRegistry().counter('video_upload_bytes_total', 'Video bytes received from clients', ('method',))
+
+
+class IngestError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StorageService:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StorageService, cls).__new__(cls)
+        return cls._instance
+
+    def sniff_container(self, head):
+        # Identify the container from its magic bytes, returning the canonical extension
+        if len(head) >= 8 and head[4:8] in ISO_BMFF_BOXES:
+            return 'mov' if head[4:8] == b'ftyp' and head[8:12] == b'qt  ' else 'mp4'
+        if head[:4] == b'\x1a\x45\xdf\xa3':
+            return 'mkv'
+        if head[:4] == b'RIFF' and head[8:12] == b'AVI ':
+            return 'avi'
+        return None
+
+    def read_head(self, stream, size=SNIFF_SIZE):
+        # Streams may return short reads, so keep reading until we have enough bytes or hit EOF
+        head = b''
+        while len(head) < size:
+            chunk = stream.read(size - len(head))
+            if not chunk:
+                break
+            head += chunk
+        return head
+
+    def blob_path(self, upload_folder, sha256, container):
+        return os.path.join(upload_folder, 'blobs', sha256[:2], sha256[2:4], f'{sha256}.{container}')
+
+    def ingest_stream(self, stream, upload_folder, max_size, chunk_size=1024 * 1024):
+        """
+        Store an uploaded video in one pass over ``stream``: the container is sniffed before anything is written,
+        the SHA-256 and size are computed while the bytes are copied, and identical content is stored only once.
+        """
+        head = self.read_head(stream)
+        container = self.sniff_container(head)
+        if container is None:
+            raise IngestError('Unsupported file type. Only video files (MP4, AVI, MKV, MOV) are allowed.', 415)
+
+        temp_path = self._temp_path(upload_folder)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(temp_path, 'xb') as temp_file:
+                chunk = head
+                while chunk:
+                    size += len(chunk)
+                    if size > max_size:
+                        raise IngestError('File exceeds the maximum upload size', 413)
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    chunk = stream.read(chunk_size)
+
+            upload_bytes.inc('direct', amount=size)
+            return self._commit_blob(temp_path, upload_folder, digest.hexdigest(), size, container)
+
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def adopt_file(self, file_path, upload_folder, chunk_size=1024 * 1024):
+        # Move an already written file (e.g. a finished resumable upload) into content-addressed storage
+        digest = hashlib.sha256()
+        size = 0
+        with open(file_path, 'rb') as source:
+            container = self.sniff_container(self.read_head(source))
+            if container is None:
+                raise IngestError('Unsupported file type. Only video files (MP4, AVI, MKV, MOV) are allowed.', 415)
+            source.seek(0)
+            for chunk in iter(lambda: source.read(chunk_size), b''):
+                digest.update(chunk)
+                size += len(chunk)
+
+        return self._commit_blob(file_path, upload_folder, digest.hexdigest(), size, container)
+
+    def _commit_blob(self, temp_path, upload_folder, sha256, size, container):
+        path = self.blob_path(upload_folder, sha256, container)
+        if os.path.exists(path):
+            # Same content is already stored; keep the existing blob. Bumping its access time tells the reclaimer the
+            # blob is about to gain a reference, in case the last row using it was just deleted. The modification
+            # time is left alone so the file's ETag and seek index stay valid.
+            os.remove(temp_path)
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        return StoredBlob(path, size, sha256, container)
+
+    def remove_blob(self, path):
+        # Delete a stored file and its derived sidecars; returns the number of bytes freed
+        freed = 0
+        for file_path in (path, sidecar_path(path)):
+            try:
+                size = os.stat(file_path).st_size
+                os.remove(file_path)
+                freed += size
+            except FileNotFoundError:
+                pass
+        return freed
+
+    def _temp_path(self, upload_folder):
+        temp_folder = os.path.join(upload_folder, 'tmp')
+        os.makedirs(temp_folder, exist_ok=True)
+        return os.path.join(temp_folder, f'{uuid.uuid4().hex}.part')
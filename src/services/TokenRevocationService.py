@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from cachetools import TTLCache
+
+from migration.routing import primary
+from src.services.JWTService import jwt
+from src.utils.bloomFilter import BloomFilter
+from src.utils.metrics import MetricsRegistry
+from src.utils.worker import PeriodicWorker
+
+# Revocations are re-read this far behind the newest one seen, so transactions that commit late are not missed
+REFRESH_OVERLAP = timedelta(seconds=10)
+
+# Tokens issued without an expiry stay revoked until the row is deleted by hand
+NO_EXPIRY = datetime(9999, 12, 31)
+
+metrics = MetricsRegistry()
+blocklist_checks = metrics.counter('token_blocklist_exact_checks_total',
+                                   'Tokens the Bloom filter flagged, by the result of the exact check', ('result',))
+
+
+class TokenRevocationService:
+    """
+    Blocklist of logged-out access tokens (by ``jti``), checked by flask_jwt_extended on every protected request.
+
+    Revocations are stored in ``revoked_token`` until the token expires. Each process keeps a Bloom filter of the
+    live ones, so the usual answer (not revoked) costs a few bit tests and no query. Only tokens the filter flags
+    are looked up by primary key, and those answers are cached briefly. Revocations made by other processes are
+    added by a background refresh every ``TOKEN_REVOCATION_REFRESH_INTERVAL`` seconds, and the filter is rebuilt
+    from the live rows every ``TOKEN_REVOCATION_REBUILD_INTERVAL`` seconds to drop expired tokens.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TokenRevocationService, cls).__new__(cls)
+            cls._instance._worker = None
+            cls._instance._reset_locks()
+            cls._instance._filter = None
+            cls._instance._watermark = None
+            cls._instance._rebuilt_at = 0.0
+            os.register_at_fork(after_in_child=cls._instance._reset_locks)
+        return cls._instance
+
+    def init_app(self, app, db, RevokedToken):
+        if self._worker is not None:
+            return
+        self.app = app
+        self.db = db
+        self.RevokedToken = RevokedToken
+        self.capacity = app.config.get('TOKEN_REVOCATION_CAPACITY', 100000)
+        self.error_rate = app.config.get('TOKEN_REVOCATION_ERROR_RATE', 0.01)
+        self.rebuild_interval = app.config.get('TOKEN_REVOCATION_REBUILD_INTERVAL', 3600)
+        refresh_interval = app.config.get('TOKEN_REVOCATION_REFRESH_INTERVAL', 5)
+        # Exact answers for flagged tokens; a revocation made elsewhere is picked up within one refresh
+        self._checked = TTLCache(maxsize=10000, ttl=refresh_interval)
+        self._worker = PeriodicWorker('token-revocations', self.refresh, refresh_interval)
+        # Started on the first request so each server worker runs its own thread after forking
+        app.before_request(self._worker.ensure_started)
+        jwt.token_in_blocklist_loader(self._in_blocklist)
+
+    def _reset_locks(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def stats(self):
+        bloom = self._filter
+        return {
+            'tracked': len(bloom) if bloom is not None else 0,
+            'filter_bytes': len(bloom.bits) if bloom is not None else 0,
+        }
+
+    def revoke(self, jti, user_id, expires):
+        """Revoke the token ``jti`` until ``expires`` (its ``exp`` claim, seconds since the epoch)."""
+        expires_at = datetime.utcfromtimestamp(expires) if expires else NO_EXPIRY
+        self.db.session.merge(self.RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at,
+                                                revoked_at=datetime.utcnow()))
+        self.db.session.commit()
+        self.ensure_loaded()
+        with self._lock:
+            self._filter.add(jti)
+            self._checked[jti] = True
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+        self.ensure_loaded()
+        if jti not in self._filter:
+            return False
+
+        with self._lock:
+            revoked = self._checked.get(jti)
+        if revoked is None:
+            # A revoked token or a false positive; the replica may not have the row yet, so ask the primary
+            RevokedToken = self.RevokedToken
+            with primary():
+                revoked = self.db.session.query(RevokedToken.jti).filter(
+                    RevokedToken.jti == jti, RevokedToken.expires_at > datetime.utcnow()).first() is not None
+            with self._lock:
+                self._checked[jti] = revoked
+        blocklist_checks.inc('revoked' if revoked else 'false_positive')
+        return revoked
+
+    def _in_blocklist(self, jwt_header, jwt_payload):
+        return self.is_revoked(jwt_payload.get('jti'))
+
+    # Loading and refreshing from the database
+
+    def ensure_loaded(self):
+        if self._filter is not None:
+            return
+        with self._load_lock:
+            if self._filter is None:
+                self._rebuild()
+
+    def refresh(self):
+        with self.app.app_context():
+            if self._filter is None or time.monotonic() - self._rebuilt_at >= self.rebuild_interval:
+                with self._load_lock:
+                    self._rebuild()
+            else:
+                self._catch_up()
+
+    def _rebuild(self):
+        # A fresh filter from the live rows only, so expired tokens stop taking up space
+        RevokedToken = self.RevokedToken
+        session = self.db.session
+        with primary():  # the first load can happen inside a read-only request
+            rows = session.query(RevokedToken.jti, RevokedToken.revoked_at) \
+                .filter(RevokedToken.expires_at > datetime.utcnow()).all()
+        session.commit()
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        watermark = None
+        for row in rows:
+            bloom.add(row.jti)
+            if watermark is None or row.revoked_at > watermark:
+                watermark = row.revoked_at
+
+        with self._lock:
+            self._filter = bloom
+            self._watermark = watermark or self._watermark
+            self._rebuilt_at = time.monotonic()
+        # Revocations committed while the rows were being read
+        self._catch_up()
+
+    def _catch_up(self):
+        RevokedToken = self.RevokedToken
+        session = self.db.session
+        query = session.query(RevokedToken.jti, RevokedToken.revoked_at)
+        if self._watermark is not None:
+            query = query.filter(RevokedToken.revoked_at >= self._watermark - REFRESH_OVERLAP)
+        with primary():
+            rows = query.filter(RevokedToken.expires_at > datetime.utcnow()).all()
+        session.commit()
+
+        with self._lock:
+            for row in rows:
+                if row.jti not in self._filter:
+                    self._filter.add(row.jti)
+                self._checked.pop(row.jti, None)  # drop a cached "not revoked" from before the revocation
+                if self._watermark is None or row.revoked_at > self._watermark:
+                    self._watermark = row.revoked_at
@@ -0,0 +1,160 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from src.utils.decayedTopK import DecayedTopK
+from src.utils.worker import PeriodicWorker
+
+try:
+    import orjson
+except ImportError:  # optional dependency; snapshots use the stdlib encoder without it
+    orjson = None
+
+# Bump when weights or half-lives change so old snapshots are discarded instead of loaded
+SNAPSHOT_VERSION = 1
+
+# Half-life in seconds of an event's weight in each window
+WINDOWS = {'hour': 3600, 'day': 24 * 3600, 'week': 7 * 24 * 3600}
+
+VIEW_WEIGHT = 1
+SHARE_WEIGHT = 5  # a share counts as this many views
+
+# Videos outside the top whose score decayed below PRUNE_BELOW (about seven half-lives after a single view) are
+# forgotten at each checkpoint, and each window tracks at most MAX_TRACKED videos
+PRUNE_BELOW = 0.01
+MAX_TRACKED = 100000
+
+
+class TrendingService:
+    """
+    In-process ranking of videos by recent views and shares, with one time-decayed score per window.
+
+    Views and shares are added as they are recorded and only the ``TRENDING_TOP_K`` best videos per window are
+    ranked, so reading the trending list never touches the database or sorts the video table. Each process ranks
+    the events it handles; behind a balancer that spreads requests evenly this is a sample of all traffic, ordered
+    the same. Scores are checkpointed to ``TRENDING_SNAPSHOT_PATH`` every ``TRENDING_SNAPSHOT_INTERVAL`` seconds and
+    at exit, and a process starts from the snapshot, so a restart keeps the ranking without reading every video.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TrendingService, cls).__new__(cls)
+            cls._instance._reset_locks()
+            cls._instance._configure(200, None)
+            cls._instance._worker = None
+            os.register_at_fork(after_in_child=cls._instance._reset_locks)
+        return cls._instance
+
+    def init_app(self, app):
+        if self._worker is not None:
+            return
+        self.app = app
+        self._configure(app.config.get('TRENDING_TOP_K', 200), app.config.get('TRENDING_SNAPSHOT_PATH'))
+        self._worker = PeriodicWorker('trending-checkpoint', self.checkpoint,
+                                      app.config.get('TRENDING_SNAPSHOT_INTERVAL', 60))
+        # Started on the first request so each server worker runs its own thread after forking
+        app.before_request(self._worker.ensure_started)
+        atexit.register(self.checkpoint)
+
+    def _reset_locks(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _configure(self, top_k, snapshot_path):
+        self.top_k = top_k
+        self.snapshot_path = snapshot_path
+        now = time.time()
+        self._rankings = {window: DecayedTopK(half_life, top_k, now) for window, half_life in WINDOWS.items()}
+        self._loaded = False
+        self._dirty = False
+
+    def stats(self):
+        with self._lock:
+            return {window: len(ranking) for window, ranking in self._rankings.items()}
+
+    # Events
+
+    def record_view(self, video_id, count=1):
+        self._record(video_id, count * VIEW_WEIGHT)
+
+    def record_share(self, video_id, count=1):
+        self._record(video_id, count * SHARE_WEIGHT)
+
+    def _record(self, video_id, weight):
+        self.ensure_loaded()
+        now = time.time()
+        with self._lock:
+            for ranking in self._rankings.values():
+                ranking.add(video_id, weight, now)
+            self._dirty = True
+
+    def remove_videos(self, video_ids):
+        self.ensure_loaded()
+        with self._lock:
+            for ranking in self._rankings.values():
+                if ranking.remove(video_ids):
+                    self._dirty = True
+
+    # Queries
+
+    def trending(self, window, limit=20, offset=0):
+        """Return ``(video id, score)`` pairs for the best ``limit`` videos after ``offset``, and how many are ranked."""
+        self.ensure_loaded()
+        with self._lock:
+            ranked = self._rankings[window].ranked(time.time())
+        return ranked[offset:offset + limit], len(ranked)
+
+    # Snapshots
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_snapshot()
+                self._loaded = True
+
+    def checkpoint(self):
+        if not self._loaded:
+            return  # never overwrite a snapshot this process has not read
+        now = time.time()
+        with self._lock:
+            for ranking in self._rankings.values():
+                if ranking.prune(now, PRUNE_BELOW, MAX_TRACKED):
+                    self._dirty = True
+            if not self._dirty or not self.snapshot_path:
+                return
+            snapshot = {
+                'version': SNAPSHOT_VERSION,
+                'rankings': {window: ranking.to_json() for window, ranking in self._rankings.items()},
+            }
+            data = orjson.dumps(snapshot) if orjson else json.dumps(snapshot).encode('utf-8')
+            self._dirty = False
+
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.snapshot_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as snapshot_file:
+            snapshot_file.write(data)
+        os.replace(temp_path, self.snapshot_path)
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'rb') as snapshot_file:
+                data = snapshot_file.read()
+            snapshot = orjson.loads(data) if orjson else json.loads(data)
+            if snapshot.get('version') != SNAPSHOT_VERSION:
+                return
+            rankings = {window: DecayedTopK.from_json(snapshot['rankings'][window], self.top_k) for window in WINDOWS}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            self.app.logger.warning(f'Ignoring unreadable trending snapshot {self.snapshot_path}: {e}')
+            return
+
+        with self._lock:
+            self._rankings = rankings
@@ -0,0 +1,288 @@
+import fcntl
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from werkzeug.exceptions import ClientDisconnected
+
+from src.services.FileReclaimerService import FileReclaimerService
+from src.services.MediaProcessingService import MediaProcessingService
+from src.services.SearchIndexService import SearchIndexService
+from src.services.StorageService import SNIFF_SIZE, IngestError, StorageService, upload_bytes
+from src.services.VideoCounterService import VideoCounterService
+from src.services.VideoService import ALLOWED_EXTENSIONS
+from src.utils.responseEntity import error_response, success_response
+
+# Content type used by tus clients for chunk uploads
+CHUNK_CONTENT_TYPE = 'application/offset+octet-stream'
+
+storage_service = StorageService()
+video_counter_service = VideoCounterService()
+media_processing_service = MediaProcessingService()
+search_index_service = SearchIndexService()
+file_reclaimer_service = FileReclaimerService()
+
+
+class UploadService:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(UploadService, cls).__new__(cls)
+        return cls._instance
+
+    @jwt_required(optional=True)
+    def create_session(self, db, UploadSession, Config, secure_filename, request, logger=None):
+        current_user_id = get_jwt_identity()
+        if not current_user_id:
+            return error_response('Authorization header is missing or invalid', status_code=401, logger=logger)
+
+        data = request.get_json(silent=True) or {}
+        title = data.get('title')
+        description = data.get('description')
+        filename = data.get('filename')
+        upload_length = data.get('size', request.headers.get('Upload-Length'))
+
+        # Check if required fields are present
+        if not title or not filename or upload_length is None:
+            return error_response('Missing required fields: title, filename and size', status_code=400, logger=logger)
+
+        try:
+            upload_length = int(upload_length)
+        except (TypeError, ValueError):
+            return error_response('Size must be an integer', status_code=400, logger=logger)
+
+        if upload_length <= 0:
+            return error_response('Size must be greater than zero', status_code=400, logger=logger)
+
+        if upload_length > Config.UPLOAD_MAX_SIZE:
+            return error_response('File exceeds the maximum upload size', status_code=413, logger=logger)
+
+        if '.' in filename and filename.rsplit('.', 1)[1].lower() not in ALLOWED_EXTENSIONS:
+            return error_response('Unsupported file type. Only video files (MP4, AVI, MKV, MOV) are allowed.',
+                                  status_code=415, logger=logger)
+
+        try:
+            # Chunks are appended straight to this file, which is moved into blob storage on completion
+            filename = secure_filename(filename)
+            unique_filename = f"{uuid.uuid4().hex[:6]}_{filename}"
+            upload_folder = os.path.join(Config.UPLOAD_FOLDER, 'uploads')
+            os.makedirs(upload_folder, exist_ok=True)
+            file_path = os.path.join(upload_folder, unique_filename)
+            open(file_path, 'xb').close()
+
+            upload_session = UploadSession(
+                user_id=current_user_id,
+                title=title,
+                description=description,
+                filename=filename,
+                file_path=file_path,
+                upload_length=upload_length,
+                upload_offset=0,
+                expires_at=datetime.utcnow() + timedelta(hours=Config.UPLOAD_SESSION_EXPIRES_HOURS)
+            )
+
+            db.session.add(upload_session)
+            db.session.commit()
+
+            body, status_code = success_response('Upload session created successfully', upload_session.to_json(),
+                                                 status_code=201, logger=logger)
+            return body, status_code, self._offset_headers(upload_session, {
+                'Location': f'/api/v1/video/upload/{upload_session.id}'
+            })
+
+        except Exception as e:
+            db.session.rollback()
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    @jwt_required(optional=True)
+    def get_session(self, db, UploadSession, upload_id, logger=None):
+        upload_session, error = self._get_owned_session(db, UploadSession, upload_id, logger)
+        if error:
+            return error
+
+        # The file on disk is the source of truth for how much has been received
+        upload_session.upload_offset = os.path.getsize(upload_session.file_path)
+
+        body, status_code = success_response('Upload session retrieved successfully', upload_session.to_json(),
+                                             logger=logger)
+        return body, status_code, self._offset_headers(upload_session, {'Cache-Control': 'no-store'})
+
+    @jwt_required(optional=True)
+    def append_chunk(self, db, UploadSession, Config, upload_id, request, logger=None):
+        upload_session, error = self._get_owned_session(db, UploadSession, upload_id, logger)
+        if error:
+            return error
+
+        if request.mimetype != CHUNK_CONTENT_TYPE:
+            return error_response(f'Content-Type must be {CHUNK_CONTENT_TYPE}', status_code=415, logger=logger)
+
+        try:
+            client_offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return error_response('Missing or invalid Upload-Offset header', status_code=400, logger=logger)
+
+        try:
+            with open(upload_session.file_path, 'ab') as upload_file:
+                # Refuse concurrent writers instead of interleaving their bytes
+                try:
+                    fcntl.flock(upload_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return error_response('Another chunk is being uploaded for this session', status_code=409,
+                                          logger=logger)
+
+                offset = upload_file.seek(0, os.SEEK_END)
+                if client_offset != offset:
+                    body, status_code = error_response('Upload-Offset does not match the current offset',
+                                                       data={'upload_offset': offset}, status_code=409, logger=logger)
+                    return body, status_code, {'Upload-Offset': str(offset)}
+
+                remaining = upload_session.upload_length - offset
+                if request.content_length is not None and request.content_length > remaining:
+                    return error_response('Chunk exceeds the declared upload size', data={'upload_offset': offset},
+                                          status_code=413, logger=logger)
+
+                head = b''
+                sniff_length = min(upload_session.upload_length, SNIFF_SIZE)
+                if offset < sniff_length:
+                    # Clients may send the header in several small chunks, so sniff once all of it has arrived
+                    head = storage_service.read_head(request.stream, sniff_length - offset)
+                    if offset + len(head) == sniff_length:
+                        with open(upload_session.file_path, 'rb') as stored:
+                            prefix = stored.read(offset)
+                        if storage_service.sniff_container(prefix + head) is None:
+                            # Drop the partial header too, so the session starts over from offset 0
+                            upload_file.truncate(0)
+                            body, status_code = error_response(
+                                'Unsupported file type. Only video files (MP4, AVI, MKV, MOV) are allowed.',
+                                data={'upload_offset': 0}, status_code=415, logger=logger)
+                            return body, status_code, {'Upload-Offset': '0'}
+                    upload_file.write(head)
+
+                written = len(head) + self._copy_stream(request.stream, upload_file, remaining - len(head),
+                                                        Config.UPLOAD_CHUNK_SIZE)
+                upload_file.flush()
+                offset += written
+                upload_bytes.inc('resumable', amount=written)
+
+            upload_session.upload_offset = offset
+            db.session.commit()
+
+            body, status_code = success_response('Chunk uploaded successfully', {'upload_offset': offset},
+                                                 logger=logger)
+            return body, status_code, self._offset_headers(upload_session)
+
+        except Exception as e:
+            db.session.rollback()
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    @jwt_required(optional=True)
+    def complete_session(self, db, UploadSession, Video, VideoCounter, Config, upload_id, logger=None):
+        upload_session, error = self._get_owned_session(db, UploadSession, upload_id, logger)
+        if error:
+            return error
+
+        blob = None
+        try:
+            video_size = os.path.getsize(upload_session.file_path)
+            if video_size != upload_session.upload_length:
+                return error_response('Upload is incomplete', data={'upload_offset': video_size}, status_code=409,
+                                      logger=logger)
+
+            blob = storage_service.adopt_file(upload_session.file_path, Config.UPLOAD_FOLDER,
+                                              Config.UPLOAD_CHUNK_SIZE)
+
+            # Create a Video object and save to database
+            video = Video(
+                title=upload_session.title,
+                video_url=blob.path,
+                video_size=blob.size,
+                content_hash=blob.sha256,
+                share_link=str(uuid.uuid4()),
+                uploaded_by=upload_session.user_id,
+                description=upload_session.description
+            )
+
+            db.session.add(video)
+            db.session.delete(upload_session)
+            video_counter_service.adjust(db, VideoCounter, upload_session.user_id, 1)
+            db.session.commit()
+            media_processing_service.enqueue()
+            search_index_service.index_video(video.id, video.title, video.description)
+
+            return success_response('Video created successfully', video.to_json(), status_code=201, logger=logger)
+
+        except IngestError as e:
+            return error_response(str(e), status_code=e.status_code, logger=logger)
+
+        except Exception as e:
+            db.session.rollback()
+            if blob is not None:
+                file_reclaimer_service.enqueue([blob.path])  # stored, but the row was never committed
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    @jwt_required(optional=True)
+    def delete_session(self, db, UploadSession, upload_id, logger=None):
+        upload_session, error = self._get_owned_session(db, UploadSession, upload_id, logger)
+        if error:
+            return error
+
+        try:
+            file_path = upload_session.file_path
+            db.session.delete(upload_session)
+            db.session.commit()
+
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+            return success_response('Upload session deleted successfully', logger=logger)
+
+        except Exception as e:
+            db.session.rollback()
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    def discard_files(self, rows):
+        # Partial files of upload sessions deleted by the expiry sweeper, as (id, file_path) rows
+        for _, file_path in rows:
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _get_owned_session(self, db, UploadSession, upload_id, logger=None):
+        current_user_id = get_jwt_identity()
+        if not current_user_id:
+            return None, error_response('Authorization header is missing or invalid', status_code=401, logger=logger)
+
+        upload_session = db.session.query(UploadSession).filter_by(id=upload_id).first()
+
+        if not upload_session or upload_session.expires_at < datetime.utcnow():
+            return None, error_response('Upload session not found', status_code=404, logger=logger)
+
+        if current_user_id != upload_session.user_id:
+            return None, error_response('Unauthorized to access this upload session', status_code=403, logger=logger)
+
+        return upload_session, None
+
+    def _copy_stream(self, stream, upload_file, limit, chunk_size):
+        # Read the request body in fixed-size pieces and append them as they arrive
+        written = 0
+        try:
+            while written < limit:
+                chunk = stream.read(min(chunk_size, limit - written))
+                if not chunk:
+                    break
+                upload_file.write(chunk)
+                written += len(chunk)
+        except ClientDisconnected:
+            # Keep whatever arrived; the client resumes from the stored offset
+            pass
+        return written
+
+    def _offset_headers(self, upload_session, headers=None):
+        offset_headers = {
+            'Upload-Offset': str(upload_session.upload_offset),
+            'Upload-Length': str(upload_session.upload_length),
+        }
+        if headers:
+            offset_headers.update(headers)
+        return offset_headers
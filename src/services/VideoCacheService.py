@@ -0,0 +1,137 @@
+import copy
+import threading
+
+from cachetools import Cache, TTLCache
+
+
+class StatsTTLCache(TTLCache):
+    # TTLCache that counts capacity evictions and TTL expirations
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize, ttl)
+        self.evictions = 0
+        self.expirations = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        # Cache.__len__ counts entries without triggering another expiry pass
+        size = Cache.__len__(self)
+        super().expire(time)
+        self.expirations += size - Cache.__len__(self)
+
+
+class VideoCacheService:
+    """
+    Read-through TTL + LRU cache of serialized videos, addressable by id and by share link.
+
+    Entries are dropped when a video is updated, deleted or has its counters flushed. Concurrent misses for the
+    same key wait for a single loader instead of all hitting the database.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(VideoCacheService, cls).__new__(cls)
+            cls._instance._configure(10000, 60)
+        return cls._instance
+
+    def init_app(self, app):
+        self._configure(app.config.get('VIDEO_CACHE_MAXSIZE', 10000), app.config.get('VIDEO_CACHE_TTL', 60))
+
+    def _configure(self, maxsize, ttl):
+        self._lock = threading.Lock()
+        self._videos = StatsTTLCache(maxsize, ttl)  # video id -> (share link, payload)
+        self._share_links = TTLCache(maxsize, ttl)  # share link -> video id
+        self._loading = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_video(self, video_id, loader):
+        # loader() returns (video_id, share_link, payload), or None when the video does not exist
+        return self._get(('id', video_id), lambda: self._lookup_id(video_id), lambda: self._load(loader))
+
+    def get_video_by_share_link(self, share_link, loader):
+        return self._get(('share', share_link), lambda: self._lookup_share_link(share_link),
+                         lambda: self._load(loader))
+
+    def invalidate(self, video_id):
+        with self._lock:
+            self._generation += 1
+            entry = self._videos.pop(video_id, None)
+            if entry is not None:
+                self._share_links.pop(entry[0], None)
+
+    def invalidate_many(self, video_ids):
+        for video_id in video_ids:
+            self.invalidate(video_id)
+
+    def stats(self):
+        with self._lock:
+            self._videos.expire()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self._videos.evictions,
+                'expirations': self._videos.expirations,
+                'size': len(self._videos),
+                'maxsize': self._videos.maxsize,
+                'ttl': self._videos.ttl,
+            }
+
+    def _lookup_id(self, video_id):
+        entry = self._videos.get(video_id)
+        return None if entry is None else entry[1]
+
+    def _lookup_share_link(self, share_link):
+        video_id = self._share_links.get(share_link)
+        return None if video_id is None else self._lookup_id(video_id)
+
+    def _get(self, key, lookup, load):
+        with self._lock:
+            payload = lookup()
+            if payload is not None:
+                self.hits += 1
+                return copy.deepcopy(payload)
+            self.misses += 1
+            pending = self._loading.get(key)
+            if pending is None:
+                pending = self._loading[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Another request is loading the same key; reuse its result if it arrives in time
+            pending.wait(1.0)
+            with self._lock:
+                payload = lookup()
+            if payload is not None:
+                return copy.deepcopy(payload)
+            return load()
+
+        try:
+            return load()
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending.set()
+
+    def _load(self, loader):
+        with self._lock:
+            generation = self._generation
+
+        loaded = loader()
+        if loaded is None:
+            return None
+
+        video_id, share_link, payload = loaded
+        with self._lock:
+            # Skip caching if an invalidation happened while the row was being read
+            if generation == self._generation:
+                self._videos[video_id] = (share_link, copy.deepcopy(payload))
+                self._share_links[share_link] = video_id
+        return payload
@@ -0,0 +1,48 @@
+from sqlalchemy.exc import IntegrityError
+
+from migration.routing import primary
+
+ALL_VIDEOS = 'all'
+
+
+class VideoCounterService:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(VideoCounterService, cls).__new__(cls)
+        return cls._instance
+
+    def scope_for_user(self, user_id):
+        return f'user:{user_id}'
+
+    def adjust(self, db, VideoCounter, user_id, delta):
+        # Runs inside the caller's transaction so the counters commit together with the video rows.
+        # Scopes that were never counted are skipped; they are materialised on first read.
+        db.session.query(VideoCounter).filter(
+            VideoCounter.scope.in_([ALL_VIDEOS, self.scope_for_user(user_id)])
+        ).update({VideoCounter.total: VideoCounter.total + delta}, synchronize_session=False)
+
+    def get_total(self, db, VideoCounter, Video, user_id=None):
+        scope = ALL_VIDEOS if user_id is None else self.scope_for_user(user_id)
+
+        total = db.session.query(VideoCounter.total).filter_by(scope=scope).scalar()
+        if total is not None:
+            return total
+
+        # First request for this scope: count once and keep the result maintained from now on. The count is
+        # stored, so it must come from the primary rather than a lagging replica.
+        with primary():
+            query = db.session.query(Video.id)
+            if user_id is not None:
+                query = query.filter_by(uploaded_by=user_id)
+            total = query.count()
+
+        try:
+            db.session.add(VideoCounter(scope=scope, total=total))
+            db.session.commit()
+        except IntegrityError:
+            # Another request materialised it first
+            db.session.rollback()
+            total = db.session.query(VideoCounter.total).filter_by(scope=scope).scalar()
+        return total
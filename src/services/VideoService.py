@@ -1,10 +1,41 @@
+import math
 import os
 import uuid
 
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from sqlalchemy.exc import NoResultFound
-
+from sqlalchemy.exc import IntegrityError, NoResultFound
+
+from migration.routing import primary, read_only
+
+from src.services.FileReclaimerService import FileReclaimerService
+from src.services.MediaProcessingService import ISO_BMFF_EXTENSIONS, MediaProcessingService
+from src.services.SearchIndexService import SearchIndexService
+from src.services.StorageService import IngestError, StorageService
+from src.services.TrendingService import WINDOWS as TRENDING_WINDOWS, TrendingService
+from src.services.VideoCacheService import VideoCacheService
+from src.services.VideoCounterService import VideoCounterService
+from src.services.ViewCounterService import ViewCounterService
+from src.utils.conditional import not_modified, not_modified_response, payload_etag, validator_headers
+from src.utils.metrics import MetricsRegistry
+from src.utils.pagination import paginate_keyset
+from src.utils.rangeStream import send_file_range
 from src.utils.responseEntity import error_response, success_response
+from src.utils.seekIndex import load_seek_index
+from src.utils.serializer import serialize_video, serialize_videos, video_columns
+
+# Video file types accepted by the upload endpoints
+ALLOWED_EXTENSIONS = {'mp4', 'avi', 'mkv', 'mov'}
+
+storage_service = StorageService()
+video_counter_service = VideoCounterService()
+view_counter_service = ViewCounterService()
+video_cache_service = VideoCacheService()
+media_processing_service = MediaProcessingService()
+search_index_service = SearchIndexService()
+trending_service = TrendingService()
+file_reclaimer_service = FileReclaimerService()
+
+stream_bytes = MetricsRegistry().counter('video_stream_bytes_total', 'Video bytes sent by the stream endpoint')
 
 
 class VideoService:
@@ -16,7 +47,7 @@ class VideoService:
         return cls._instance
 
     @jwt_required(optional=True)
-    def create(self, db, Video, Config, secure_filename, request, logger=None):
+    def create(self, db, Video, VideoCounter, Config, request, logger=None):
         current_user_id = get_jwt_identity()
         if not current_user_id:
             return error_response('Authorization header is missing or invalid', status_code=401, logger=logger)
@@ -29,134 +60,468 @@ class VideoService:
             return error_response('Missing required fields: title and video file', status_code=400,
                                   logger=logger)
 
+        blob = None
         try:
             # Get the uploaded file
             video_file = request.files['file']
 
             # Validate file type (assuming only video file types are allowed)
-            allowed_extensions = {'mp4', 'avi', 'mkv', 'mov'}
-            if '.' in video_file.filename and video_file.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
+            if '.' in video_file.filename and video_file.filename.rsplit('.', 1)[1].lower() not in ALLOWED_EXTENSIONS:
                 return error_response('Unsupported file type. Only video files (MP4, AVI, MKV, MOV) are allowed.',
                                       status_code=415,  # Unsupported Media Type
                                       logger=logger)
 
-            # Generate a unique filename
-            filename = secure_filename(video_file.filename)
-            random_string = uuid.uuid4().hex[:6]  # Generate a random hex string of length 6
-            unique_filename = f"{random_string}_{filename}"  # Append random string to filename
-            file_path = os.path.join(Config.UPLOAD_FOLDER, unique_filename)
-
-            # Save the file to your backend
-            video_file.save(file_path)
-            video_size = os.path.getsize(file_path)
+            # Sniff, hash, size-check and store the file in a single pass
+            blob = storage_service.ingest_stream(video_file.stream, Config.UPLOAD_FOLDER, Config.UPLOAD_MAX_SIZE,
+                                                 Config.UPLOAD_CHUNK_SIZE)
 
             # Create a Video object and save to database
             video = Video(
                 title=title,
-                video_url=file_path,
-                video_size=video_size,
+                video_url=blob.path,
+                video_size=blob.size,
+                content_hash=blob.sha256,
                 share_link=str(uuid.uuid4()),  # Corrected to str(uuid.uuid4())
                 uploaded_by=current_user_id,
                 description=description
             )
 
             db.session.add(video)
+            video_counter_service.adjust(db, VideoCounter, current_user_id, 1)
             db.session.commit()
 
+            # Faststart and metadata extraction run in the background
+            media_processing_service.enqueue()
+            search_index_service.index_video(video.id, video.title, video.description)
+
             return success_response('Video created successfully', video.to_json(), status_code=201,
                                     logger=logger)
 
+        except IngestError as e:
+            return error_response(str(e), status_code=e.status_code, logger=logger)
+
         except Exception as e:
+            db.session.rollback()
+            if blob is not None:
+                file_reclaimer_service.enqueue([blob.path])  # stored, but the row was never committed
             return error_response(str(e), logger=logger, logger_type="error")
 
-    def get_videos(self, db, Video, page=1, logger=None):
+    @read_only()
+    def get_videos(self, db, Video, VideoCounter, cursor=None, size=1, with_total=False, logger=None):
         try:
-            # Calculate the offset based on page and size (assuming size=1)
-            offset = (page - 1) * 1
-
-            # Query for videos based on pagination
-            videos = db.session.query(Video).limit(1).offset(offset).all()
-
-            # Count total number of videos
-            total_videos = db.session.query(Video).count()
-
-            serialized_videos = [
-                video.to_json() for video in videos
-            ]
-
-            # Determine if there are next and previous pages
-            has_next = page < total_videos // 1  # Assuming size=1
-            has_previous = page > 1
-
-            return success_response('Videos retrieved successfully',
-                                    data={
-                                        'videos': serialized_videos,
-                                        'total_videos': total_videos,
-                                        'current_page': page,
-                                        'videos_per_page': 1,
-                                        'has_next': has_next,
-                                        'has_previous': has_previous
-                                    },
+            # Keyset pagination on (created_at, id) keeps every page as cheap as the first one
+            # Select only the serialized columns so rows skip ORM hydration and the identity map
+            query = db.session.query(*video_columns(Video))
+            videos, next_cursor, prev_cursor = paginate_keyset(query, Video.created_at, Video.id, cursor, size)
+
+            serialized_videos = view_counter_service.merge(serialize_videos(videos))
+
+            data = {
+                'videos': serialized_videos,
+                'videos_per_page': size,
+                'next': next_cursor,
+                'prev': prev_cursor,
+                'has_next': next_cursor is not None,
+                'has_previous': prev_cursor is not None
+            }
+            if with_total:
+                data['total_videos'] = video_counter_service.get_total(db, VideoCounter, Video)
+
+            return success_response('Videos retrieved successfully', data=data, logger=logger)
+
+        except ValueError as e:
+            return error_response(str(e), status_code=400, logger=logger)
+
+        except Exception as e:
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    @read_only()
+    def search_videos(self, db, Video, query, size=10, offset=0, logger=None):
+        if not query.strip():
+            return error_response('Missing search query: q', status_code=400, logger=logger)
+        try:
+            video_ids, total = search_index_service.search(query, size, offset)
+
+            rows = {}
+            if video_ids:
+                rows = {row.id: row for row in
+                        db.session.query(*video_columns(Video)).filter(Video.id.in_(video_ids)).all()}
+            for video_id in video_ids:
+                if video_id not in rows:
+                    # Deleted by another process since it was indexed
+                    search_index_service.remove_video(video_id)
+
+            serialized_videos = view_counter_service.merge(
+                serialize_videos([rows[video_id] for video_id in video_ids if video_id in rows]))
+
+            data = {
+                'videos': serialized_videos,
+                'total_matches': total,
+                'size': size,
+                'offset': offset,
+                'has_next': offset + size < total,
+            }
+            return success_response('Search results retrieved successfully', data=data, logger=logger)
+
+        except Exception as e:
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    @read_only()
+    def get_trending_videos(self, db, Video, window, size=20, offset=0, logger=None):
+        if window not in TRENDING_WINDOWS:
+            return error_response(f"Unknown window: {window}; use one of {', '.join(TRENDING_WINDOWS)}",
+                                  status_code=400, logger=logger)
+        try:
+            ranked, total = trending_service.trending(window, size, offset)
+
+            # The ranking only holds ids; the rows come from one IN query, like search results
+            video_ids = [video_id for video_id, _ in ranked]
+            rows = {}
+            if video_ids:
+                rows = {row.id: row for row in
+                        db.session.query(*video_columns(Video)).filter(Video.id.in_(video_ids)).all()}
+            missing = [video_id for video_id in video_ids if video_id not in rows]
+            if missing:
+                # A lagging replica may not have a new upload yet; only the primary can tell that a video is gone
+                with primary():
+                    rows.update((row.id, row) for row in
+                                db.session.query(*video_columns(Video)).filter(Video.id.in_(missing)).all())
+                deleted = [video_id for video_id in missing if video_id not in rows]
+                if deleted:
+                    # Deleted by another process since it was ranked
+                    trending_service.remove_videos(deleted)
+
+            serialized_videos = view_counter_service.merge(
+                serialize_videos([rows[video_id] for video_id in video_ids if video_id in rows]))
+            scores = dict(ranked)
+            for video in serialized_videos:
+                video['trending_score'] = round(scores[video['id']], 3)
+
+            data = {
+                'videos': serialized_videos,
+                'window': window,
+                'size': size,
+                'offset': offset,
+                'has_next': offset + size < total,
+            }
+            return success_response('Trending videos retrieved successfully', data=data, logger=logger)
+
+        except Exception as e:
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    @read_only()
+    def get_video_by_id(self, db, Video, video_id, request, logger=None):
+        return self._get_video(
+            request, lambda: video_cache_service.get_video(video_id, lambda: self._load_video(db, Video, id=video_id)),
+            logger)
+
+    @read_only()
+    def get_videos_by_user_id(self, db, Video, VideoCounter, user_id, cursor=None, size=10, with_total=False,
+                              logger=None):
+        try:
+            # Query for videos uploaded by the specified user, one keyset page at a time
+            query = db.session.query(*video_columns(Video)).filter(Video.uploaded_by == user_id)
+            videos, next_cursor, prev_cursor = paginate_keyset(query, Video.created_at, Video.id, cursor, size)
+
+            serialized_videos = view_counter_service.merge(serialize_videos(videos))
+
+            data = {
+                'videos': serialized_videos,
+                'videos_per_page': size,
+                'next': next_cursor,
+                'prev': prev_cursor,
+                'has_next': next_cursor is not None,
+                'has_previous': prev_cursor is not None
+            }
+            if with_total:
+                data['total_videos'] = video_counter_service.get_total(db, VideoCounter, Video, user_id)
+
+            return success_response(f'Videos uploaded by user {user_id} retrieved successfully', data=data,
                                     logger=logger)
 
+        except ValueError as e:
+            return error_response(str(e), status_code=400, logger=logger)
+
         except Exception as e:
             return error_response(str(e), logger=logger, logger_type="error")
 
-    def get_video_by_id(self, db, Video, video_id, logger=None):
+    @read_only()
+    def get_videos_by_share_id(self, db, Video, share_id, request, logger=None):
+        return self._get_video(
+            request, lambda: video_cache_service.get_video_by_share_link(
+                share_id, lambda: self._load_video(db, Video, share_link=share_id)),
+            logger)
+
+    def _get_video(self, request, get_cached, logger=None):
         try:
-            video = db.session.query(Video).filter_by(id=video_id).first()
+            # Revalidations go through the cache too: a miss loads the row once and keeps it for the next request
+            serialized_video = get_cached()
 
-            if not video:
+            if not serialized_video:
                 return error_response('Video not found', status_code=404, logger=logger)
 
-            serialized_video = video.to_json()  # Serialize the video object as needed
+            serialized_video = view_counter_service.merge(serialized_video)  # Include views not yet flushed
 
-            return success_response('Video retrieved successfully', data={'video': serialized_video}, logger=logger)
+            validators = self._validators(serialized_video)
+            if not_modified(request, *validators):
+                return not_modified_response(*validators)
+
+            body, status_code = success_response('Video retrieved successfully', data={'video': serialized_video},
+                                                 logger=logger)
+            return body, status_code, validator_headers(*validators)
 
         except Exception as e:
             return error_response(str(e), logger=logger, logger_type="error")
 
-    def get_videos_by_user_id(self, db, Video, user_id, page=1, per_page=10, logger=None):
+    def _validators(self, video):
+        # (ETag, Last-Modified); the ETag covers every field, since counters and same-second edits keep updated_at
+        return payload_etag(video), video['updated_at']
+
+    def _load_video(self, db, Video, **filters):
+        # Cache loader: returns (id, share link, serialized video) or None
+        video = db.session.query(*video_columns(Video)).filter_by(**filters).first()
+        if not video:
+            return None
+        return video.id, video.share_link, serialize_video(video)
+
+    def stream_video(self, db, Video, video_id, request, logger=None):
         try:
-            # Calculate the offset based on page and per_page
-            offset = (page - 1) * per_page
-
-            # Query for videos uploaded by the specified user with pagination
-            videos = db.session.query(Video).filter_by(uploaded_by=user_id).limit(per_page).offset(offset).all()
-
-            # Count total number of videos uploaded by the user
-            total_videos = db.session.query(Video).filter_by(uploaded_by=user_id).count()
-
-            serialized_videos = [
-                video.to_json() for video in videos
-            ]
-
-            return success_response(f'Videos uploaded by user {user_id} retrieved successfully',
-                                    data={
-                                        'videos': serialized_videos,
-                                        'total_videos': total_videos,
-                                        'current_page': page,
-                                        'videos_per_page': per_page
-                                    },
-                                    logger=logger)
+            # Only the file path is needed to serve the bytes
+            video_url = db.session.query(Video.video_url).filter_by(id=video_id).scalar()
+
+            if not video_url:
+                return error_response('Video not found', status_code=404, logger=logger)
+
+            if not os.path.isfile(video_url):
+                return error_response('Video file not found', status_code=404, logger=logger, logger_type="error")
+
+            start = None
+            if request.args.get('t') is not None:
+                # Time-based seek: start the body at the keyframe at or before ``t``
+                keyframe = self._find_keyframe(video_url, request.args.get('t'))
+                if keyframe is not None:
+                    start = keyframe[1]
+
+            response = send_file_range(video_url, request, start=start)
+            if response.status_code in (200, 206) and request.method == 'GET':
+                stream_bytes.inc(amount=response.content_length or 0)
+
+            # Count a view when playback starts, not for every seek or range probe
+            if request.method == 'GET' and response.status_code in (200, 206) and self._is_playback_start(request):
+                view_counter_service.record_view(video_id)
+                trending_service.record_view(video_id)
+
+            return response
+
+        except ValueError as e:
+            return error_response(str(e), status_code=400, logger=logger)
 
         except Exception as e:
             return error_response(str(e), logger=logger, logger_type="error")
 
-    def get_videos_by_share_id(self, db, Video, share_id, logger=None):
+    def seek_video(self, db, Video, video_id, t, logger=None):
         try:
-            video = db.session.query(Video).filter_by(share_link=share_id).first()
+            video_url = db.session.query(Video.video_url).filter_by(id=video_id).scalar()
 
-            if not video:
+            if not video_url:
                 return error_response('Video not found', status_code=404, logger=logger)
 
-            serialized_video = video.to_json()  # Serialize the video object as needed
+            if not os.path.isfile(video_url):
+                return error_response('Video file not found', status_code=404, logger=logger, logger_type="error")
 
-            return success_response('Video retrieved successfully', data={'video': serialized_video}, logger=logger)
+            keyframe = self._find_keyframe(video_url, t)
+            if keyframe is None:
+                return error_response('Seeking is not supported for this video', status_code=422, logger=logger)
+
+            time, offset = keyframe
+            data = {'time': round(time, 3), 'offset': offset, 'range': f'bytes={offset}-'}
+            return success_response('Seek position resolved successfully', data=data, logger=logger)
+
+        except ValueError as e:
+            return error_response(str(e), status_code=400, logger=logger)
 
         except Exception as e:
             return error_response(str(e), logger=logger, logger_type="error")
 
+    def _find_keyframe(self, video_url, t):
+        # (keyframe seconds, byte offset) of the keyframe at or before t, or None for containers without an index.
+        # Until the processing worker has written the index (or when the file has no video track) seeks start at 0.
+        try:
+            seconds = float(t)
+        except (TypeError, ValueError):
+            seconds = math.nan
+        if not math.isfinite(seconds) or seconds < 0:
+            raise ValueError('Parameter t must be a non-negative number of seconds')
+
+        if video_url.rsplit('.', 1)[-1].lower() not in ISO_BMFF_EXTENSIONS:
+            return None
+        index = load_seek_index(video_url)
+        return (index.lookup(seconds) if index else None) or (0.0, 0)
+
+    def share_video(self, db, Video, VideoShare, video_id, logger=None):
+        current_user_id = get_jwt_identity()
+        try:
+            share_link = db.session.query(Video.share_link).filter_by(id=video_id).scalar()
+
+            if not share_link:
+                return error_response('Video not found', status_code=404, logger=logger)
+
+            # Only a user's first share of a video counts, so shares cannot be looped to push a video up
+            try:
+                db.session.add(VideoShare(video_id=video_id, user_id=current_user_id))
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+            else:
+                view_counter_service.record_share(video_id)
+                trending_service.record_share(video_id)
+
+            return success_response('Video shared successfully', data={'share_link': share_link}, logger=logger)
+
+        except Exception as e:
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    def _is_playback_start(self, request):
+        if request.args.get('t') not in (None, '0'):
+            return False
+        range_header = request.headers.get('Range')
+        if not range_header:
+            return True
+        # Only an open-ended range from the start is playback; bounded and multi-range requests are probes
+        return range_header.replace(' ', '').lower() == 'bytes=0-'
+
+    @read_only()
+    def get_videos_by_ids(self, db, Video, video_ids, limit, logger=None):
+        try:
+            video_ids = self._batch_ids(video_ids, limit)
+
+            # One IN query for the whole batch, returned in the order the ids were asked for
+            rows = {row.id: row for row in
+                    db.session.query(*video_columns(Video)).filter(Video.id.in_(video_ids)).all()}
+            serialized_videos = view_counter_service.merge(
+                serialize_videos([rows[video_id] for video_id in video_ids if video_id in rows]))
+
+            data = {
+                'videos': serialized_videos,
+                'missing': [video_id for video_id in video_ids if video_id not in rows],
+            }
+            return success_response('Videos retrieved successfully', data=data, logger=logger)
+
+        except ValueError as e:
+            return error_response(str(e), status_code=400, logger=logger)
+
+        except Exception as e:
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    def update_videos(self, db, Video, items, limit, logger=None):
+        current_user_id = get_jwt_identity()
+        try:
+            if not isinstance(items, list) or not items:
+                raise ValueError('videos must be a non-empty list of objects with an id')
+            if len(items) > limit:
+                raise ValueError(f'At most {limit} videos can be changed in one batch')
+
+            changes = {}
+            for item in items:
+                if not isinstance(item, dict) or not isinstance(item.get('id'), str):
+                    raise ValueError('videos must be a non-empty list of objects with an id')
+                # Repeated ids are merged, later fields winning
+                changes.setdefault(item['id'], {}).update(
+                    {field: item[field] for field in ('title', 'description') if field in item})
+
+            # Load every row once and check ownership for all of them before writing anything
+            videos = {video.id: video for video in db.session.query(Video).filter(Video.id.in_(list(changes))).all()}
+            results = {}
+            for video_id, fields in changes.items():
+                video = videos.get(video_id)
+                if video is None:
+                    results[video_id] = self._batch_result(video_id, 404, 'Video not found')
+                elif video.uploaded_by != current_user_id:
+                    results[video_id] = self._batch_result(video_id, 403, 'Unauthorized to update this video')
+                elif 'title' in fields and (not isinstance(fields['title'], str) or not fields['title'].strip()):
+                    results[video_id] = self._batch_result(video_id, 400, 'Title must be a non-empty string')
+                elif 'description' in fields and not isinstance(fields['description'], (str, type(None))):
+                    results[video_id] = self._batch_result(video_id, 400, 'Description must be a string')
+                else:
+                    for field, value in fields.items():
+                        setattr(video, field, value)
+                    results[video_id] = self._batch_result(video_id, 200, 'Video updated successfully')
+
+            updated_ids = [video_id for video_id, result in results.items() if result['success']]
+            db.session.commit()
+
+            if updated_ids:
+                rows = db.session.query(*video_columns(Video)).filter(Video.id.in_(updated_ids)).all()
+                for video in view_counter_service.merge(serialize_videos(rows)):
+                    results[video['id']]['video'] = video
+                    video_cache_service.invalidate(video['id'])
+                    search_index_service.index_video(video['id'], video['title'], video['description'])
+
+            return success_response('Batch update processed', data=self._batch_data(list(results.values())),
+                                    logger=logger)
+
+        except ValueError as e:
+            db.session.rollback()
+            return error_response(str(e), status_code=400, logger=logger)
+
+        except Exception as e:
+            db.session.rollback()
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    def delete_videos(self, db, Video, VideoCounter, VideoShare, video_ids, limit, logger=None):
+        current_user_id = get_jwt_identity()
+        try:
+            video_ids = self._batch_ids(video_ids, limit)
+
+            # Ownership for the whole batch from one narrow query, then a single DELETE and commit
+            rows = db.session.query(Video.id, Video.uploaded_by, Video.video_url).filter(Video.id.in_(video_ids)).all()
+            owners = {row.id: row.uploaded_by for row in rows}
+            deleted_ids = [video_id for video_id in video_ids if owners.get(video_id) == current_user_id]
+            if deleted_ids:
+                db.session.query(Video).filter(Video.id.in_(deleted_ids)).delete(synchronize_session=False)
+                db.session.query(VideoShare).filter(VideoShare.video_id.in_(deleted_ids)) \
+                    .delete(synchronize_session=False)
+                video_counter_service.adjust(db, VideoCounter, current_user_id, -len(deleted_ids))
+                db.session.commit()
+                file_reclaimer_service.enqueue([row.video_url for row in rows if row.uploaded_by == current_user_id])
+
+            results = []
+            for video_id in video_ids:
+                if video_id not in owners:
+                    results.append(self._batch_result(video_id, 404, 'Video not found'))
+                elif owners[video_id] != current_user_id:
+                    results.append(self._batch_result(video_id, 403, 'Unauthorized to delete this video'))
+                else:
+                    results.append(self._batch_result(video_id, 200, 'Video deleted successfully'))
+                    video_cache_service.invalidate(video_id)
+                    search_index_service.remove_video(video_id)
+            trending_service.remove_videos(deleted_ids)
+
+            return success_response('Batch delete processed', data=self._batch_data(results), logger=logger)
+
+        except ValueError as e:
+            return error_response(str(e), status_code=400, logger=logger)
+
+        except Exception as e:
+            db.session.rollback()
+            return error_response(str(e), logger=logger, logger_type="error")
+
+    def _batch_ids(self, video_ids, limit):
+        # Distinct ids in request order
+        if not isinstance(video_ids, list) or not video_ids or not all(isinstance(i, str) for i in video_ids):
+            raise ValueError('ids must be a non-empty list of video ids')
+        video_ids = list(dict.fromkeys(video_ids))
+        if len(video_ids) > limit:
+            raise ValueError(f'At most {limit} videos can be requested in one batch')
+        return video_ids
+
+    def _batch_result(self, video_id, status_code, message):
+        return {'id': video_id, 'success': status_code < 400, 'status': status_code, 'message': message}
+
+    def _batch_data(self, results):
+        succeeded = sum(1 for result in results if result['success'])
+        return {'results': results, 'succeeded': succeeded, 'failed': len(results) - succeeded}
+
     def update_video_by_id(self, db, Video, video_id, data, logger=None):
         current_user_id = get_jwt_identity()
         try:
@@ -176,8 +541,11 @@ class VideoService:
                 video.description = data['description']
 
             db.session.commit()
+            video_cache_service.invalidate(video.id)
+            search_index_service.index_video(video.id, video.title, video.description)
 
-            return success_response('Video updated successfully', video.to_json(), logger=logger)
+            return success_response('Video updated successfully', view_counter_service.merge(video.to_json()),
+                                    logger=logger)
 
         except NoResultFound:
             return error_response('Video not found', status_code=404, logger=logger)
@@ -186,7 +554,7 @@ class VideoService:
             db.session.rollback()
             return error_response(str(e), logger=logger, logger_type="error")
 
-    def delete_video_by_id(self, db, Video, video_id, logger=None):
+    def delete_video_by_id(self, db, Video, VideoCounter, VideoShare, video_id, logger=None):
         current_user_id = get_jwt_identity()
         try:
             video = db.session.query(Video).filter_by(id=video_id).first()
@@ -198,8 +566,16 @@ class VideoService:
             if current_user_id != video.uploaded_by:
                 return error_response('Unauthorized to delete this video', status_code=403, logger=logger)
 
+            video_url = video.video_url
             db.session.delete(video)
+            db.session.query(VideoShare).filter_by(video_id=video_id).delete(synchronize_session=False)
+            video_counter_service.adjust(db, VideoCounter, video.uploaded_by, -1)
             db.session.commit()
+            video_cache_service.invalidate(video_id)
+            search_index_service.remove_video(video_id)
+            trending_service.remove_videos([video_id])
+            # The file is removed in the background, once no other video shares it
+            file_reclaimer_service.enqueue([video_url])
 
             return success_response('Video deleted successfully', logger=logger)
 
@@ -0,0 +1,122 @@
+import atexit
+import threading
+
+from sqlalchemy import bindparam, func
+
+from src.utils.worker import PeriodicWorker
+
+
+class ViewCounterService:
+    """
+    Write-behind buffer for ``Video.views`` and ``Video.shares``.
+
+    Increments are collected in memory and written in one batched UPDATE per flush, so a popular video costs
+    one row update per interval instead of one per hit. At most ``COUNTER_FLUSH_INTERVAL`` seconds (or
+    ``COUNTER_MAX_PENDING`` videos) of increments are at risk if the process dies without a clean shutdown.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ViewCounterService, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._pending = {}
+            cls._instance._inflight = {}
+            cls._instance._listeners = []
+            cls._instance._worker = None
+        return cls._instance
+
+    def init_app(self, app, db, Video):
+        if self._worker is not None:
+            return
+        self.app = app
+        self.db = db
+        self.Video = Video
+        self.max_pending = app.config.get('COUNTER_MAX_PENDING', 10000)
+        self._worker = PeriodicWorker('view-counter-flush', self.flush, app.config.get('COUNTER_FLUSH_INTERVAL', 5))
+        atexit.register(self.flush)
+
+    def add_flush_listener(self, listener):
+        # Called with the flushed video ids after they are committed
+        self._listeners.append(listener)
+
+    def record_view(self, video_id, count=1):
+        self._record(video_id, count, 0)
+
+    def record_share(self, video_id, count=1):
+        self._record(video_id, 0, count)
+
+    def _record(self, video_id, views, shares):
+        with self._lock:
+            pending = self._pending.get(video_id)
+            if pending is None:
+                pending = self._pending[video_id] = [0, 0]
+            pending[0] += views
+            pending[1] += shares
+            backlog = len(self._pending)
+
+        if self._worker is not None:
+            self._worker.ensure_started()
+            if backlog >= self.max_pending:
+                self._worker.wake()
+
+    def pending(self, video_id):
+        # Increments being written by a flush still count until that flush commits
+        with self._lock:
+            views, shares = self._pending.get(video_id, (0, 0))
+            inflight_views, inflight_shares = self._inflight.get(video_id, (0, 0))
+        return views + inflight_views, shares + inflight_shares
+
+    def backlog(self):
+        # Number of videos with unflushed increments
+        with self._lock:
+            return len(self._pending)
+
+    def merge(self, payload):
+        # Add unflushed increments to a serialized video, or to each video in a sequence of them
+        videos = payload if isinstance(payload, (list, tuple)) else [payload]
+        for video in videos:
+            views, shares = self.pending(video['id'])
+            if views:
+                video['views'] = (video.get('views') or 0) + views
+            if shares:
+                video['shares'] = (video.get('shares') or 0) + shares
+        return payload
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            self._inflight = batch
+
+        table = self.Video.__table__
+        statement = table.update().where(table.c.id == bindparam('video_id')).values(
+            views=func.coalesce(table.c.views, 0) + bindparam('view_delta'),
+            shares=func.coalesce(table.c.shares, 0) + bindparam('share_delta'),
+            # Counter updates are not edits; keep updated_at (and anything keyed on it) stable
+            updated_at=table.c.updated_at,
+        )
+        rows = [{'video_id': video_id, 'view_delta': views, 'share_delta': shares}
+                for video_id, (views, shares) in batch.items()]
+
+        try:
+            with self.app.app_context():
+                self.db.session.execute(statement, rows)
+                self.db.session.commit()
+        except Exception:
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                self._inflight = {}
+                for video_id, (views, shares) in batch.items():
+                    pending = self._pending.setdefault(video_id, [0, 0])
+                    pending[0] += views
+                    pending[1] += shares
+            raise
+
+        with self._lock:
+            self._inflight = {}
+
+        for listener in self._listeners:
+            listener(list(batch))
+        return len(rows)
@@ -1,6 +1,6 @@
 from sqlalchemy import text
 
-from app import db
+from migration.Base import db
 from src.utils.responseEntity import *
 
 
@@ -18,3 +18,7 @@ class HealthService:
             return success_response("Service Available", logger=logger, logger_type="info")
         except Exception as e:
             return error_response(str(e), status_code=500, logger=logger, logger_type="error")
+
+    def cache_stats(self, video_cache, logger=None):
+        return success_response("Cache statistics retrieved successfully", data={'video': video_cache.stats()},
+                                logger=logger)
@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timezone
+
+from werkzeug.http import http_date, is_resource_modified, parse_if_range_header, quote_etag
+
+
+def make_etag(*parts):
+    """
+    Strong (unquoted) ETag from the values that determine a representation, computed without encoding the response
+    body. Pass every field the client sees: timestamps have one-second resolution, so ``updated_at`` alone misses
+    edits made within the same second.
+    """
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+
+
+def payload_etag(payload):
+    # ETag of a serialized dict from all of its fields, independent of key order
+    return make_etag(*sorted(payload.items()))
+
+
+def file_etag(stat):
+    # Changes whenever the file is replaced or rewritten (including faststart, which keeps the path)
+    return f'{stat.st_ino:x}-{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+
+def as_datetime(value):
+    # Serialized timestamps are ISO strings; database timestamps are naive UTC
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def validator_headers(etag, last_modified=None):
+    headers = {'ETag': quote_etag(etag)}
+    last_modified = as_datetime(last_modified)
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def has_validators(request):
+    return 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+
+
+def not_modified(request, etag, last_modified=None):
+    """True when ``If-None-Match``/``If-Modified-Since`` on a GET or HEAD show the client's copy is current."""
+    if request.method not in ('GET', 'HEAD') or not has_validators(request):
+        return False
+    return not is_resource_modified(request.environ, etag=etag, last_modified=as_datetime(last_modified))
+
+
+def if_range_matches(request, etag, last_modified=None):
+    """
+    Whether a ``Range`` may be honoured under ``If-Range``: true without the header, otherwise only for an exact
+    strong ETag or ``Last-Modified`` match. When false the full representation must be sent.
+    """
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if_range = parse_if_range_header(value)
+    if if_range.etag is not None:
+        return not value.strip().startswith('W/') and if_range.etag == etag
+    last_modified = as_datetime(last_modified)
+    return (if_range.date is not None and last_modified is not None
+            and if_range.date == last_modified.replace(microsecond=0))
+
+
+def not_modified_response(etag, last_modified=None, headers=None):
+    # Body-less 304 carrying the validators, in the (body, status, headers) form views return
+    response_headers = validator_headers(etag, last_modified)
+    if headers:
+        response_headers.update(headers)
+    return '', 304, response_headers
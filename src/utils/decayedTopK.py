@@ -0,0 +1,92 @@
+import heapq
+from operator import itemgetter
+
+# The origin is moved forward before stored scores grow past 2 ** REBASE_AFTER
+REBASE_AFTER = 64
+
+
+class DecayedTopK:
+    """
+    Exponentially decaying scores by key, with the ``k`` highest kept in a min-heap.
+
+    Scores are stored relative to ``origin``: an event of weight ``w`` at time ``t`` adds
+    ``w * 2 ** ((t - origin) / half_life)``. Every score decays by the same factor, so their order never changes
+    with time alone and nothing has to be touched as time passes. A key outside the top can only overtake the
+    lowest one by receiving an event, which is when it is compared, so the top stays exact without re-scoring.
+    """
+
+    def __init__(self, half_life, k, origin):
+        self.half_life = half_life
+        self.k = max(int(k), 1)
+        self.origin = origin
+        self.scores = {}  # key -> stored score
+        self.top = {}  # the k highest of scores
+        self._heap = []  # (stored score, key) for the top; entries whose score changed since are skipped
+
+    def __len__(self):
+        return len(self.scores)
+
+    def add(self, key, weight, now):
+        if (now - self.origin) / self.half_life > REBASE_AFTER:
+            self.rebase(now)
+        score = self.scores.get(key, 0.0) + weight * 2 ** ((now - self.origin) / self.half_life)
+        self.scores[key] = score
+
+        top = self.top
+        if key not in top and len(top) >= self.k:
+            if score <= self._lowest():
+                return
+            del top[heapq.heappop(self._heap)[1]]
+        top[key] = score
+        heapq.heappush(self._heap, (score, key))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(score, key) for key, score in top.items()]
+            heapq.heapify(self._heap)
+
+    def _lowest(self):
+        heap = self._heap
+        while heap and self.top.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0]
+
+    def remove(self, keys):
+        removed = [key for key in keys if self.scores.pop(key, None) is not None]
+        if any(key in self.top for key in removed):
+            self._rebuild_top()  # the next best keys move up
+        return len(removed)
+
+    def ranked(self, now):
+        """The top keys, highest first, as ``(key, score at now)``."""
+        factor = 2 ** ((self.origin - now) / self.half_life)
+        return [(key, score * factor) for key, score in sorted(self.top.items(), key=lambda item: (-item[1], item[0]))]
+
+    def rebase(self, now):
+        factor = 2 ** ((self.origin - now) / self.half_life)
+        self.scores = {key: score * factor for key, score in self.scores.items()}
+        self.origin = now
+        self._rebuild_top()
+
+    def prune(self, now, floor, max_tracked):
+        """Forget keys outside the top that decayed below ``floor``, and the lowest beyond ``max_tracked``."""
+        threshold = floor * 2 ** ((now - self.origin) / self.half_life)
+        before = len(self.scores)
+        self.scores = {key: score for key, score in self.scores.items() if score >= threshold or key in self.top}
+        if len(self.scores) > max_tracked:
+            self.scores = dict(heapq.nlargest(max_tracked, self.scores.items(), key=itemgetter(1)))
+            self._rebuild_top()
+        return before - len(self.scores)
+
+    def _rebuild_top(self):
+        self.top = dict(heapq.nlargest(self.k, self.scores.items(), key=itemgetter(1)))
+        self._heap = [(score, key) for key, score in self.top.items()]
+        heapq.heapify(self._heap)
+
+    def to_json(self):
+        return {'half_life': self.half_life, 'origin': self.origin, 'scores': self.scores}
+
+    @classmethod
+    def from_json(cls, data, k):
+        ranking = cls(data['half_life'], k, data['origin'])
+        ranking.scores = {key: float(score) for key, score in data['scores'].items()}
+        ranking._rebuild_top()
+        return ranking
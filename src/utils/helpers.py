@@ -1,8 +1,11 @@
+LOG_LEVELS = ('info', 'warning', 'error')
+
+
 def logger(logger_type, log=None, message=None):
-    from app import app
-    if logger_type == "info" and log is not None:
-        app.logger.info(message)
-    elif logger_type == "warning" and log is not None:
-        app.logger.warning(message)
-    elif logger_type == "error" and log is not None:
-        app.logger.error(message)
+    # ``log`` is the caller's logger (usually app.logger); it is used directly instead of importing the app
+    if logger_type in LOG_LEVELS and log is not None:
+        getattr(log, logger_type)(message)
+
+
+def parse_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
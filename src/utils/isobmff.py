@@ -0,0 +1,349 @@
+"""
+Minimal pure-Python reader/rewriter for ISO base media files (MP4, MOV).
+
+Only the boxes needed for metadata, sample tables and faststart are parsed; media data is never decoded.
+"""
+import bisect
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+Box = namedtuple('Box', ['type', 'offset', 'header_size', 'size'])
+
+# Boxes whose payload is a sequence of child boxes
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'edts', b'dinf'}
+
+COPY_CHUNK_SIZE = 1024 * 1024
+UINT32_MAX = 0xFFFFFFFF
+
+
+class MediaFormatError(Exception):
+    pass
+
+
+def _uint_array(typecode, data):
+    # Big-endian unsigned integers from the file into a compact native array
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return values
+
+
+def iter_boxes(data, start=0, end=None):
+    """Yield the boxes laid out in ``data[start:end]`` (a bytes-like object)."""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, offset)
+        header_size = 8
+        if size == 1:
+            if offset + 16 > end:
+                raise MediaFormatError('Truncated box header')
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise MediaFormatError(f'Invalid size for box {box_type!r} at {offset}')
+        yield Box(box_type, offset, header_size, size)
+        offset += size
+
+
+def read_top_level_boxes(file):
+    """List the top-level boxes of an open file without reading their payloads."""
+    file.seek(0, os.SEEK_END)
+    file_size = file.tell()
+    boxes = []
+    offset = 0
+    while offset + 8 <= file_size:
+        file.seek(offset)
+        header = file.read(16)
+        size, box_type = struct.unpack_from('>I4s', header)
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                raise MediaFormatError('Truncated box header')
+            size = struct.unpack_from('>Q', header, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_size or offset + size > file_size:
+            raise MediaFormatError(f'Invalid size for top-level box {box_type!r} at {offset}')
+        boxes.append(Box(box_type, offset, header_size, size))
+        offset += size
+    return boxes
+
+
+def _find(data, box, path):
+    # Depth-first lookup of the first box matching the type path below ``box``
+    for child in iter_boxes(data, box.offset + box.header_size, box.offset + box.size):
+        if child.type == path[0]:
+            if len(path) == 1:
+                return child
+            found = _find(data, child, path[1:])
+            if found is not None:
+                return found
+    return None
+
+
+def _payload(data, box):
+    return box.offset + box.header_size
+
+
+class Track:
+    def __init__(self):
+        self.track_id = None
+        self.handler = None
+        self.codec = None
+        self.width = None
+        self.height = None
+        self.timescale = None
+        self.duration = 0
+        # Sample tables, as parsed from stts/stss/stsc/stsz/stco/co64
+        self.time_to_sample = array('I')  # flattened (sample_count, sample_delta) pairs
+        self.sync_samples = None  # 1-based sample numbers; None when every sample is a sync sample
+        self.sample_to_chunk = array('I')  # flattened (first_chunk, samples_per_chunk, description_index)
+        self.sample_size = 0  # non-zero when every sample has this size
+        self.sample_sizes = array('I')
+        self.sample_count = 0
+        self.chunk_offsets = array('Q')
+
+    @property
+    def duration_seconds(self):
+        return self.duration / self.timescale if self.timescale else 0.0
+
+
+class Movie:
+    def __init__(self):
+        self.timescale = None
+        self.duration = 0
+        self.tracks = []
+        self.fragmented = False
+
+    @property
+    def duration_seconds(self):
+        if self.timescale and self.duration:
+            return self.duration / self.timescale
+        return max((track.duration_seconds for track in self.tracks), default=0.0)
+
+    def track(self, handler):
+        return next((track for track in self.tracks if track.handler == handler), None)
+
+    @property
+    def video_track(self):
+        return self.track(b'vide')
+
+    @property
+    def audio_track(self):
+        return self.track(b'soun')
+
+
+def _parse_mvhd(data, box, movie):
+    offset = _payload(data, box)
+    version = data[offset]
+    if version == 1:
+        movie.timescale, movie.duration = struct.unpack_from('>IQ', data, offset + 20)
+    else:
+        movie.timescale, movie.duration = struct.unpack_from('>II', data, offset + 12)
+
+
+def _parse_tkhd(data, box, track):
+    offset = _payload(data, box)
+    version = data[offset]
+    if version == 1:
+        track.track_id = struct.unpack_from('>I', data, offset + 20)[0]
+        dimensions = offset + 4 + 32 + 52
+    else:
+        track.track_id = struct.unpack_from('>I', data, offset + 12)[0]
+        dimensions = offset + 4 + 20 + 52
+    width, height = struct.unpack_from('>II', data, dimensions)
+    # 16.16 fixed point; the sample entry is preferred when present
+    track.width, track.height = width >> 16, height >> 16
+
+
+def _parse_mdhd(data, box, track):
+    offset = _payload(data, box)
+    version = data[offset]
+    if version == 1:
+        track.timescale, track.duration = struct.unpack_from('>IQ', data, offset + 20)
+    else:
+        track.timescale, track.duration = struct.unpack_from('>II', data, offset + 12)
+
+
+def _parse_stsd(data, box, track):
+    offset = _payload(data, box)
+    entry_count = struct.unpack_from('>I', data, offset + 4)[0]
+    if not entry_count:
+        return
+    entry = next(iter_boxes(data, offset + 8, box.offset + box.size), None)
+    if entry is None:
+        return
+    track.codec = entry.type.decode('latin-1').strip()
+    if track.handler == b'vide' and entry.size >= entry.header_size + 28:
+        width, height = struct.unpack_from('>HH', data, entry.offset + entry.header_size + 24)
+        if width and height:
+            track.width, track.height = width, height
+
+
+def _parse_sample_tables(data, stbl, track):
+    for box in iter_boxes(data, stbl.offset + stbl.header_size, stbl.offset + stbl.size):
+        offset = _payload(data, box)
+        if box.type == b'stsd':
+            _parse_stsd(data, box, track)
+        elif box.type == b'stts':
+            count = struct.unpack_from('>I', data, offset + 4)[0]
+            track.time_to_sample = _uint_array('I', data[offset + 8:offset + 8 + count * 8])
+        elif box.type == b'stss':
+            count = struct.unpack_from('>I', data, offset + 4)[0]
+            track.sync_samples = _uint_array('I', data[offset + 8:offset + 8 + count * 4])
+        elif box.type == b'stsc':
+            count = struct.unpack_from('>I', data, offset + 4)[0]
+            track.sample_to_chunk = _uint_array('I', data[offset + 8:offset + 8 + count * 12])
+        elif box.type == b'stsz':
+            track.sample_size, track.sample_count = struct.unpack_from('>II', data, offset + 4)
+            count = track.sample_count
+            if not track.sample_size:
+                track.sample_sizes = _uint_array('I', data[offset + 12:offset + 12 + count * 4])
+        elif box.type == b'stco':
+            count = struct.unpack_from('>I', data, offset + 4)[0]
+            track.chunk_offsets = array('Q', _uint_array('I', data[offset + 8:offset + 8 + count * 4]))
+        elif box.type == b'co64':
+            count = struct.unpack_from('>I', data, offset + 4)[0]
+            track.chunk_offsets = _uint_array('Q', data[offset + 8:offset + 8 + count * 8])
+
+
+def parse_moov(data):
+    """Parse the bytes of a complete ``moov`` box into a Movie."""
+    moov = next(iter_boxes(data))
+    movie = Movie()
+    for box in iter_boxes(data, moov.offset + moov.header_size, moov.offset + moov.size):
+        if box.type == b'mvhd':
+            _parse_mvhd(data, box, movie)
+        elif box.type == b'mvex':
+            movie.fragmented = True
+        elif box.type == b'trak':
+            track = Track()
+            tkhd = _find(data, box, [b'tkhd'])
+            if tkhd is not None:
+                _parse_tkhd(data, tkhd, track)
+            mdhd = _find(data, box, [b'mdia', b'mdhd'])
+            if mdhd is not None:
+                _parse_mdhd(data, mdhd, track)
+            hdlr = _find(data, box, [b'mdia', b'hdlr'])
+            if hdlr is not None:
+                track.handler = bytes(data[_payload(data, hdlr) + 8:_payload(data, hdlr) + 12])
+            stbl = _find(data, box, [b'mdia', b'minf', b'stbl'])
+            if stbl is not None:
+                _parse_sample_tables(data, stbl, track)
+            movie.tracks.append(track)
+    return movie
+
+
+def read_moov(file, boxes=None):
+    """Return ``(moov box, moov bytes)`` for an open file, reading only the ``moov`` box."""
+    boxes = boxes if boxes is not None else read_top_level_boxes(file)
+    moov = next((box for box in boxes if box.type == b'moov'), None)
+    if moov is None:
+        raise MediaFormatError('No moov box found')
+    file.seek(moov.offset)
+    data = file.read(moov.size)
+    if len(data) != moov.size:
+        raise MediaFormatError('Truncated moov box')
+    return moov, data
+
+
+def read_movie(path):
+    with open(path, 'rb') as file:
+        boxes = read_top_level_boxes(file)
+        _, data = read_moov(file, boxes)
+    movie = parse_moov(data)
+    if any(box.type == b'moof' for box in boxes):
+        movie.fragmented = True
+    return movie
+
+
+def needs_faststart(boxes):
+    """True when the ``moov`` box comes after the first ``mdat``, so players must read the tail first."""
+    types = [box.type for box in boxes]
+    if b'moov' not in types or b'mdat' not in types:
+        return False
+    return types.index(b'moov') > types.index(b'mdat')
+
+
+def _chunk_offset_boxes(data, box):
+    # Yield every stco/co64 box below ``box``
+    for child in iter_boxes(data, box.offset + box.header_size, box.offset + box.size):
+        if child.type in (b'stco', b'co64'):
+            yield child
+        elif child.type in CONTAINER_BOXES:
+            yield from _chunk_offset_boxes(data, child)
+
+
+def faststart(path, output_path):
+    """
+    Write a copy of ``path`` to ``output_path`` with ``moov`` ahead of the media data.
+
+    Chunk offsets in every ``stco``/``co64`` table are shifted to the new positions; media samples are copied
+    byte for byte. Returns False (writing nothing) when the file already starts with ``moov`` or cannot be
+    relocated safely: fragmented files, compressed movie headers, or 32-bit offsets that would overflow.
+    """
+    with open(path, 'rb') as source:
+        boxes = read_top_level_boxes(source)
+        if not needs_faststart(boxes) or any(box.type == b'moof' for box in boxes):
+            return False
+        moov, data = read_moov(source, boxes)
+        moov_bytes = bytearray(data)
+        moov_box = next(iter_boxes(moov_bytes))
+        if _find(moov_bytes, moov_box, [b'cmov']) is not None:
+            return False
+
+        # New layout: everything before the first mdat, then moov, then the rest (moov removed)
+        first_mdat = next(index for index, box in enumerate(boxes) if box.type == b'mdat')
+        others = [box for box in boxes if box.type != b'moov']
+        split = sum(1 for box in boxes[:first_mdat] if box.type != b'moov')
+        layout = others[:split] + [moov] + others[split:]
+
+        new_offsets = {}
+        position = 0
+        for box in layout:
+            new_offsets[box.offset] = position
+            position += box.size
+        original_starts = [box.offset for box in others]
+
+        def relocate(offset):
+            index = bisect.bisect_right(original_starts, offset) - 1
+            if index < 0:
+                raise MediaFormatError(f'Chunk offset {offset} precedes the first box')
+            box = others[index]
+            return offset - box.offset + new_offsets[box.offset]
+
+        for table in _chunk_offset_boxes(moov_bytes, moov_box):
+            offset = _payload(moov_bytes, table) + 8
+            count = struct.unpack_from('>I', moov_bytes, offset - 4)[0]
+            typecode, width = ('I', 4) if table.type == b'stco' else ('Q', 8)
+            values = _uint_array(typecode, moov_bytes[offset:offset + count * width])
+            relocated = array('Q', (relocate(value) for value in values))
+            if typecode == 'I' and relocated and max(relocated) > UINT32_MAX:
+                return False
+            relocated = array(typecode, relocated)
+            if sys.byteorder == 'little':
+                relocated.byteswap()
+            moov_bytes[offset:offset + count * width] = relocated.tobytes()
+
+        with open(output_path, 'wb') as output:
+            for box in layout:
+                if box is moov:
+                    output.write(moov_bytes)
+                    continue
+                source.seek(box.offset)
+                remaining = box.size
+                while remaining:
+                    chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise MediaFormatError('Unexpected end of file while copying')
+                    output.write(chunk)
+                    remaining -= len(chunk)
+    return True
@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+NEXT = 'next'
+PREV = 'prev'
+
+
+def encode_cursor(created_at, row_id, direction):
+    payload = json.dumps([created_at.isoformat() if isinstance(created_at, datetime) else created_at, row_id, direction],
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    # Raises ValueError for anything that was not produced by encode_cursor
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, row_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if direction not in (NEXT, PREV):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), row_id, direction
+    except Exception as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def clamp_page_size(size, default, maximum):
+    if size is None or size < 1:
+        return default
+    return min(size, maximum)
+
+
+def paginate_keyset(query, created_column, id_column, cursor=None, size=20, key=None):
+    """
+    Page through ``query`` newest first on ``(created_at, id)`` without OFFSET.
+
+    Returns ``(rows, next_cursor, prev_cursor)``; each cursor is an opaque token or ``None`` when there is
+    nothing further in that direction. ``key`` extracts ``(created_at, id)`` from a row.
+    """
+    key = key or (lambda row: (row.created_at, row.id))
+    direction = NEXT
+
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+        if direction == PREV:
+            query = query.filter(or_(created_column > created_at,
+                                     and_(created_column == created_at, id_column > row_id)))
+        else:
+            query = query.filter(or_(created_column < created_at,
+                                     and_(created_column == created_at, id_column < row_id)))
+
+    if direction == PREV:
+        query = query.order_by(created_column.asc(), id_column.asc())
+    else:
+        query = query.order_by(created_column.desc(), id_column.desc())
+
+    # Fetch one extra row to learn whether another page exists in this direction
+    rows = query.limit(size + 1).all()
+    has_more = len(rows) > size
+    rows = rows[:size]
+
+    if direction == PREV:
+        rows.reverse()
+        has_next, has_prev = bool(cursor), has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor)
+
+    next_cursor = encode_cursor(*key(rows[-1]), NEXT) if rows and has_next else None
+    prev_cursor = encode_cursor(*key(rows[0]), PREV) if rows and has_prev else None
+    return rows, next_cursor, prev_cursor
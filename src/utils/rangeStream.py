@@ -0,0 +1,221 @@
+import mimetypes
+import mmap
+import os
+import uuid
+from datetime import datetime, timezone
+
+from flask import Response
+from werkzeug.wsgi import wrap_file
+
+from src.utils.conditional import file_etag, if_range_matches, not_modified, validator_headers
+
+# Size of each chunk handed to the WSGI server when it cannot use sendfile
+CHUNK_SIZE = 256 * 1024
+
+# Requests asking for more (coalesced) ranges than this are served in full
+MAX_RANGES = 16
+
+VIDEO_MIMETYPES = {
+    '.mp4': 'video/mp4',
+    '.m4v': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.mkv': 'video/x-matroska',
+    '.avi': 'video/x-msvideo',
+}
+
+
+def guess_mimetype(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in VIDEO_MIMETYPES:
+        return VIDEO_MIMETYPES[extension]
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def parse_range_header(value, size):
+    """
+    Parse a ``Range`` header against a resource of ``size`` bytes.
+
+    Returns ``None`` when the header is absent or malformed (the full body should be served),
+    an empty list when no range is satisfiable (416), or a sorted list of coalesced inclusive
+    ``(start, end)`` byte ranges.
+    """
+    if not value:
+        return None
+
+    unit, _, spec = value.partition('=')
+    if unit.strip().lower() != 'bytes' or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        first, last = first.strip(), last.strip()
+        if not sep or (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+
+        if not first:
+            # Suffix range: the last N bytes of the file
+            if not last:
+                return None
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), size - 1) if last else size - 1
+
+        if start >= size:
+            continue
+        ranges.append((start, end))
+
+    # Merge overlapping and adjacent ranges so each byte is sent at most once
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFile:
+    """
+    Read-only file-like view over ``[start, start + length)`` of an open file.
+
+    The underlying descriptor is positioned at ``start`` and exposed through ``fileno()`` so WSGI
+    servers whose ``wsgi.file_wrapper`` uses ``os.sendfile`` (gunicorn) hand the range straight to
+    the kernel. Servers that iterate the wrapper instead get mmap-backed slices capped to the range.
+    """
+
+    def __init__(self, fileobj, start, length):
+        self._file = fileobj
+        self._file.seek(start)
+        self._position = start
+        self._end = start + length
+        self._map = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) if length else None
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def read(self, size=-1):
+        remaining = self._end - self._position
+        if remaining <= 0:
+            return b''
+        count = remaining if size is None or size < 0 else min(size, remaining)
+        data = self._map[self._position:self._position + count]
+        self._position += count
+        return data
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def _iter_multipart(fileobj, parts, boundary):
+    try:
+        with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+            for header, start, end in parts:
+                yield header
+                position = start
+                while position <= end:
+                    stop = min(position + CHUNK_SIZE, end + 1)
+                    yield file_map[position:stop]
+                    position = stop
+            yield f'\r\n--{boundary}--\r\n'.encode('latin-1')
+    finally:
+        fileobj.close()
+
+
+def send_file_range(path, request, mimetype=None, headers=None, start=None):
+    """
+    Serve ``path`` honouring single and multi-range ``Range`` requests.
+
+    ``start`` turns a request without a ``Range`` header into the open range ``bytes=start-`` (used for
+    time-based seeks, where the offset comes from the keyframe index rather than the client).
+
+    Full bodies and single ranges go through ``wsgi.file_wrapper`` (zero-copy where the server
+    supports it); multiple ranges are sent as ``multipart/byteranges`` built from mmap slices.
+
+    Responses carry an ``ETag`` and ``Last-Modified`` derived from the file's stat, so ``If-None-Match`` and
+    ``If-Modified-Since`` get a 304, and a ``Range`` whose ``If-Range`` no longer matches gets the full file.
+    """
+    mimetype = mimetype or guess_mimetype(path)
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = file_etag(stat)
+    last_modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+
+    if not_modified(request, etag, last_modified):
+        response = Response(status=304)
+        response.headers.extend(validator_headers(etag, last_modified))
+        response.headers['Accept-Ranges'] = 'bytes'
+        if headers:
+            response.headers.extend(headers)
+        return response
+
+    range_header = request.headers.get('Range')
+    if range_header is not None and not if_range_matches(request, etag, last_modified):
+        range_header = None  # the client's partial copy is stale
+    if range_header is None and start is not None:
+        range_header = f'bytes={start}-'
+    ranges = parse_range_header(range_header, size)
+
+    if ranges is not None and len(ranges) > MAX_RANGES:
+        ranges = None
+
+    if ranges == []:
+        response = Response(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
+
+    fileobj = open(path, 'rb')
+    try:
+        if ranges is None:
+            body = wrap_file(request.environ, RangeFile(fileobj, 0, size), CHUNK_SIZE)
+            response = Response(body, status=200, mimetype=mimetype, direct_passthrough=True)
+            response.content_length = size
+
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            body = wrap_file(request.environ, RangeFile(fileobj, start, end - start + 1), CHUNK_SIZE)
+            response = Response(body, status=206, mimetype=mimetype, direct_passthrough=True)
+            response.content_length = end - start + 1
+            response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+        else:
+            boundary = uuid.uuid4().hex
+            parts = []
+            content_length = 0
+            for index, (start, end) in enumerate(ranges):
+                # Every part after the first starts on a new line (RFC 7233 appendix A)
+                separator = '' if index == 0 else '\r\n'
+                header = (f'{separator}--{boundary}\r\n'
+                          f'Content-Type: {mimetype}\r\n'
+                          f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n').encode('latin-1')
+                parts.append((header, start, end))
+                content_length += len(header) + end - start + 1
+            content_length += len(f'\r\n--{boundary}--\r\n')
+
+            response = Response(_iter_multipart(fileobj, parts, boundary), status=206,
+                                mimetype=f'multipart/byteranges; boundary={boundary}',
+                                direct_passthrough=True)
+            response.content_length = content_length
+    except Exception:
+        fileobj.close()
+        raise
+
+    response.headers.extend(validator_headers(etag, last_modified))
+    response.headers['Accept-Ranges'] = 'bytes'
+    if headers:
+        response.headers.extend(headers)
+    return response
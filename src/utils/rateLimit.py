@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+
+from cachetools import TTLCache
+
+
+class TokenBuckets:
+    """
+    One token bucket per key (client address, user id): ``rate`` tokens a second, holding at most ``burst``.
+
+    A bucket left alone for ``burst / rate`` seconds is full again, so idle keys are simply forgotten after that
+    long; at most ``maxsize`` keys are tracked.
+    """
+
+    def __init__(self, rate, burst, maxsize=100000):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self.maxsize = maxsize
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._buckets = TTLCache(maxsize=self.maxsize, ttl=self.burst / self.rate)
+
+    def take(self, key):
+        """Take a token for ``key``. Returns 0 when allowed, otherwise the seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+
+class ConcurrencyLimiter:
+    """
+    At most ``limit`` holders at a time, with up to ``queue`` callers waiting for a slot in arrival order.
+
+    ``acquire`` fails at once when the queue is full, and after ``timeout`` seconds of waiting otherwise.
+    """
+
+    def __init__(self, limit, queue=0):
+        self.limit = max(int(limit), 1)
+        self.queue = max(int(queue), 0)
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+
+    def acquire(self, timeout):
+        with self._condition:
+            # Only take a free slot directly when nobody is queued, so waiters are not overtaken
+            if self.active < self.limit and not self.waiting:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue:
+                return False
+
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + timeout
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
@@ -1,3 +1,6 @@
+from src.utils.helpers import logger as log_message
+
+
 def success_response(message=None, data=None, status_code=200, logger=None, logger_type=None):
     response = {
         'success': True,
@@ -6,8 +9,7 @@ def success_response(message=None, data=None, status_code=200, logger=None, logg
     }
 
     if logger is not None and logger_type is not None:
-        from src.utils.helpers import logger
-        logger(logger_type, logger, message + " " + str(status_code))
+        log_message(logger_type, logger, message + " " + str(status_code))
     return response, status_code
 
 
@@ -18,6 +20,5 @@ def error_response(message=None, data=None, status_code=404, logger=None, logger
         'data': data
     }
     if logger is not None and logger_type is not None:
-        from src.utils.helpers import logger
-        logger(logger_type, logger, message + " " + str(status_code))
+        log_message(logger_type, logger, message + " " + str(status_code))
     return response, status_code
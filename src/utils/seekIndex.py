@@ -0,0 +1,157 @@
+"""
+Keyframe seek index: sorted keyframe timestamps and the byte offset of each keyframe, stored as a sidecar file
+next to the video so a seek is a binary search instead of a series of range probes.
+
+Sidecar layout (big-endian): magic ``VSK1``, timescale (u32), keyframe count (u32), then ``count`` u64 decode
+times followed by ``count`` u64 byte offsets.
+"""
+import bisect
+import os
+import struct
+import sys
+import threading
+from array import array
+from itertools import accumulate
+
+from cachetools import LRUCache
+
+from src.utils.isobmff import read_movie
+
+MAGIC = b'VSK1'
+HEADER = struct.Struct('>4sII')
+SIDECAR_SUFFIX = '.seek'
+
+
+class SeekIndex:
+    def __init__(self, timescale, times, offsets):
+        self.timescale = timescale
+        self.times = times  # array('Q') of keyframe decode times in timescale units, ascending
+        self.offsets = offsets  # array('Q') of keyframe byte offsets in the file
+
+    def __len__(self):
+        return len(self.times)
+
+    def lookup(self, seconds):
+        """Return ``(keyframe time in seconds, byte offset)`` of the last keyframe at or before ``seconds``."""
+        if not self.times:
+            return None
+        index = bisect.bisect_right(self.times, int(max(seconds, 0) * self.timescale)) - 1
+        index = max(index, 0)
+        return self.times[index] / self.timescale, self.offsets[index]
+
+    def to_bytes(self):
+        times, offsets = array('Q', self.times), array('Q', self.offsets)
+        if sys.byteorder == 'little':
+            times.byteswap()
+            offsets.byteswap()
+        return HEADER.pack(MAGIC, self.timescale, len(self.times)) + times.tobytes() + offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, timescale, count = HEADER.unpack_from(data)
+        if magic != MAGIC or len(data) != HEADER.size + count * 16:
+            raise ValueError('Not a seek index')
+        times, offsets = array('Q'), array('Q')
+        times.frombytes(data[HEADER.size:HEADER.size + count * 8])
+        offsets.frombytes(data[HEADER.size + count * 8:])
+        if sys.byteorder == 'little':
+            times.byteswap()
+            offsets.byteswap()
+        return cls(timescale, times, offsets)
+
+
+def build_seek_index(track):
+    """Build the index for a parsed video Track from its stts/stss/stsc/stsz/stco tables."""
+    sample_count = track.sample_count or len(track.sample_sizes)
+    sync_samples = track.sync_samples if track.sync_samples is not None else range(1, sample_count + 1)
+
+    # Byte offset of each sync sample: its chunk's offset plus the sizes of the samples before it in the chunk
+    if track.sample_size:
+        sample_starts = None
+    else:
+        sample_starts = array('Q', accumulate(track.sample_sizes, initial=0))
+    chunk_first_samples = array('Q')
+    chunk_runs = list(zip(track.sample_to_chunk[0::3], track.sample_to_chunk[1::3]))
+    next_sample = 1
+    for index, (first_chunk, samples_per_chunk) in enumerate(chunk_runs):
+        last_chunk = chunk_runs[index + 1][0] - 1 if index + 1 < len(chunk_runs) else len(track.chunk_offsets)
+        for _ in range(first_chunk, last_chunk + 1):
+            chunk_first_samples.append(next_sample)
+            next_sample += samples_per_chunk
+
+    # Sync samples no chunk covers (truncated tables) have no position in the file
+    sync_samples = [sample for sample in sync_samples if sample < next_sample and sample <= sample_count]
+
+    offsets = array('Q')
+    for sample in sync_samples:
+        chunk = bisect.bisect_right(chunk_first_samples, sample) - 1
+        first = chunk_first_samples[chunk]
+        if sample_starts is None:
+            within = (sample - first) * track.sample_size
+        else:
+            within = sample_starts[sample - 1] - sample_starts[first - 1]
+        offsets.append(track.chunk_offsets[chunk] + within)
+
+    # Decode time of each sync sample, walking the run-length encoded stts table once
+    times = array('Q')
+    runs = iter(zip(track.time_to_sample[0::2], track.time_to_sample[1::2]))
+    run_start, run_time, (run_count, run_delta) = 1, 0, next(runs, (0, 0))
+    for sample in sync_samples:
+        while run_count and sample >= run_start + run_count:
+            run_start, run_time = run_start + run_count, run_time + run_count * run_delta
+            run_count, run_delta = next(runs, (0, 0))
+        times.append(run_time + (sample - run_start) * run_delta)
+
+    return SeekIndex(track.timescale or 1, times, offsets)
+
+
+def sidecar_path(video_path):
+    return video_path + SIDECAR_SUFFIX
+
+
+def write_seek_index(video_path, track=None):
+    """
+    Write the sidecar for ``video_path``, parsing the file unless its video ``track`` is given, and return the
+    SeekIndex. A file without a video track gets an empty index, so readers know there is nothing to look up.
+    """
+    if track is None:
+        track = read_movie(video_path).video_track
+    if track is None or not track.chunk_offsets:
+        index = SeekIndex(1, array('Q'), array('Q'))
+    else:
+        index = build_seek_index(track)
+    temp_path = sidecar_path(video_path) + '.tmp'
+    with open(temp_path, 'wb') as sidecar:
+        sidecar.write(index.to_bytes())
+    os.replace(temp_path, sidecar_path(video_path))
+    return index
+
+
+_cache = LRUCache(maxsize=256)
+_cache_lock = threading.Lock()
+
+
+def load_seek_index(video_path):
+    """
+    Return the SeekIndex for ``video_path`` from memory or its sidecar, or None when no current sidecar exists yet.
+    Sidecars are only built by the media processing worker, never on a request. Cached entries (including empty
+    indexes of files without a video track) are keyed on the video's mtime, so a rewritten file gets a fresh index.
+    """
+    key = (video_path, os.stat(video_path).st_mtime_ns)
+    with _cache_lock:
+        index = _cache.get(key)
+    if index is not None:
+        return index
+
+    path = sidecar_path(video_path)
+    index = None
+    if os.path.exists(path) and os.stat(path).st_mtime_ns >= key[1]:
+        with open(path, 'rb') as sidecar:
+            try:
+                index = SeekIndex.from_bytes(sidecar.read())
+            except (ValueError, struct.error):
+                index = None  # torn or foreign file; treated as missing
+    if index is not None:
+        with _cache_lock:
+            _cache[key] = index
+    return index
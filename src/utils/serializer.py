@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from instance.config import Config
+
+# Columns a serialized video needs, in the order the projection query selects them
+VIDEO_COLUMNS = ('id', 'title', 'description', 'video_url', 'video_size', 'share_link', 'uploaded_by', 'shares',
+                 'views', 'duration', 'width', 'height', 'video_codec', 'audio_codec', 'bitrate', 'processing_status',
+                 'created_at', 'updated_at')
+
+
+def video_columns(Video):
+    # Column projection for Query/select: rows come back as plain tuples, never as tracked ORM objects
+    return [getattr(Video, name) for name in VIDEO_COLUMNS]
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def serialize_videos(rows):
+    """
+    Serialize ``rows`` (projection rows in ``VIDEO_COLUMNS`` order, or ``Video`` objects) into response dicts.
+
+    URL prefixes are built once per call rather than once per row.
+    """
+    file_prefix = f'{Config.APP_URL}/'
+    stream_prefix = f'{Config.APP_URL}/api/v1/video/'
+    rows = list(rows)
+    if rows and hasattr(rows[0], '_sa_instance_state'):
+        # Mapped Video instances rather than projection rows
+        rows = [tuple(getattr(row, name) for name in VIDEO_COLUMNS) for row in rows]
+
+    serialized = []
+    for row in rows:
+        (video_id, title, description, video_url, video_size, share_link, uploaded_by, shares, views, duration, width,
+         height, video_codec, audio_codec, bitrate, processing_status, created_at, updated_at) = row
+        serialized.append({
+            'id': video_id,
+            'title': title,
+            'description': description,
+            'video_url': file_prefix + video_url,
+            'stream_url': stream_prefix + video_id + '/stream',
+            'video_size': video_size,
+            'share_link': share_link,
+            'uploaded_by': uploaded_by,
+            'shares': shares,
+            'views': views,
+            'duration': duration,
+            'width': width,
+            'height': height,
+            'video_codec': video_codec,
+            'audio_codec': audio_codec,
+            'bitrate': bitrate,
+            'processing_status': processing_status,
+            'created_at': _isoformat(created_at),
+            'updated_at': _isoformat(updated_at),
+        })
+    return serialized
+
+
+def serialize_video(row):
+    return serialize_videos([row])[0]
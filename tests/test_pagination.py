@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+
+from app import create_app
+from migration.Base import db
+from src.models.UserModel import User
+from src.models.VideoModel import Video
+from src.utils.pagination import paginate_keyset
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.sqlite'}",
+        'SQLALCHEMY_BINDS': {},
+        'LOG_FILE': str(tmp_path / 'test.log'),
+        'MEDIA_PROCESSING_ENABLED': False,
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _add_videos(count):
+    user = User(username='pager', email='pager@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    # One commit, so the rows share a created_at second
+    db.session.add_all([Video(title=f'video {index}', video_url='video.mp4', video_size=1, share_link=uuid.uuid4().hex,
+                              uploaded_by=user.id) for index in range(count)])
+    db.session.commit()
+    return user.id
+
+
+def test_pages_through_rows_created_in_the_same_second(app):
+    user_id = _add_videos(6)
+    query = db.session.query(Video.id, Video.created_at).filter(Video.uploaded_by == user_id)
+
+    seen = []
+    cursor = None
+    for _ in range(4):
+        rows, cursor, _ = paginate_keyset(query, Video.created_at, Video.id, cursor, size=2)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert len(seen) == 6
+    assert len(set(seen)) == 6
+
+
+def test_previous_cursor_returns_the_earlier_page(app):
+    user_id = _add_videos(5)
+    query = db.session.query(Video.id, Video.created_at).filter(Video.uploaded_by == user_id)
+
+    first, next_cursor, _ = paginate_keyset(query, Video.created_at, Video.id, None, size=2)
+    _, _, prev_cursor = paginate_keyset(query, Video.created_at, Video.id, next_cursor, size=2)
+    again, _, _ = paginate_keyset(query, Video.created_at, Video.id, prev_cursor, size=2)
+
+    assert [row.id for row in again] == [row.id for row in first]